@@ -1,22 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import networkx as nx
-import pandas as pd
-import geopandas as gpd
-from shapely.geometry import Point
+import os
 import random
 import warnings
 
-from src.data_simulator import (
-    simulate_vial_network,
-    simulate_critical_infrastructure,
-    simulate_populated_zones,
-    RIESGO_PONDERACION
-)
-from src.graph_builder import build_urban_graph
-from src.earthquake_simulator import SimuladorSismo
-from src.graph_algorithms import find_shortest_path_dijkstra, calculate_mst_for_distribution, analyze_post_earthquake_connectivity
-from src.visualize_graph import plot_full_graph, plot_evacuation_route, plot_mst_distribution, plot_connectivity_analysis
+# Los módulos de src (networkx, pandas, geopandas, scipy, matplotlib) se importan dentro de
+# cada acción, la primera vez que se usa: la ventana aparece sin esperar esas librerías.
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
@@ -31,10 +20,31 @@ class EarthquakeApp:
         self.node_positions = {}
         self.origen_usuario_id = None
         self.supply_center_id = None
+        self.bloqueos_aplicados = []
+        self.tablas_evacuacion_base = {}
+        self.tablas_evacuacion_post = {}
+        self.huella_bloqueos = None
+        self.red_distribucion = None
+        self.biblioteca_escenarios = None
+        self.mapa = None
+        self.pool_procesos = None
+        master.protocol("WM_DELETE_WINDOW", self._cerrar)
 
         self._create_widgets()
         self._initialize_simulation_data()
 
+    def _pool(self):
+        # Un solo pool de procesos para toda la sesión: se crea al primer uso y se cierra con la ventana
+        if self.pool_procesos is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool_procesos = ProcessPoolExecutor()
+        return self.pool_procesos
+
+    def _cerrar(self):
+        if self.pool_procesos is not None:
+            self.pool_procesos.shutdown(wait=False, cancel_futures=True)
+        self.master.destroy()
+
     def _create_widgets(self):
         self.notebook = ttk.Notebook(self.master)
         self.notebook.pack(expand=True, fill="both", padx=10, pady=10)
@@ -55,13 +65,35 @@ class EarthquakeApp:
         self.notebook.add(self.connectivity_frame, text="Análisis de Conectividad")
         self._setup_connectivity_frame()
 
+        self.service_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.service_frame, text="Áreas de Servicio")
+        self._setup_service_frame()
+
+        self.map_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.map_frame, text="Mapa")
+        self.map_placeholder_label = ttk.Label(self.map_frame, text="Construye el grafo para ver el mapa.")
+        self.map_placeholder_label.pack(pady=20)
+
     def _setup_sim_frame(self):
         ttk.Label(self.sim_frame, text="Parámetros de Simulación:").pack(pady=5)
 
-        ttk.Label(self.sim_frame, text="Magnitud Sismo (solo visual):").pack()
+        ttk.Label(self.sim_frame, text="Magnitud Sismo:").pack()
         self.sismo_mag_var = tk.DoubleVar(value=7.5)
         ttk.Entry(self.sim_frame, textvariable=self.sismo_mag_var).pack(pady=2)
 
+        self.usar_epicentro_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.sim_frame, text="Daño por epicentro y atenuación (usa la magnitud)",
+                        variable=self.usar_epicentro_var).pack(pady=2)
+
+        epicentro_frame = ttk.Frame(self.sim_frame)
+        epicentro_frame.pack(pady=2)
+        ttk.Label(epicentro_frame, text="Epicentro Lat:").pack(side=tk.LEFT, padx=2)
+        self.epicentro_lat_var = tk.DoubleVar()
+        ttk.Entry(epicentro_frame, textvariable=self.epicentro_lat_var, width=10).pack(side=tk.LEFT, padx=2)
+        ttk.Label(epicentro_frame, text="Lon:").pack(side=tk.LEFT, padx=2)
+        self.epicentro_lon_var = tk.DoubleVar()
+        ttk.Entry(epicentro_frame, textvariable=self.epicentro_lon_var, width=10).pack(side=tk.LEFT, padx=2)
+
         ttk.Label(self.sim_frame, text="Prob. Bloqueo Alto Riesgo (0-1):").pack()
         self.prob_alto_var = tk.DoubleVar(value=0.5)
         ttk.Entry(self.sim_frame, textvariable=self.prob_alto_var).pack(pady=2)
@@ -70,9 +102,29 @@ class EarthquakeApp:
         self.prob_medio_var = tk.DoubleVar(value=0.1)
         ttk.Entry(self.sim_frame, textvariable=self.prob_medio_var).pack(pady=2)
 
+        self.ventanas_separadas_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.sim_frame, text="Abrir también los gráficos en ventanas separadas",
+                        variable=self.ventanas_separadas_var).pack(pady=2)
+
+        self.exportar_resultados_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.sim_frame, text="Guardar resultados en resultados_sismo.geojsonl",
+                        variable=self.exportar_resultados_var).pack(pady=2)
+
+        self.guardar_escenarios_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.sim_frame, text="Guardar cada sismo en la biblioteca escenarios_sismo/",
+                        variable=self.guardar_escenarios_var).pack(pady=2)
+
         ttk.Button(self.sim_frame, text="1. Construir y Visualizar Grafo", command=self._build_and_plot_graph).pack(pady=10)
         ttk.Button(self.sim_frame, text="2. Simular Sismo y Bloqueos", command=self._simulate_earthquake).pack(pady=5)
 
+        escenario_frame = ttk.Frame(self.sim_frame)
+        escenario_frame.pack(pady=2)
+        ttk.Label(escenario_frame, text="Escenario guardado N°:").pack(side=tk.LEFT, padx=2)
+        self.escenario_id_var = tk.IntVar(value=0)
+        ttk.Entry(escenario_frame, textvariable=self.escenario_id_var, width=6).pack(side=tk.LEFT, padx=2)
+        ttk.Button(escenario_frame, text="Cargar Escenario", command=self._load_scenario).pack(side=tk.LEFT, padx=2)
+        ttk.Button(self.sim_frame, text="Validar Complejidad (Conteo de Operaciones)", command=self._validar_complejidad).pack(pady=5)
+
         self.sim_status_label = ttk.Label(self.sim_frame, text="Estado: Inicializando...")
         self.sim_status_label.pack(pady=5)
 
@@ -104,6 +156,23 @@ class EarthquakeApp:
         self.evac_status_label = ttk.Label(self.evac_frame, text="Estado: Ingresa origen y tipo de destino.")
         self.evac_status_label.pack(pady=5)
 
+        alternativas_frame = ttk.Frame(self.evac_frame)
+        alternativas_frame.pack(pady=5)
+        ttk.Label(alternativas_frame, text="Rutas alternativas:").pack(side=tk.LEFT, padx=5)
+        self.num_alternativas_var = tk.IntVar(value=3)
+        ttk.Spinbox(alternativas_frame, from_=2, to=5, textvariable=self.num_alternativas_var, width=4).pack(side=tk.LEFT, padx=5)
+        self.modo_alternativas_var = tk.StringVar(value="K más cortas (Yen)")
+        ttk.Combobox(alternativas_frame, textvariable=self.modo_alternativas_var, width=22,
+                     values=["K más cortas (Yen)", "Vías disjuntas (Suurballe)"]).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.evac_frame, text="Calcular Rutas Alternativas (Con Sismo)", command=self._calculate_alternative_routes).pack(pady=5)
+
+        confiable_frame = ttk.Frame(self.evac_frame)
+        confiable_frame.pack(pady=5)
+        ttk.Label(confiable_frame, text="Metros extra aceptados por unidad de riesgo (λ):").pack(side=tk.LEFT, padx=5)
+        self.lambda_riesgo_var = tk.DoubleVar(value=1000.0)
+        ttk.Entry(confiable_frame, textvariable=self.lambda_riesgo_var, width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.evac_frame, text="Calcular Ruta Más Confiable (Antes del Sismo)", command=self._calculate_reliable_route).pack(pady=5)
+
     def _setup_dist_frame(self):
         ttk.Label(self.dist_frame, text="Planificación de Distribución de Ayuda").pack(pady=10)
 
@@ -123,6 +192,11 @@ class EarthquakeApp:
         self.mst_algo_combobox.pack(pady=2)
 
         ttk.Button(self.dist_frame, text="Calcular Red de Distribución (MST)", command=self._calculate_mst).pack(pady=10)
+
+        ttk.Label(self.dist_frame, text="Capacidad por Vehículo (refugios por viaje):").pack()
+        self.capacidad_vehiculo_var = tk.IntVar(value=5)
+        ttk.Spinbox(self.dist_frame, from_=1, to=100, textvariable=self.capacidad_vehiculo_var, width=6).pack(pady=2)
+        ttk.Button(self.dist_frame, text="Calcular Rutas de Vehículos", command=self._calculate_vehicle_routes).pack(pady=5)
         self.dist_status_label = ttk.Label(self.dist_frame, text="Estado: Esperando centro y cálculo...")
         self.dist_status_label.pack(pady=5)
 
@@ -139,10 +213,32 @@ class EarthquakeApp:
 
         self.isolated_nodes_label = ttk.Label(self.connectivity_frame, text="Nodos Aislados: N/A")
         self.isolated_nodes_label.pack(pady=2)
+        self.resiliencia_label = ttk.Label(self.connectivity_frame, text="Resiliencia: N/A", justify=tk.LEFT)
+        self.resiliencia_label.pack(pady=2)
+
+
+    def _setup_service_frame(self):
+        ttk.Label(self.service_frame, text="Cobertura de Instalaciones (Antes y Después del Sismo)").pack(pady=10)
+
+        ttk.Label(self.service_frame, text="Tipo de Instalación:").pack(pady=5)
+        self.service_type_var = tk.StringVar(value="Hospital")
+        ttk.Combobox(self.service_frame, textvariable=self.service_type_var,
+                     values=["Refugio", "Hospital", "Estacion de Rescate", "Centro de Salud"]).pack(pady=2)
 
+        radio_frame = ttk.Frame(self.service_frame)
+        radio_frame.pack(pady=5)
+        ttk.Label(radio_frame, text="Radio de Cobertura (m):").pack(side=tk.LEFT, padx=5)
+        self.service_radius_var = tk.DoubleVar(value=1000.0)
+        ttk.Entry(radio_frame, textvariable=self.service_radius_var, width=10).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(self.service_frame, text="Calcular Áreas de Servicio", command=self._calculate_service_areas).pack(pady=10)
+        self.service_status_label = ttk.Label(self.service_frame, text="Estado: Esperando cálculo...")
+        self.service_status_label.pack(pady=5)
 
     def _initialize_simulation_data(self):
         self.base_lat, self.base_lon = -12.0463, -77.0428
+        self.epicentro_lat_var.set(self.base_lat)
+        self.epicentro_lon_var.set(self.base_lon)
         self.num_grid_x = 40
         self.num_grid_y = 40
         self.spacing = 0.002
@@ -164,6 +260,15 @@ class EarthquakeApp:
         self.master.update_idletasks()
 
         try:
+            from src.data_simulator import (
+                simulate_vial_network,
+                simulate_critical_infrastructure,
+                simulate_populated_zones,
+                RIESGO_PONDERACION
+            )
+            from src.graph_builder import build_urban_graph
+            from src.dynamic_sssp import arboles_instalacion_base, huella_bloqueos
+
             self.df_red_vial_edges, self.gdf_vial_nodes = simulate_vial_network(
                 self.base_lat, self.base_lon, self.num_grid_x, self.num_grid_y, self.spacing
             )
@@ -180,7 +285,16 @@ class EarthquakeApp:
             self.graph = build_urban_graph(
                 self.df_red_vial_edges, self.gdf_vial_nodes, self.gdf_infra_critica, self.gdf_zonas_pobladas, RIESGO_PONDERACION
             )
+            self.sim_status_label.config(text="Estado: Calculando tablas de instalación más cercana...")
+            self.master.update_idletasks()
+            tipos_infra = sorted({data.get('tipo') for _, data in self.graph.nodes(data=True) if data.get('type') == 'critical_infra'})
+            self.tablas_evacuacion_base = arboles_instalacion_base(self.graph, tipos_infra)
             self.graph_post_sismo = self.graph.copy()
+            self.bloqueos_aplicados = []
+            self.tablas_evacuacion_post = {}
+            self.huella_bloqueos = huella_bloqueos([])
+            self.red_distribucion = None
+            self.biblioteca_escenarios = None
 
             self.node_positions = {n: self.graph.nodes[n]['pos'] for n in self.graph.nodes() if 'pos' in self.graph.nodes[n]}
 
@@ -190,7 +304,10 @@ class EarthquakeApp:
             self.sim_status_label.config(text="Estado: Grafo construido. Visualizando...")
             self.master.update_idletasks()
 
-            plot_full_graph(self.graph)
+            self._mapa().dibujar_base(self.graph)
+            if self.ventanas_separadas_var.get():
+                from src.visualize_graph import plot_full_graph
+                plot_full_graph(self.graph)
             self.sim_status_label.config(text="Estado: Grafo construido y visualizado.")
 
         except Exception as e:
@@ -201,6 +318,8 @@ class EarthquakeApp:
 
 
     def _simulate_earthquake(self):
+        from src.earthquake_simulator import SimuladorSismo
+
         if self.graph is None:
             messagebox.showwarning("Advertencia", "Primero construye el grafo.")
             return
@@ -213,12 +332,31 @@ class EarthquakeApp:
             self.sim_status_label.config(text=f"Estado: Simulando sismo M{magnitud}...")
             self.master.update_idletasks()
 
+            # Semilla propia de cada sismo: con ella y los parámetros el escenario se puede reproducir
+            semilla = random.randrange(2 ** 32)
             simulador = SimuladorSismo(self.graph)
-            self.graph_post_sismo, bloqueos_aplicados = simulador.simular_bloqueos(
-                magnitud_sismo=magnitud,
-                porcentaje_bloqueo_alto_riesgo=prob_alto,
-                porcentaje_bloqueo_medio_riesgo=prob_medio
-            )
+            if self.usar_epicentro_var.get():
+                epicentro = (self.epicentro_lon_var.get(), self.epicentro_lat_var.get())
+                graph_post_sismo, bloqueos_aplicados = simulador.simular_bloqueos_epicentro(
+                    epicentro,
+                    magnitud_sismo=magnitud,
+                    semilla=semilla
+                )
+                parametros = {'modo': 'epicentro', 'magnitud': magnitud, 'epicentro': epicentro}
+            else:
+                graph_post_sismo, bloqueos_aplicados = simulador.simular_bloqueos(
+                    magnitud_sismo=magnitud,
+                    porcentaje_bloqueo_alto_riesgo=prob_alto,
+                    porcentaje_bloqueo_medio_riesgo=prob_medio,
+                    semilla=semilla
+                )
+                parametros = {'modo': 'riesgo', 'magnitud': magnitud, 'prob_alto': prob_alto, 'prob_medio': prob_medio}
+
+            if self.guardar_escenarios_var.get():
+                escenario_id = self._biblioteca_escenarios().guardar(bloqueos_aplicados, semilla=semilla, **parametros)
+                self.escenario_id_var.set(escenario_id)
+
+            self._publicar_escenario(graph_post_sismo, bloqueos_aplicados)
             messagebox.showinfo("Sismo Simulado", f"Sismo de magnitud {magnitud} simulado. Total de aristas bloqueadas: {len(bloqueos_aplicados)}")
             self.sim_status_label.config(text=f"Estado: Sismo M{magnitud} simulado. {len(bloqueos_aplicados)} aristas bloqueadas.")
 
@@ -226,6 +364,81 @@ class EarthquakeApp:
             messagebox.showerror("Error de Sismo", f"Ocurrió un error al simular el sismo: {e}")
             self.sim_status_label.config(text="Estado: Error al simular sismo.")
 
+    def _biblioteca_escenarios(self):
+        # Una biblioteca por red base: los escenarios solo valen sobre las vías con que se guardaron
+        from src.scenario_store import BibliotecaEscenarios, huella_red
+
+        if self.biblioteca_escenarios is None:
+            self.biblioteca_escenarios = BibliotecaEscenarios(os.path.join("escenarios_sismo", huella_red(self.graph)), self.graph)
+        return self.biblioteca_escenarios
+
+    def _load_scenario(self):
+        if self.graph is None:
+            messagebox.showwarning("Advertencia", "Primero construye el grafo.")
+            return
+
+        try:
+            biblioteca = self._biblioteca_escenarios()
+            escenario_id = self.escenario_id_var.get()
+            if not 0 <= escenario_id < len(biblioteca):
+                messagebox.showwarning("Advertencia", f"No hay escenario {escenario_id} guardado para esta red ({len(biblioteca)} escenarios).")
+                return
+
+            graph_post_sismo, bloqueos_aplicados = biblioteca.reconstruir(self.graph, escenario_id)
+            self._publicar_escenario(graph_post_sismo, bloqueos_aplicados)
+            parametros = biblioteca.metadatos[escenario_id]['parametros']
+            self.sim_status_label.config(text=f"Estado: Escenario {escenario_id} cargado ({parametros.get('modo')}, "
+                                              f"M{parametros.get('magnitud')}). {len(bloqueos_aplicados)} vías bloqueadas.")
+
+        except Exception as e:
+            messagebox.showerror("Error de Escenario", f"Ocurrió un error al cargar el escenario: {e}")
+            self.sim_status_label.config(text="Estado: Error al cargar escenario.")
+
+    def _publicar_escenario(self, graph_post_sismo, bloqueos_aplicados):
+        """Deja el escenario como estado post-sismo actual, reutilizando lo que no cambió."""
+        from src.dynamic_sssp import huella_bloqueos, expandir_bloqueos
+
+        self.graph_post_sismo = graph_post_sismo
+        self.bloqueos_aplicados = bloqueos_aplicados
+        # Si el sismo deja cerradas las mismas vías, las tablas post-sismo siguen valiendo
+        huella = huella_bloqueos(bloqueos_aplicados)
+        vias_cambiadas = huella ^ self.huella_bloqueos
+        if huella != self.huella_bloqueos:
+            self.tablas_evacuacion_post = {}
+            self.huella_bloqueos = huella
+        # La red de distribución ya calculada se repara solo con las vías que cambiaron de estado
+        if self.red_distribucion is not None:
+            self.red_distribucion.actualizar(self.graph_post_sismo, expandir_bloqueos(self.graph_post_sismo, [tuple(via) for via in vias_cambiadas]))
+        if self.mapa is not None:
+            self.mapa.quitar_capas()
+            self.mapa.mostrar_bloqueos(self.graph_post_sismo)
+            if self.red_distribucion is not None:
+                self.mapa.mostrar_mst(self.red_distribucion.aristas_mst()[0])
+                self.mapa.mostrar_nodos('mst_puntos', self.red_distribucion.terminales[1:], color='lime')
+                self.mapa.mostrar_nodos('mst_centro', self.red_distribucion.terminales[:1], color='red', tamano=80)
+
+    def _validar_complejidad(self):
+        from src.operation_counts import medir_operaciones, textos_cotas
+        from src.visualize_graph import plot_conteo_operaciones
+
+        try:
+            self.sim_status_label.config(text="Estado: Contando operaciones en redes de tamaño creciente...")
+            self.master.update_idletasks()
+
+            filas = medir_operaciones((10, 20, 40))
+            cotas = textos_cotas()
+            lineas = []
+            for algoritmo, texto in cotas.items():
+                razones = ", ".join(f"{f['razon']:.2f}" for f in filas if f['algoritmo'] == algoritmo)
+                lineas.append(f"{algoritmo.capitalize()} ({texto}): medido/cota = {razones}")
+            self.sim_status_label.config(text="Estado: Conteo de operaciones completado.")
+            messagebox.showinfo("Validación de Complejidad", "\n".join(lineas))
+            plot_conteo_operaciones(filas, cotas)
+
+        except Exception as e:
+            messagebox.showerror("Error de Validación", f"Ocurrió un error al contar operaciones: {e}")
+            self.sim_status_label.config(text="Estado: Error al validar complejidad.")
+
     def _set_random_origin(self):
         if self.gdf_zonas_pobladas is None:
             messagebox.showwarning("Advertencia", "Primero construye el grafo para simular ubicaciones.")
@@ -273,22 +486,29 @@ class EarthquakeApp:
             self.evac_status_label.config(text="Estado: Calculando rutas de evacuación...")
             self.master.update_idletasks()
 
-            path_sin_sismo, best_target_sin_sismo, length_sin_sismo = find_shortest_path_dijkstra(
-                self.graph, self.origen_usuario_id, destinos_ids
-            )
-
-            path_con_sismo, best_target_con_sismo, length_con_sismo = find_shortest_path_dijkstra(
-                self.graph_post_sismo, self.origen_usuario_id, destinos_ids
-            )
-
-            plot_evacuation_route(
-                self.graph,
-                self.graph_post_sismo,
-                self.node_positions,
-                self.origen_usuario_id,
-                best_target_sin_sismo, path_sin_sismo,
-                best_target_con_sismo, path_con_sismo
-            )
+            path_sin_sismo, best_target_sin_sismo, length_sin_sismo = self._tabla_evacuacion_base(
+                target_node_types_in_graph[0], destinos_ids
+            ).ruta(self.origen_usuario_id)
+
+            tabla_post_sismo = self._tabla_evacuacion_post_sismo(target_node_types_in_graph[0], destinos_ids)
+            path_con_sismo, best_target_con_sismo, length_con_sismo = tabla_post_sismo.ruta(self.origen_usuario_id)
+
+            self._exportar_resultado('escribir_ruta', path_sin_sismo, length_sin_sismo, resultado='evacuacion', escenario='sin_sismo')
+            self._exportar_resultado('escribir_ruta', path_con_sismo, length_con_sismo, resultado='evacuacion', escenario='con_sismo')
+
+            self.mapa.quitar_capas('ruta')
+            self.mapa.mostrar_ruta('ruta_sin_sismo', path_sin_sismo, color='blue', ancho=2.0)
+            self.mapa.mostrar_ruta('ruta_con_sismo', path_con_sismo, color='cyan')
+            if self.ventanas_separadas_var.get():
+                from src.visualize_graph import plot_evacuation_route
+                plot_evacuation_route(
+                    self.graph,
+                    self.graph_post_sismo,
+                    self.node_positions,
+                    self.origen_usuario_id,
+                    best_target_sin_sismo, path_sin_sismo,
+                    best_target_con_sismo, path_con_sismo
+                )
 
             status_msg = "Ruta de evacuación calculada y visualizada.\n"
             if path_sin_sismo:
@@ -309,6 +529,164 @@ class EarthquakeApp:
             self.evac_status_label.config(text="Estado: Error al calcular ruta.")
 
 
+    def _calculate_reliable_route(self):
+        from src.reliable_routing import tabla_rutas_confiables, probabilidad_ruta
+
+        if self.graph is None:
+            messagebox.showwarning("Advertencia", "Primero construye el grafo.")
+            return
+
+        self.origen_usuario_id = self.origin_manzana_entry.get().strip()
+        if self.origen_usuario_id not in self.graph.nodes():
+            messagebox.showwarning("Advertencia", f"El ID de manzana '{self.origen_usuario_id}' no existe en el grafo. Verifica el formato (ej. M_123).")
+            return
+
+        tipo_destino_map = {
+            "Refugio": "refugio",
+            "Hospital": "hospital",
+            "Estacion de Rescate": "estacion_rescate",
+            "Centro de Salud": "centro_salud"
+        }
+        tipo_destino = tipo_destino_map.get(self.destination_type_var.get(), "refugio")
+        destinos_ids = [n for n, data in self.graph.nodes(data=True) if data.get('type') == 'critical_infra' and data.get('tipo') == tipo_destino]
+        if not destinos_ids:
+            messagebox.showwarning("Advertencia", f"No hay destinos de tipo '{tipo_destino}' disponibles en el grafo simulado.")
+            return
+
+        try:
+            self.evac_status_label.config(text="Estado: Calculando ruta más confiable...")
+            self.master.update_idletasks()
+
+            # Probabilidades de bloqueo del modo por riesgo: la confiabilidad sale de una búsqueda, sin simular sismos
+            prob_alto, prob_medio = self.prob_alto_var.get(), self.prob_medio_var.get()
+            tabla_confiable = tabla_rutas_confiables(self.graph, destinos_ids, prob_alto, prob_medio)
+            tabla_combinada = tabla_rutas_confiables(self.graph, destinos_ids, prob_alto, prob_medio,
+                                                     lambda_riesgo=self.lambda_riesgo_var.get())
+            path_corta, _, length_corta = self._tabla_evacuacion_base(tipo_destino, destinos_ids).ruta(self.origen_usuario_id)
+            path_confiable, destino_confiable, length_confiable = tabla_confiable.ruta(self.origen_usuario_id)
+            path_combinada, destino_combinada, length_combinada = tabla_combinada.ruta(self.origen_usuario_id)
+            if not path_confiable:
+                messagebox.showinfo("Ruta Más Confiable", "No hay ruta desde el origen a ese tipo de destino.")
+                self.evac_status_label.config(text="Estado: Sin ruta.")
+                return
+
+            self._exportar_resultado('escribir_ruta', path_confiable, length_confiable, resultado='ruta_confiable',
+                                     probabilidad_llegada=tabla_confiable.probabilidad_llegada(self.origen_usuario_id))
+            self._exportar_resultado('escribir_ruta', path_combinada, length_combinada, resultado='ruta_combinada',
+                                     probabilidad_llegada=tabla_combinada.probabilidad_llegada(self.origen_usuario_id))
+
+            self.mapa.quitar_capas('ruta')
+            self.mapa.mostrar_ruta('ruta_sin_sismo', path_corta, color='blue', ancho=2.0)
+            self.mapa.mostrar_ruta('ruta_combinada', path_combinada, color='orange', ancho=2.5)
+            self.mapa.mostrar_ruta('ruta_confiable', path_confiable, color='green')
+
+            status_msg = (f"Más corta: {length_corta:.2f}m, prob. de quedar abierta {probabilidad_ruta(self.graph, path_corta, prob_alto, prob_medio):.1%}.\n"
+                          f"Más confiable: a {destino_confiable} ({length_confiable:.2f}m), "
+                          f"prob. {tabla_confiable.probabilidad_llegada(self.origen_usuario_id):.1%}.\n"
+                          f"Combinada: a {destino_combinada} ({length_combinada:.2f}m), "
+                          f"prob. {tabla_combinada.probabilidad_llegada(self.origen_usuario_id):.1%}.")
+            self.evac_status_label.config(text=f"Estado: {status_msg}")
+            messagebox.showinfo("Ruta Más Confiable", status_msg)
+
+        except Exception as e:
+            messagebox.showerror("Error de Evacuación", f"Ocurrió un error al calcular la ruta más confiable: {e}")
+            self.evac_status_label.config(text="Estado: Error al calcular ruta más confiable.")
+
+    def _calculate_alternative_routes(self):
+        from src.alternative_routes import k_rutas_mas_cortas, rutas_disjuntas_suurballe
+
+        if self.graph_post_sismo is None:
+            messagebox.showwarning("Advertencia", "Primero construye el grafo y simula un sismo.")
+            return
+
+        self.origen_usuario_id = self.origin_manzana_entry.get().strip()
+        if self.origen_usuario_id not in self.graph_post_sismo.nodes():
+            messagebox.showwarning("Advertencia", f"El ID de manzana '{self.origen_usuario_id}' no existe en el grafo. Verifica el formato (ej. M_123).")
+            return
+
+        tipo_destino_map = {
+            "Refugio": "refugio",
+            "Hospital": "hospital",
+            "Estacion de Rescate": "estacion_rescate",
+            "Centro de Salud": "centro_salud"
+        }
+        tipo_destino = tipo_destino_map.get(self.destination_type_var.get(), "refugio")
+        destinos_ids = [n for n, data in self.graph.nodes(data=True) if data.get('type') == 'critical_infra' and data.get('tipo') == tipo_destino]
+        if not destinos_ids:
+            messagebox.showwarning("Advertencia", f"No hay destinos de tipo '{tipo_destino}' disponibles en el grafo simulado.")
+            return
+
+        try:
+            self.evac_status_label.config(text="Estado: Calculando rutas alternativas...")
+            self.master.update_idletasks()
+
+            _, destino, _ = self._tabla_evacuacion_post_sismo(tipo_destino, destinos_ids).ruta(self.origen_usuario_id)
+            if destino is None:
+                messagebox.showinfo("Rutas Alternativas", "No hay ruta al destino después del sismo (posiblemente bloqueada).")
+                self.evac_status_label.config(text="Estado: Sin rutas alternativas.")
+                return
+
+            k = self.num_alternativas_var.get()
+            if self.modo_alternativas_var.get() == "Vías disjuntas (Suurballe)":
+                rutas = rutas_disjuntas_suurballe(self.graph_post_sismo, self.origen_usuario_id, destino, k)
+            else:
+                rutas = k_rutas_mas_cortas(self.graph_post_sismo, self.origen_usuario_id, destino, k)
+
+            self.mapa.quitar_capas('ruta')
+            colores = ['cyan', 'orange', 'magenta', 'gold', 'brown']
+            for i, (ruta, _) in enumerate(rutas):
+                self.mapa.mostrar_ruta(f'ruta_alternativa_{i}', ruta, color=colores[i % len(colores)], ancho=4.0 - 0.5 * i)
+            if self.ventanas_separadas_var.get():
+                from src.visualize_graph import plot_alternative_routes
+                plot_alternative_routes(self.graph_post_sismo, self.node_positions, self.origen_usuario_id, destino, rutas)
+
+            status_msg = f"{len(rutas)} rutas alternativas a {destino}: " + ", ".join(f"{costo:.0f}m" for _, costo in rutas)
+            self.evac_status_label.config(text=f"Estado: {status_msg}")
+
+        except Exception as e:
+            messagebox.showerror("Error de Evacuación", f"Ocurrió un error al calcular las rutas alternativas: {e}")
+            self.evac_status_label.config(text="Estado: Error al calcular rutas alternativas.")
+
+    def _mapa(self):
+        # El mapa (y matplotlib) se crea la primera vez que se necesita
+        if self.mapa is None:
+            from src.map_canvas import MapaInteractivo
+            self.map_placeholder_label.destroy()
+            self.mapa = MapaInteractivo(self.map_frame)
+        return self.mapa
+
+    def _exportar_resultado(self, metodo, *args, **propiedades):
+        # Agrega el resultado al archivo GeoJSON-lines (un registro por línea) si la opción está activa
+        if not self.exportar_resultados_var.get():
+            return
+        from src.export_results import ExportadorGeoJSONL
+        with ExportadorGeoJSONL("resultados_sismo.geojsonl", self.graph, modo='a') as exportador:
+            getattr(exportador, metodo)(*args, **propiedades)
+
+    def _tabla_evacuacion_base(self, tipo_destino, destinos_ids):
+        """Tabla de instalación más cercana sin sismo (calculada al construir el grafo)."""
+        from src.dynamic_sssp import ArbolCaminosIncremental
+
+        if tipo_destino not in self.tablas_evacuacion_base:
+            self.tablas_evacuacion_base[tipo_destino] = ArbolCaminosIncremental(self.graph, destinos_ids)
+        return self.tablas_evacuacion_base[tipo_destino]
+
+    def _tabla_evacuacion_post_sismo(self, tipo_destino, destinos_ids):
+        """
+        Tabla de instalación más cercana post-sismo para un tipo de destino. Se obtiene
+        reparando la tabla pre-sismo solo en los subárboles que atraviesan aristas bloqueadas;
+        sin vías bloqueadas es la misma tabla pre-sismo.
+        """
+        from src.dynamic_sssp import expandir_bloqueos
+
+        if tipo_destino not in self.tablas_evacuacion_post:
+            tabla = self._tabla_evacuacion_base(tipo_destino, destinos_ids)
+            if self.bloqueos_aplicados:
+                tabla = tabla.copiar()
+                tabla.reparar(self.graph_post_sismo, expandir_bloqueos(self.graph_post_sismo, self.bloqueos_aplicados))
+            self.tablas_evacuacion_post[tipo_destino] = tabla
+        return self.tablas_evacuacion_post[tipo_destino]
+
     def _select_supply_center(self):
         if self.graph is None:
             messagebox.showwarning("Advertencia", "Primero construye el grafo.")
@@ -327,6 +705,8 @@ class EarthquakeApp:
 
 
     def _calculate_mst(self):
+        from src.dynamic_mst import MSTDistribucionDinamico
+
         if self.graph_post_sismo is None or self.supply_center_id is None:
             messagebox.showwarning("Advertencia", "Primero construye el grafo, simula un sismo y selecciona un centro de abastecimiento.")
             return
@@ -349,25 +729,33 @@ class EarthquakeApp:
             mst_edges = []
             total_cost = 0.0
             
+            # Misma red que calculate_mst_for_distribution, pero los próximos sismos la reparan en vez de recalcularla
             if mst_option == "Prim":
-                mst_edges, total_cost = calculate_mst_for_distribution(
+                self.red_distribucion = MSTDistribucionDinamico(
                     self.graph_post_sismo, self.supply_center_id, selected_distribution_points, mst_algorithm='prim'
                 )
             elif mst_option == "Kruskal":
-                mst_edges, total_cost = calculate_mst_for_distribution(
+                self.red_distribucion = MSTDistribucionDinamico(
                     self.graph_post_sismo, self.supply_center_id, selected_distribution_points, mst_algorithm='kruskal_custom'
                 )
             else:
                 messagebox.showerror("Error de Selección", "Algoritmo MST no reconocido. Por favor, selecciona 'Kruskal' o 'Prim'.")
                 self.dist_status_label.config(text="Estado: Error de selección de algoritmo.")
                 return
+            mst_edges, total_cost = self.red_distribucion.aristas_mst()
             
-            # Plot based on the option
-            plot_mst_distribution(
-                self.graph, self.graph_post_sismo, self.node_positions,
-                self.supply_center_id, selected_distribution_points,
-                mst_edges, total_cost
-            )
+            self._exportar_resultado('escribir_aristas_mst', mst_edges, resultado='mst', algoritmo=mst_option, costo_total=total_cost)
+
+            self.mapa.mostrar_mst(mst_edges)
+            self.mapa.mostrar_nodos('mst_puntos', selected_distribution_points, color='lime')
+            self.mapa.mostrar_nodos('mst_centro', [self.supply_center_id], color='red', tamano=80)
+            if self.ventanas_separadas_var.get():
+                from src.visualize_graph import plot_mst_distribution
+                plot_mst_distribution(
+                    self.graph, self.graph_post_sismo, self.node_positions,
+                    self.supply_center_id, selected_distribution_points,
+                    mst_edges, total_cost
+                )
             
             if not mst_edges and len(selected_distribution_points) > 1: 
                 status_msg = f"No se pudo calcular el MST con {mst_option} para todos los puntos (posibles desconexiones)."
@@ -381,7 +769,60 @@ class EarthquakeApp:
             messagebox.showerror("Error de Distribución", f"Ocurrió un error al calcular el MST: {e}")
             self.dist_status_label.config(text="Estado: Error al calcular MST.")
 
+    def _calculate_vehicle_routes(self):
+        from src.vehicle_routing import planificar_rutas_vehiculos, expandir_rutas
+
+        if self.graph_post_sismo is None or self.supply_center_id is None:
+            messagebox.showwarning("Advertencia", "Primero construye el grafo, simula un sismo y selecciona un centro de abastecimiento.")
+            return
+
+        try:
+            self.dist_status_label.config(text="Estado: Calculando rutas de vehículos...")
+            self.master.update_idletasks()
+
+            refugios_ids = [n for n, data in self.graph.nodes(data=True) if data.get('type') == 'critical_infra' and data.get('tipo') == 'refugio']
+            if not refugios_ids:
+                messagebox.showwarning("Advertencia", "No hay refugios disponibles en el grafo simulado para distribuir.")
+                self.dist_status_label.config(text="Estado: No hay refugios.")
+                return
+
+            num_refugios = self.num_refugios_var.get()
+            selected_distribution_points = random.sample(refugios_ids, min(num_refugios, len(refugios_ids)))
+            resultado = planificar_rutas_vehiculos(
+                self.graph_post_sismo, self.supply_center_id, selected_distribution_points,
+                capacidad_vehiculo=self.capacidad_vehiculo_var.get(), limite_segundos=5.0,
+                executor=self._pool()
+            )
+            caminos = expandir_rutas(self.graph_post_sismo, resultado['rutas'])
+
+            for camino, costo, carga in zip(caminos, resultado['costos'], resultado['cargas']):
+                self._exportar_resultado('escribir_ruta', camino, costo, resultado='ruta_vehiculo', carga=carga)
+
+            self.mapa.quitar_capas('vehiculo')
+            colores = ['blue', 'orange', 'green', 'purple', 'brown', 'cyan', 'olive', 'magenta']
+            for i, camino in enumerate(caminos):
+                self.mapa.mostrar_ruta(f'vehiculo_{i}', camino, color=colores[i % len(colores)], ancho=2.0)
+            self.mapa.mostrar_nodos('mst_centro', [self.supply_center_id], color='red', tamano=80)
+            if self.ventanas_separadas_var.get():
+                from src.visualize_graph import plot_vehicle_routes
+                plot_vehicle_routes(self.graph_post_sismo, self.node_positions, self.supply_center_id,
+                                    caminos, resultado['costos'], resultado['cargas'])
+
+            status_msg = (f"Rutas de vehículos calculadas: {len(resultado['rutas'])} vehículos.\n"
+                          f"Distancia total: {resultado['costo_total']:.2f} metros.")
+            if resultado['sin_acceso']:
+                status_msg += f"\n{len(resultado['sin_acceso'])} refugios sin acceso desde el centro."
+            self.dist_status_label.config(text=f"Estado: {status_msg}")
+            messagebox.showinfo("Rutas Calculadas", status_msg)
+
+        except Exception as e:
+            messagebox.showerror("Error de Distribución", f"Ocurrió un error al calcular las rutas de vehículos: {e}")
+            self.dist_status_label.config(text="Estado: Error al calcular rutas de vehículos.")
+
     def _analyze_connectivity(self):
+        from src.graph_algorithms import analyze_post_earthquake_connectivity
+        from src.resilience_metrics import comparar_resiliencia
+
         if self.graph_post_sismo is None:
             messagebox.showwarning("Advertencia", "Primero construye el grafo y simula un sismo para analizar la conectividad.")
             return
@@ -398,6 +839,22 @@ class EarthquakeApp:
             self.largest_component_label.config(text=f"Nodos en Componente Principal: {num_largest_component}")
             self.isolated_nodes_label.config(text=f"Nodos Aislados o Desconectados: {num_isolated_nodes}")
 
+            # Degradación respecto de la red original: acceso exacto y eficiencia global muestreada
+            resiliencia = comparar_resiliencia(self.graph, self.graph_post_sismo, tipos_destino=('refugio', 'hospital'), num_muestras=30)
+            lineas = []
+            for tipo, acceso in resiliencia['acceso'].items():
+                post = acceso['post_sismo']
+                lineas.append(f"Población sin acceso a {tipo}: {post['poblacion_sin_acceso']} ({post['fraccion_sin_acceso']:.1%}), "
+                              f"distancia media ponderada: {post['distancia_media_ponderada']:.0f} m "
+                              f"(+{acceso['aumento_distancia_media']:.0f} m)")
+            perdida = resiliencia['perdida_eficiencia']
+            original = resiliencia['eficiencia_original']['estimacion']
+            if original:
+                bajo, alto = perdida['intervalo']
+                lineas.append(f"Pérdida de eficiencia global: {perdida['estimacion'] / original:.1%} "
+                              f"(IC 95%: {bajo / original:.1%} a {alto / original:.1%})")
+            self.resiliencia_label.config(text="\n".join(lineas))
+
             example_isolated_node = next(iter(isolated_nodes), "N/A")
             if example_isolated_node != "N/A":
                 messagebox.showinfo(
@@ -414,7 +871,11 @@ class EarthquakeApp:
                     f"No se identificaron nodos aislados significativos. La red está bien conectada."
                 )
 
-            plot_connectivity_analysis(self.graph_post_sismo, self.node_positions, largest_component_nodes, isolated_nodes)
+            self._exportar_resultado('escribir_componentes', [largest_component_nodes], resultado='componente_principal')
+            self.mapa.mostrar_nodos('aislados', isolated_nodes, color='red')
+            if self.ventanas_separadas_var.get():
+                from src.visualize_graph import plot_connectivity_analysis
+                plot_connectivity_analysis(self.graph_post_sismo, self.node_positions, largest_component_nodes, isolated_nodes)
 
             self.connectivity_status_label.config(text="Estado: Conectividad analizada y visualizada.")
 
@@ -422,6 +883,49 @@ class EarthquakeApp:
             messagebox.showerror("Error de Conectividad", f"Ocurrió un error al analizar la conectividad: {e}")
             self.connectivity_status_label.config(text="Estado: Error al analizar conectividad.")
 
+    def _calculate_service_areas(self):
+        from src.service_areas import areas_de_servicio, cobertura_por_instalacion
+
+        if self.graph_post_sismo is None:
+            messagebox.showwarning("Advertencia", "Primero construye el grafo y simula un sismo.")
+            return
+
+        tipo_destino_map = {
+            "Refugio": "refugio",
+            "Hospital": "hospital",
+            "Estacion de Rescate": "estacion_rescate",
+            "Centro de Salud": "centro_salud"
+        }
+        tipo_destino = tipo_destino_map.get(self.service_type_var.get(), "hospital")
+        instalaciones = [n for n, data in self.graph.nodes(data=True) if data.get('type') == 'critical_infra' and data.get('tipo') == tipo_destino]
+        if not instalaciones:
+            messagebox.showwarning("Advertencia", f"No hay instalaciones de tipo '{tipo_destino}' en el grafo simulado.")
+            return
+
+        try:
+            radio_max = self.service_radius_var.get()
+            self.service_status_label.config(text="Estado: Calculando áreas de servicio...")
+            self.master.update_idletasks()
+
+            propietario_sin_sismo, _ = areas_de_servicio(self.graph, instalaciones, radio_max)
+            propietario_con_sismo, _ = areas_de_servicio(self.graph_post_sismo, instalaciones, radio_max)
+            _, sin_cobertura_antes = cobertura_por_instalacion(self.graph, instalaciones, propietario_sin_sismo)
+            _, sin_cobertura_despues = cobertura_por_instalacion(self.graph_post_sismo, instalaciones, propietario_con_sismo)
+
+            self.mapa.mostrar_areas_servicio(propietario_con_sismo, instalaciones)
+            if self.ventanas_separadas_var.get():
+                from src.visualize_graph import plot_service_areas
+                plot_service_areas(self.graph, self.graph_post_sismo, self.node_positions, instalaciones,
+                                   propietario_sin_sismo, propietario_con_sismo, radio_max)
+
+            self.service_status_label.config(
+                text=f"Estado: Población sin cobertura a {radio_max:.0f}m: "
+                     f"{sin_cobertura_antes['poblacion']} (sin sismo) -> {sin_cobertura_despues['poblacion']} (con sismo)")
+
+        except Exception as e:
+            messagebox.showerror("Error de Cobertura", f"Ocurrió un error al calcular las áreas de servicio: {e}")
+            self.service_status_label.config(text="Estado: Error al calcular áreas de servicio.")
+
 
 if __name__ == "__main__":
     root = tk.Tk()
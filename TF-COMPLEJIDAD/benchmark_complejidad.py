@@ -0,0 +1,45 @@
+# benchmark_complejidad.py
+"""
+Valida la complejidad de los algoritmos propios (Dijkstra, Prim, Kruskal con Union-Find)
+contando sus operaciones sobre redes simuladas de tamaño creciente y comparándolas con la
+cota teórica. Falla con código 1 si una cota exacta se supera. Uso:
+
+    python benchmark_complejidad.py [--tamanos 10 20 40 80] [--semilla 1] [--grafico]
+"""
+import argparse
+import sys
+
+from src.operation_counts import TAMANOS_GRILLA, medir_operaciones, textos_cotas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conteo de operaciones vs. cota teórica.")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=list(TAMANOS_GRILLA),
+                        help="Nodos viales por lado de cada grilla simulada.")
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--grafico', action='store_true', help="Dibuja medido vs. cota con matplotlib.")
+    args = parser.parse_args()
+
+    filas = medir_operaciones(args.tamanos, args.semilla)
+    cotas = textos_cotas()
+
+    fallo = False
+    for algoritmo, texto in cotas.items():
+        print(f"\n{algoritmo} ({texto})")
+        print(f"{'V':>8} {'E':>8} {'medido':>10} {'cota':>10} {'razón':>7}")
+        for fila in filas:
+            if fila['algoritmo'] != algoritmo:
+                continue
+            print(f"{fila['nodos']:>8} {fila['aristas']:>8} {fila['medido']:>10} {fila['cota']:>10} {fila['razon']:>7.3f}")
+            if fila['cota_exacta'] and fila['razon'] > 1:
+                print("ERROR: las operaciones medidas superan la cota.")
+                fallo = True
+
+    if args.grafico:
+        from src.visualize_graph import plot_conteo_operaciones
+        plot_conteo_operaciones(filas, cotas)
+    sys.exit(1 if fallo else 0)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,79 @@
+# benchmark_startup.py
+"""
+Mide el tiempo de arranque de la interfaz en un intérprete nuevo (importar app_gui, crear la
+ventana y dibujarla) y falla con código 1 si supera el presupuesto. Uso:
+
+    python benchmark_startup.py [--presupuesto 0.5] [--repeticiones 5]
+
+Sin pantalla disponible (ej. servidor sin X) solo se mide la importación, y también se
+verifica que no se hayan cargado las librerías pesadas.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PRESUPUESTO_SEGUNDOS = 0.5
+
+# Librerías que no deben cargarse antes de que el usuario use una acción
+MODULOS_DIFERIDOS = ['networkx', 'pandas', 'geopandas', 'shapely', 'scipy', 'matplotlib']
+
+_SCRIPT_HIJO = r'''
+import json, sys, time
+inicio = time.perf_counter()
+import app_gui
+importado = time.perf_counter() - inicio
+ventana = None
+try:
+    root = app_gui.tk.Tk()
+    app = app_gui.EarthquakeApp(root)
+    root.update()
+    ventana = time.perf_counter() - inicio
+    root.destroy()
+except app_gui.tk.TclError:
+    pass
+cargados = [m for m in json.loads(sys.argv[1]) if m in sys.modules]
+print(json.dumps({"importacion": importado, "ventana": ventana, "cargados": cargados}))
+'''
+
+
+def medir_arranque():
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    salida = subprocess.run([sys.executable, '-c', _SCRIPT_HIJO, json.dumps(MODULOS_DIFERIDOS)],
+                            cwd=directorio, capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de la interfaz.")
+    parser.add_argument('--presupuesto', type=float, default=PRESUPUESTO_SEGUNDOS)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    mediciones = [medir_arranque() for _ in range(args.repeticiones)]
+    con_ventana = all(m['ventana'] is not None for m in mediciones)
+    clave = 'ventana' if con_ventana else 'importacion'
+    # La mediana evita que una sola corrida con la caché de disco fría decida el resultado
+    tiempos = sorted(m[clave] for m in mediciones)
+    mediana = tiempos[len(tiempos) // 2]
+    cargados = sorted({mod for m in mediciones for mod in m['cargados']})
+
+    if not con_ventana:
+        print("Sin pantalla disponible: se mide solo la importación de app_gui.")
+    print(f"Arranque ({clave}): mediana {mediana * 1000:.1f} ms, "
+          f"mín {tiempos[0] * 1000:.1f} ms, máx {tiempos[-1] * 1000:.1f} ms "
+          f"(presupuesto {args.presupuesto * 1000:.0f} ms)")
+
+    fallo = False
+    if mediana > args.presupuesto:
+        print("ERROR: el arranque supera el presupuesto.")
+        fallo = True
+    if cargados:
+        print(f"ERROR: librerías pesadas cargadas al arrancar: {', '.join(cargados)}")
+        fallo = True
+    sys.exit(1 if fallo else 0)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,290 @@
+# src/aftershock_timeline.py
+
+import heapq
+import numpy as np
+
+from src.dynamic_sssp import ArbolCaminosIncremental
+from src.dynamic_mst import MSTDistribucionDinamico
+
+INF = float('inf')
+
+# Eventos de la línea de tiempo: (tiempo_horas, tipo, vias), con tipo 'bloqueo' o 'reapertura'
+# y vias una lista de pares (u, v) de vías; se aplican en ambos sentidos.
+TIPOS_EVENTO = ('bloqueo', 'reapertura')
+
+# Parámetros por defecto de la secuencia de réplicas
+OMORI_C_HORAS = 0.5     # Retraso inicial de la ley de Omori-Utsu
+OMORI_P = 1.1           # Exponente de decaimiento
+GUTENBERG_RICHTER_B = 1.0
+DIFERENCIA_BATH = 1.2   # La mayor réplica suele ser ~1.2 grados menor que el sismo principal
+
+
+def generar_eventos_omori(simulador, epicentro, magnitud_sismo=7.5, horas=72.0, productividad=None,
+                          tiempo_medio_despeje_horas=24.0, dispersion_epicentro_grados=0.01,
+                          ley_atenuacion='mmi_generica', profundidad_km=10.0, semilla=None):
+    """
+    Genera la secuencia de eventos de un sismo principal con réplicas y despeje de vías:
+      - t=0: bloqueos del sismo principal (modelo de epicentro de SimuladorSismo).
+      - Réplicas con tasa de Omori-Utsu K/(c+t)^p y magnitudes de Gutenberg-Richter
+        acotadas por la ley de Båth; cada una bloquea vías alrededor de su epicentro.
+      - Cada vía bloqueada se reabre tras un tiempo de despeje exponencial.
+    Retorna la lista de eventos ordenada por tiempo.
+    """
+    rng = np.random.default_rng(semilla)
+    aristas = simulador._preparar_aristas_viales()
+    eventos = []
+    bloqueada_hasta = {}
+
+    def sismo(tiempo, centro, magnitud):
+        indices, probabilidades = simulador.probabilidades_bloqueo(centro, magnitud, ley_atenuacion, profundidad_km)
+        vias = []
+        for i in indices[rng.random(len(indices)) < probabilidades]:
+            if bloqueada_hasta.get(i, -INF) > tiempo:
+                continue
+            reapertura = tiempo + rng.exponential(tiempo_medio_despeje_horas)
+            bloqueada_hasta[i] = reapertura
+            via = (aristas['origenes'][i], aristas['destinos'][i])
+            vias.append(via)
+            if reapertura < horas:
+                eventos.append((reapertura, 'reapertura', [via]))
+        if vias:
+            eventos.append((tiempo, 'bloqueo', vias))
+
+    sismo(0.0, epicentro, magnitud_sismo)
+
+    magnitud_max = magnitud_sismo - DIFERENCIA_BATH
+    magnitud_min = magnitud_max - 2.0
+    if productividad is None:
+        # Total esperado de réplicas sobre magnitud_min: Gutenberg-Richter anclada en la
+        # mayor réplica (una sola sobre magnitud_max)
+        productividad = 10 ** (GUTENBERG_RICHTER_B * (magnitud_max - magnitud_min))
+    # Fracción de la integral de Omori-Utsu que cae en [0, horas] y muestreo de los
+    # tiempos por inversión de la acumulada
+    c, p = OMORI_C_HORAS, OMORI_P
+    acumulada_total = (c ** (1 - p) - (c + horas) ** (1 - p)) / (p - 1)
+    num_replicas = rng.poisson(productividad * acumulada_total / (c ** (1 - p) / (p - 1)))
+    u = rng.random(num_replicas)
+    tiempos = (c ** (1 - p) - u * acumulada_total * (p - 1)) ** (1 / (1 - p)) - c
+
+    for tiempo in np.sort(tiempos):
+        # Gutenberg-Richter truncada en [magnitud_min, magnitud_max]
+        rango = 1 - 10 ** (-GUTENBERG_RICHTER_B * (magnitud_max - magnitud_min))
+        magnitud = magnitud_min - np.log10(1 - rng.random() * rango) / GUTENBERG_RICHTER_B
+        centro = (epicentro[0] + rng.normal(0, dispersion_epicentro_grados),
+                  epicentro[1] + rng.normal(0, dispersion_epicentro_grados))
+        sismo(float(tiempo), centro, magnitud)
+
+    eventos.sort(key=lambda e: (e[0], TIPOS_EVENTO.index(e[1])))
+    return eventos
+
+
+class LineaTiempoSismo:
+    """
+    Estado de un escenario sísmico que evoluciona en el tiempo: un único grafo al que se le
+    aplican eventos de bloqueo y reapertura de vías. En cada paso se reparan de forma
+    incremental las tablas de instalación más cercana (ArbolCaminosIncremental) y las
+    componentes conexas de las aristas abiertas, con costo proporcional a lo que cambió.
+    """
+    def __init__(self, graph, tipos_destino=('refugio',), weight='weight'):
+        self.graph = graph.copy()
+        self.weight = weight
+        self.pesos_originales = {}
+        self.tiempo = 0.0
+        self.paso = 0
+
+        self.zonas = {n: data.get('poblacion', 0) for n, data in self.graph.nodes(data=True) if data.get('type') == 'populated_zone'}
+        self.tablas = {}
+        self.sin_acceso = {}
+        self.poblacion_sin_acceso = {}
+        for tipo in tipos_destino:
+            destinos = [n for n, data in self.graph.nodes(data=True) if data.get('type') == 'critical_infra' and data.get('tipo') == tipo]
+            self.tablas[tipo] = ArbolCaminosIncremental(self.graph, destinos, weight=weight)
+            self.sin_acceso[tipo] = {n for n in self.zonas if self.tablas[tipo].distancia.get(n, INF) == INF}
+            self.poblacion_sin_acceso[tipo] = sum(self.zonas[n] for n in self.sin_acceso[tipo])
+
+        self._calcular_componentes()
+        self.red_distribucion = None
+
+    def agregar_red_distribucion(self, supply_center_id, distribution_points_ids, mst_algorithm='kruskal_custom'):
+        """
+        Mantiene también la red de distribución (MSTDistribucionDinamico) entre el centro y
+        los puntos indicados: cada evento la repara y el resumen incluye su costo.
+        """
+        self.red_distribucion = MSTDistribucionDinamico(self.graph, supply_center_id, distribution_points_ids,
+                                                        mst_algorithm, self.weight)
+        return self.red_distribucion
+
+    # --- Componentes conexas sobre las aristas abiertas ---
+
+    def _vecinos_abiertos(self, x):
+        for y, data in self.graph.succ[x].items():
+            if data.get(self.weight, 1.0) != INF:
+                yield y
+        for y, data in self.graph.pred[x].items():
+            if data.get(self.weight, 1.0) != INF:
+                yield y
+
+    def _calcular_componentes(self):
+        self.componente = {}
+        self.miembros = {}
+        self._siguiente_id = 0
+        self._heap_tamanos = []
+        for n in self.graph.nodes():
+            if n not in self.componente:
+                self._nueva_componente(self._explorar(n))
+
+    def _explorar(self, inicio):
+        visitados = {inicio}
+        pila = [inicio]
+        while pila:
+            for y in self._vecinos_abiertos(pila.pop()):
+                if y not in visitados:
+                    visitados.add(y)
+                    pila.append(y)
+        return visitados
+
+    def _nueva_componente(self, nodos):
+        c = self._siguiente_id
+        self._siguiente_id += 1
+        self.miembros[c] = nodos
+        for n in nodos:
+            self.componente[n] = c
+        heapq.heappush(self._heap_tamanos, (-len(nodos), c))
+        return c
+
+    def _recorrido(self, inicio, visitados):
+        # Recorrido en profundidad que entrega cada nodo nuevo apenas lo descubre
+        pila = [inicio]
+        while pila:
+            for y in self._vecinos_abiertos(pila.pop()):
+                if y not in visitados:
+                    visitados.add(y)
+                    pila.append(y)
+                    yield y
+
+    def _separar_si_corresponde(self, u, v):
+        """
+        Tras cerrar la vía (u, v): recorridos intercalados desde u y desde v. Si se encuentran,
+        la componente sigue unida; si uno se agota, sus nodos forman una nueva componente.
+        El trabajo queda acotado por el tamaño del lado más pequeño.
+        """
+        if self.componente[u] != self.componente[v]:
+            return
+        visitados = ({u}, {v})
+        recorridos = (self._recorrido(u, visitados[0]), self._recorrido(v, visitados[1]))
+        while True:
+            for i in (0, 1):
+                y = next(recorridos[i], None)
+                if y is None:
+                    anterior = self.componente[u]
+                    self.miembros[anterior] -= visitados[i]
+                    heapq.heappush(self._heap_tamanos, (-len(self.miembros[anterior]), anterior))
+                    self._nueva_componente(visitados[i])
+                    return
+                if y in visitados[1 - i]:
+                    return
+
+    def _unir(self, u, v):
+        # Reapertura de (u, v): la componente menor se vuelve a etiquetar dentro de la mayor
+        cu, cv = self.componente[u], self.componente[v]
+        if cu == cv:
+            return
+        if len(self.miembros[cu]) < len(self.miembros[cv]):
+            cu, cv = cv, cu
+        for n in self.miembros[cv]:
+            self.componente[n] = cu
+        self.miembros[cu] |= self.miembros.pop(cv)
+        heapq.heappush(self._heap_tamanos, (-len(self.miembros[cu]), cu))
+
+    def tamano_componente_principal(self):
+        # Heap con borrado perezoso: se descartan entradas de componentes cambiadas o eliminadas
+        while self._heap_tamanos:
+            tamano, c = self._heap_tamanos[0]
+            if c in self.miembros and len(self.miembros[c]) == -tamano:
+                return -tamano
+            heapq.heappop(self._heap_tamanos)
+        return 0
+
+    # --- Eventos ---
+
+    def aplicar_evento(self, evento):
+        """Aplica un evento (tiempo, tipo, vias) al estado y retorna el resumen del paso."""
+        tiempo, tipo, vias = evento
+        if tipo not in TIPOS_EVENTO:
+            raise ValueError(f"Tipo de evento no reconocido. Use uno de: {', '.join(TIPOS_EVENTO)}.")
+
+        modificadas = []
+        vias_cambiadas = 0
+        for u, v in vias:
+            cambiadas = []
+            for a, b in ((u, v), (v, u)):
+                if not self.graph.has_edge(a, b):
+                    continue
+                data = self.graph[a][b]
+                if tipo == 'bloqueo' and (a, b) not in self.pesos_originales:
+                    self.pesos_originales[(a, b)] = data[self.weight]
+                    data[self.weight] = INF
+                    data['blocked'] = True
+                    cambiadas.append((a, b))
+                elif tipo == 'reapertura' and (a, b) in self.pesos_originales:
+                    data[self.weight] = self.pesos_originales.pop((a, b))
+                    data['blocked'] = False
+                    cambiadas.append((a, b))
+            if not cambiadas:
+                continue
+            # Las componentes se actualizan vía por vía: así cada cierre separa a lo más
+            # una componente en dos, justo los dos lados que exploran los recorridos
+            if tipo == 'bloqueo':
+                self._separar_si_corresponde(u, v)
+            else:
+                self._unir(u, v)
+            modificadas.extend(cambiadas)
+            vias_cambiadas += 1
+
+        nodos_reasentados = 0
+        for tipo_destino, tabla in self.tablas.items():
+            tabla.reparar(self.graph, modificadas)
+            nodos_reasentados += tabla.nodos_reasentados
+            sin_acceso = self.sin_acceso[tipo_destino]
+            for n in tabla.nodos_modificados:
+                if n not in self.zonas:
+                    continue
+                if tabla.distancia.get(n, INF) == INF and n not in sin_acceso:
+                    sin_acceso.add(n)
+                    self.poblacion_sin_acceso[tipo_destino] += self.zonas[n]
+                elif tabla.distancia.get(n, INF) < INF and n in sin_acceso:
+                    sin_acceso.discard(n)
+                    self.poblacion_sin_acceso[tipo_destino] -= self.zonas[n]
+        if self.red_distribucion is not None:
+            self.red_distribucion.actualizar(self.graph, modificadas)
+            nodos_reasentados += self.red_distribucion.nodos_reasentados
+
+        self.tiempo = tiempo
+        self.paso += 1
+        return self.resumen(tipo, vias_cambiadas, nodos_reasentados)
+
+    def resumen(self, tipo_evento=None, vias_cambiadas=0, nodos_reasentados=0):
+        principal = self.tamano_componente_principal()
+        resumen = {
+            'paso': self.paso,
+            'tiempo_horas': self.tiempo,
+            'evento': tipo_evento,
+            'vias_cambiadas': vias_cambiadas,
+            'aristas_bloqueadas': len(self.pesos_originales),
+            'num_componentes': len(self.miembros),
+            'tamano_componente_principal': principal,
+            'nodos_fuera_componente_principal': self.graph.number_of_nodes() - principal,
+            'nodos_reasentados': nodos_reasentados,
+        }
+        for tipo_destino, sin_acceso in self.sin_acceso.items():
+            resumen[f'zonas_sin_acceso_{tipo_destino}'] = len(sin_acceso)
+            resumen[f'poblacion_sin_acceso_{tipo_destino}'] = self.poblacion_sin_acceso[tipo_destino]
+        if self.red_distribucion is not None:
+            resumen['costo_red_distribucion'] = self.red_distribucion.aristas_mst()[1]
+            resumen['aristas_red_reemplazadas'] = self.red_distribucion.aristas_reemplazadas
+        return resumen
+
+    def ejecutar(self, eventos):
+        """Aplica los eventos en orden y entrega (generador) el resumen de cada paso."""
+        for evento in eventos:
+            yield self.aplicar_evento(evento)
\ No newline at end of file
@@ -0,0 +1,218 @@
+# src/alternative_routes.py
+
+import heapq
+from itertools import count
+
+from src.dynamic_sssp import ArbolCaminosIncremental
+
+INF = float('inf')
+
+
+def _peso(graph, u, v, weight='weight'):
+    return graph[u][v].get(weight, 1.0)
+
+
+def costo_ruta(graph, path, weight='weight'):
+    return sum(_peso(graph, path[i], path[i + 1], weight) for i in range(len(path) - 1))
+
+
+def _spur_desde_arbol(graph, arbol, spur, aristas_removidas, nodos_removidos, weight):
+    """
+    Intenta resolver la búsqueda spur sin buscar: toma el vecino permitido v que minimiza
+    w(spur, v) + dist(v, destino). Ese valor es una cota inferior de cualquier ruta spur,
+    así que si la ruta del árbol desde v no toca nodos removidos (ni vuelve al spur), es óptima.
+    """
+    mejor, mejor_v = INF, None
+    for v, data in graph.succ[spur].items():
+        if v in nodos_removidos or (spur, v) in aristas_removidas:
+            continue
+        candidato = data.get(weight, 1.0) + arbol.distancia.get(v, INF)
+        if candidato < mejor:
+            mejor, mejor_v = candidato, v
+    if mejor_v is None:
+        return [], INF
+    tramo = arbol.ruta(mejor_v)[0]
+    if spur in tramo or nodos_removidos.intersection(tramo):
+        return None, INF
+    return [spur] + tramo, mejor
+
+
+def _a_estrella_spur(graph, spur, destino, aristas_removidas, nodos_removidos, cota, weight, estadisticas):
+    """
+    A* desde el nodo spur hasta el destino sin las aristas/nodos removidos. La cota es la
+    distancia exacta al destino en el grafo completo: al remover elementos las distancias
+    solo crecen, así que sigue siendo admisible y consistente.
+    """
+    contador = count()
+    g = {spur: 0.0}
+    padre = {spur: None}
+    cerrados = set()
+    heap = [(cota.get(spur, INF), next(contador), spur)]
+    while heap:
+        _, _, u = heapq.heappop(heap)
+        if u in cerrados:
+            continue
+        cerrados.add(u)
+        estadisticas['nodos_asentados'] += 1
+        if u == destino:
+            path = [u]
+            while padre[path[-1]] is not None:
+                path.append(padre[path[-1]])
+            return path[::-1], g[u]
+        for v, data in graph.succ[u].items():
+            w = data.get(weight, 1.0)
+            if w == INF or v in nodos_removidos or v in cerrados or (u, v) in aristas_removidas:
+                continue
+            h = cota.get(v, INF)
+            if h == INF:
+                continue
+            nd = g[u] + w
+            if nd < g.get(v, INF):
+                g[v] = nd
+                padre[v] = u
+                heapq.heappush(heap, (nd + h, next(contador), v))
+    return None, INF
+
+
+def k_rutas_mas_cortas(graph, origen, destino, k=5, weight='weight', estadisticas=None):
+    """
+    Las k rutas simples más cortas de 'origen' a 'destino' (algoritmo de Yen), ignorando
+    aristas bloqueadas (peso inf). Retorna una lista de (ruta, costo) ordenada por costo.
+
+    El árbol de caminos mínimos hacia el destino se calcula una sola vez y se reutiliza en
+    todas las búsquedas spur: casi siempre la mejor desviación sigue después la ruta del
+    árbol y se obtiene sin buscar; si no, el árbol sirve como cota exacta para un A*
+    acotado. Así, k rutas cuestan un múltiplo pequeño de una sola búsqueda.
+    Si se pasa un diccionario 'estadisticas', se acumulan los contadores de trabajo.
+    """
+    if estadisticas is None:
+        estadisticas = {}
+    for clave in ('busquedas_spur', 'spur_desde_arbol', 'nodos_asentados'):
+        estadisticas.setdefault(clave, 0)
+
+    arbol = ArbolCaminosIncremental(graph, [destino], hacia_fuentes=True, weight=weight)
+    estadisticas['nodos_asentados'] += arbol.nodos_reasentados
+    if arbol.distancia.get(origen, INF) == INF:
+        return []
+    cota = arbol.distancia
+
+    primera, _, costo = arbol.ruta(origen)
+    rutas = [(primera, costo)]
+    candidatas = []
+    vistas = {tuple(primera)}
+    desempate = count()
+
+    while len(rutas) < k:
+        anterior = rutas[-1][0]
+        costo_raiz = 0.0
+        for j in range(len(anterior) - 1):
+            spur = anterior[j]
+            raiz = anterior[:j + 1]
+            aristas_removidas = {(p[j], p[j + 1]) for p, _ in rutas if len(p) > j + 1 and p[:j + 1] == raiz}
+            nodos_removidos = set(raiz[:-1])
+
+            tramo, costo_spur = _spur_desde_arbol(graph, arbol, spur, aristas_removidas, nodos_removidos, weight)
+            if tramo is not None:
+                estadisticas['spur_desde_arbol'] += 1
+            else:
+                tramo, costo_spur = _a_estrella_spur(graph, spur, destino, aristas_removidas, nodos_removidos, cota, weight, estadisticas)
+                estadisticas['busquedas_spur'] += 1
+
+            if tramo:
+                ruta = raiz[:-1] + tramo
+                if tuple(ruta) not in vistas:
+                    vistas.add(tuple(ruta))
+                    heapq.heappush(candidatas, (costo_raiz + costo_spur, next(desempate), ruta))
+            costo_raiz += _peso(graph, anterior[j], anterior[j + 1], weight)
+
+        if not candidatas:
+            break
+        costo, _, ruta = heapq.heappop(candidatas)
+        rutas.append((ruta, costo))
+
+    return rutas
+
+
+def rutas_disjuntas_suurballe(graph, origen, destino, k=2, weight='weight', solo_vias=True, estadisticas=None):
+    """
+    Hasta k rutas de 'origen' a 'destino' que no comparten vías, con costo total mínimo
+    (Suurballe generalizado: caminos aumentantes sucesivos sobre el grafo residual con
+    costos reducidos por potenciales, cada uno con Dijkstra).
+    Con solo_vias=True las aristas de acceso (manzana/instalación <-> red vial) pueden
+    compartirse, ya que cada punto tiene un único acceso; solo las vías deben ser disjuntas.
+    Una vía usada en un sentido no se usa en el contrario, ya que el flujo opuesto se cancela.
+    Retorna una lista de (ruta, costo) ordenada por costo.
+    """
+    if estadisticas is None:
+        estadisticas = {}
+    estadisticas.setdefault('nodos_asentados', 0)
+    estadisticas.setdefault('busquedas', 0)
+
+    potencial = {}
+    flujo = {} # Unidades de flujo por arista dirigida
+
+    def capacidad(data):
+        return k if solo_vias and data.get('type') != 'road' else 1
+
+    def residuales(x):
+        for y, data in graph.succ[x].items():
+            w = data.get(weight, 1.0)
+            cap = capacidad(data)
+            if w != INF and flujo.get((x, y), 0) < cap and (cap > 1 or not flujo.get((y, x))):
+                yield y, w
+        for y in graph.pred[x]:
+            if flujo.get((y, x)):
+                yield y, -graph[y][x].get(weight, 1.0)
+
+    for _ in range(k):
+        distancia = {origen: 0.0}
+        padre = {origen: None}
+        cerrados = set()
+        heap = [(0.0, origen)]
+        estadisticas['busquedas'] += 1
+        while heap:
+            d, x = heapq.heappop(heap)
+            if x in cerrados:
+                continue
+            cerrados.add(x)
+            estadisticas['nodos_asentados'] += 1
+            for y, w in residuales(x):
+                if y in cerrados:
+                    continue
+                nd = d + w + potencial.get(x, 0.0) - potencial.get(y, 0.0)
+                if nd < distancia.get(y, INF):
+                    distancia[y] = nd
+                    padre[y] = x
+                    heapq.heappush(heap, (nd, y))
+
+        if destino not in cerrados:
+            break
+
+        # Actualizar potenciales; los nodos no alcanzados reciben la mayor distancia
+        maximo = max(distancia[x] for x in cerrados)
+        for x in graph:
+            potencial[x] = potencial.get(x, 0.0) + (distancia[x] if x in cerrados else maximo)
+
+        # Aumentar flujo: si el paso usó una arista residual inversa, se cancela el flujo existente
+        x = destino
+        while padre[x] is not None:
+            p = padre[x]
+            w_directa = graph[p][x].get(weight, 1.0) if graph.has_edge(p, x) else INF
+            w_inversa = -graph[x][p].get(weight, 1.0) if flujo.get((x, p)) else INF
+            if w_inversa < w_directa:
+                flujo[(x, p)] -= 1
+            else:
+                flujo[(p, x)] = flujo.get((p, x), 0) + 1
+            x = p
+
+    # Descomponer el flujo en rutas desde el origen
+    salientes = {}
+    for (u, v), unidades in flujo.items():
+        salientes.setdefault(u, []).extend([v] * unidades)
+    rutas = []
+    while salientes.get(origen):
+        ruta = [origen]
+        while ruta[-1] != destino:
+            ruta.append(salientes[ruta[-1]].pop())
+        rutas.append((ruta, costo_ruta(graph, ruta, weight)))
+    return sorted(rutas, key=lambda r: r[1])
\ No newline at end of file
@@ -0,0 +1,306 @@
+# src/backends.py
+
+import heapq
+import weakref
+import numpy as np
+import networkx as nx
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra, connected_components, minimum_spanning_tree, bellman_ford, NegativeCycleError
+
+# Motores disponibles para los algoritmos de grafos:
+#   'networkx' -> implementación original sobre el nx.Graph/nx.DiGraph
+#   'scipy'    -> scipy.sparse.csgraph sobre una matriz CSR
+#   'arrays'   -> motor propio sobre arreglos CSR (NumPy + heapq), base para código compilado
+BACKENDS = ('networkx', 'scipy', 'arrays')
+
+_backend_global = 'networkx'
+_cache_conversiones = weakref.WeakKeyDictionary()
+
+
+def set_backend(nombre):
+    """Define el motor usado por defecto en graph_algorithms y graph_operations."""
+    global _backend_global
+    _backend_global = resolver_backend(nombre)
+
+
+def get_backend():
+    return _backend_global
+
+
+def resolver_backend(backend=None):
+    backend = _backend_global if backend is None else backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend no reconocido. Use uno de: {', '.join(BACKENDS)}.")
+    return backend
+
+
+class GrafoIndexado:
+    """
+    Representación en arreglos de un grafo de NetworkX: nodos indexados 0..n-1 y
+    aristas dirigidas en formato CSR (los grafos no dirigidos aportan ambos sentidos).
+    """
+    def __init__(self, graph, weight='weight'):
+        self.ids = list(graph.nodes())
+        self.indice = {n: i for i, n in enumerate(self.ids)}
+        self.dirigido = graph.is_directed()
+        self.huella = huella_grafo(graph)
+
+        origen, destino, pesos = [], [], []
+        for u, v, data in graph.edges(data=True):
+            w = data.get(weight, 1.0)
+            origen.append(self.indice[u])
+            destino.append(self.indice[v])
+            pesos.append(w)
+            if not self.dirigido and u != v:
+                origen.append(self.indice[v])
+                destino.append(self.indice[u])
+                pesos.append(w)
+
+        n = len(self.ids)
+        origen = np.asarray(origen, dtype=np.int32)
+        orden = np.argsort(origen, kind='stable')
+        self.origen = origen[orden]
+        self.destino = np.asarray(destino, dtype=np.int32)[orden]
+        self.pesos = np.asarray(pesos, dtype=np.float64)[orden]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.origen, minlength=n), out=self.indptr[1:])
+        self.matriz = csr_matrix((self.pesos, self.destino, self.indptr), shape=(n, n))
+
+    def ruta_desde_predecesores(self, predecesores, origen, destino):
+        path = [destino]
+        while path[-1] != origen:
+            path.append(predecesores[path[-1]])
+        return [self.ids[i] for i in reversed(path)]
+
+
+def huella_grafo(graph):
+    """
+    Clave de vigencia de las cachés por grafo: número de nodos, número de aristas y versión
+    de pesos (graph.graph['version_pesos'], que invalidar_cache incrementa).
+    """
+    return (graph.number_of_nodes(), graph.number_of_edges(), graph.graph.get('version_pesos', 0))
+
+
+def convertir(graph, weight='weight'):
+    """
+    Retorna la representación en arreglos del grafo, convirtiéndolo una sola vez.
+    La conversión se guarda en caché mientras el grafo exista y no cambie su huella
+    (huella_grafo); si se modifican pesos en sitio, llamar a invalidar_cache(graph).
+    """
+    clave = (weight,)
+    por_grafo = _cache_conversiones.setdefault(graph, {})
+    indexado = por_grafo.get(clave)
+    if indexado is None or indexado.huella != huella_grafo(graph):
+        indexado = GrafoIndexado(graph, weight)
+        por_grafo[clave] = indexado
+    return indexado
+
+
+def invalidar_cache(graph):
+    """
+    Descarta la conversión guardada del grafo y avanza su versión de pesos, con lo que
+    también quedan vencidas las demás cachés que usan huella_grafo (tablas de rutas
+    confiables, matrices de distancias de vehicle_routing).
+    """
+    _cache_conversiones.pop(graph, None)
+    graph.graph['version_pesos'] = graph.graph.get('version_pesos', 0) + 1
+
+
+# --- Motor propio sobre arreglos ---
+
+def _dijkstra_arreglos(g, fuente, destino=None, estadisticas=None):
+    pushes = 1 # Único contador del ciclo; el resto se deduce al final si se piden estadísticas
+    n = len(g.ids)
+    distancia = np.full(n, np.inf)
+    predecesor = np.full(n, -1, dtype=np.int64)
+    asentado = np.zeros(n, dtype=bool)
+    distancia[fuente] = 0.0
+    heap = [(0.0, fuente)]
+    indptr, vecinos, pesos = g.indptr, g.destino, g.pesos
+    while heap:
+        d, u = heapq.heappop(heap)
+        if asentado[u]:
+            continue
+        asentado[u] = True
+        if u == destino:
+            break
+        for k in range(indptr[u], indptr[u + 1]):
+            v = vecinos[k]
+            nd = d + pesos[k]
+            if nd < distancia[v]:
+                distancia[v] = nd
+                predecesor[v] = u
+                heapq.heappush(heap, (nd, v))
+                pushes += 1
+    if estadisticas is not None:
+        # Lo que sigue en el heap nunca se extrajo; el destino se asienta pero no se relaja
+        pops = pushes - len(heap)
+        asentados = int(asentado.sum())
+        relajadas = int(np.diff(indptr)[asentado].sum())
+        if destino is not None and asentado[destino]:
+            relajadas -= int(indptr[destino + 1] - indptr[destino])
+        estadisticas.update({'heap_push': pushes, 'heap_pop': pops, 'entradas_obsoletas': pops - asentados,
+                             'aristas_relajadas': relajadas, 'nodos_asentados': asentados})
+    return distancia, predecesor
+
+
+def _componentes_arreglos(g):
+    # Propagación de la etiqueta mínima con saltos de puntero, ignorando el sentido de las aristas
+    etiquetas = np.arange(len(g.ids))
+    while True:
+        anteriores = etiquetas.copy()
+        minimo = np.minimum(etiquetas[g.origen], etiquetas[g.destino])
+        np.minimum.at(etiquetas, g.origen, minimo)
+        np.minimum.at(etiquetas, g.destino, minimo)
+        etiquetas = etiquetas[etiquetas]
+        if np.array_equal(etiquetas, anteriores):
+            return etiquetas
+
+
+def _bellman_ford_arreglos(g, fuente):
+    n = len(g.ids)
+    distancia = np.full(n, np.inf)
+    predecesor = np.full(n, -1, dtype=np.int64)
+    distancia[fuente] = 0.0
+    for _ in range(n):
+        candidata = distancia[g.origen] + g.pesos
+        mejora = candidata < distancia[g.destino]
+        if not mejora.any():
+            return distancia, predecesor
+        # Para cada destino, la arista con la mejor candidata de esta ronda
+        orden = np.lexsort((candidata[mejora], g.destino[mejora]))
+        destinos = g.destino[mejora][orden]
+        primeros = np.r_[True, destinos[1:] != destinos[:-1]]
+        elegidas = np.flatnonzero(mejora)[orden][primeros]
+        distancia[g.destino[elegidas]] = candidata[elegidas]
+        predecesor[g.destino[elegidas]] = g.origen[elegidas]
+    raise nx.NetworkXUnbounded("Ciclo de peso negativo detectado.")
+
+
+def _kruskal_arreglos(g):
+    # Kruskal con Union-Find sobre enteros; en grafos no dirigidos se toma un solo sentido
+    if g.dirigido:
+        candidatas = np.arange(len(g.origen))
+    else:
+        candidatas = np.flatnonzero(g.origen <= g.destino)
+    orden = candidatas[np.argsort(g.pesos[candidatas], kind='stable')]
+    padre = np.arange(len(g.ids))
+
+    def find(i):
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    elegidas = []
+    for k in orden:
+        ru, rv = find(g.origen[k]), find(g.destino[k])
+        if ru != rv:
+            padre[ru] = rv
+            elegidas.append(k)
+    return elegidas
+
+
+# --- Primitivas despachadas por backend ---
+
+def distancias_desde(graph, fuente, backend=None, weight='weight'):
+    """Distancias mínimas desde 'fuente' a los nodos alcanzables: {nodo: distancia}."""
+    backend = resolver_backend(backend)
+    if backend == 'networkx':
+        return nx.single_source_dijkstra_path_length(graph, fuente, weight=weight)
+
+    g = convertir(graph, weight)
+    if backend == 'scipy':
+        distancia = dijkstra(g.matriz, directed=True, indices=g.indice[fuente])
+    else:
+        distancia, _ = _dijkstra_arreglos(g, g.indice[fuente])
+    alcanzados = np.flatnonzero(np.isfinite(distancia))
+    return {g.ids[i]: float(distancia[i]) for i in alcanzados}
+
+
+def ruta_dijkstra(graph, origen, destinos, backend=None, weight='weight', estadisticas=None):
+    """
+    Ruta mínima desde 'origen' al destino más cercano de la lista.
+    Retorna (ruta, destino, distancia) o ([], None, inf) si ninguno es alcanzable.
+    'estadisticas' (diccionario) recibe los contadores de operaciones; solo el motor 'arrays' los produce.
+    """
+    backend = resolver_backend(backend)
+    if estadisticas is not None and backend != 'arrays':
+        print(f"Advertencia: el motor '{backend}' no expone contadores de operaciones; use 'arrays'.")
+    if backend == 'networkx':
+        lengths, paths = nx.single_source_dijkstra(graph, source=origen, weight=weight)
+        candidatos = [(lengths[t], i, t) for i, t in enumerate(destinos) if t in lengths and lengths[t] < float('inf')]
+        if not candidatos:
+            return [], None, float('inf')
+        distancia, _, destino = min(candidatos)
+        return paths[destino], destino, distancia
+
+    g = convertir(graph, weight)
+    fuente = g.indice[origen]
+    if backend == 'scipy':
+        distancia, predecesor = dijkstra(g.matriz, directed=True, indices=fuente, return_predecessors=True)
+    else:
+        distancia, predecesor = _dijkstra_arreglos(g, fuente, estadisticas=estadisticas)
+    candidatos = [(distancia[g.indice[t]], i, t) for i, t in enumerate(destinos) if t in g.indice and np.isfinite(distancia[g.indice[t]])]
+    if not candidatos:
+        return [], None, float('inf')
+    d, _, destino = min(candidatos)
+    return g.ruta_desde_predecesores(predecesor, fuente, g.indice[destino]), destino, float(d)
+
+
+def componentes_debiles(graph, backend=None):
+    """Componentes conexas (débilmente conexas si el grafo es dirigido), como lista de conjuntos."""
+    backend = resolver_backend(backend)
+    if backend == 'networkx':
+        if graph.is_directed():
+            return list(nx.weakly_connected_components(graph))
+        return list(nx.connected_components(graph))
+
+    g = convertir(graph)
+    if backend == 'scipy':
+        _, etiquetas = connected_components(g.matriz, directed=True, connection='weak')
+    else:
+        etiquetas = _componentes_arreglos(g)
+    componentes = {}
+    for i, etiqueta in enumerate(etiquetas.tolist()):
+        componentes.setdefault(etiqueta, set()).add(g.ids[i])
+    return list(componentes.values())
+
+
+def aristas_mst(graph, backend=None, weight='weight'):
+    """Aristas (u, v, {'weight': w}) del árbol/bosque de expansión mínima."""
+    backend = resolver_backend(backend)
+    if backend == 'networkx':
+        return list(nx.tree.minimum_spanning_edges(graph, weight=weight, data=True))
+
+    g = convertir(graph, weight)
+    if backend == 'scipy':
+        # csgraph trata la matriz como no dirigida
+        arbol = minimum_spanning_tree(g.matriz).tocoo()
+        return [(g.ids[u], g.ids[v], {weight: float(w)}) for u, v, w in zip(arbol.row, arbol.col, arbol.data)]
+    return [(g.ids[g.origen[k]], g.ids[g.destino[k]], {weight: float(g.pesos[k])}) for k in _kruskal_arreglos(g)]
+
+
+def ruta_bellman_ford(graph, origen, destino, backend=None, weight='weight'):
+    """
+    Ruta mínima con Bellman-Ford (admite pesos negativos). Retorna (ruta, costo);
+    lanza nx.NetworkXNoPath si no hay ruta y nx.NetworkXUnbounded ante un ciclo negativo.
+    """
+    backend = resolver_backend(backend)
+    if backend == 'networkx':
+        path = nx.bellman_ford_path(graph, source=origen, target=destino, weight=weight)
+        cost = nx.bellman_ford_path_length(graph, source=origen, target=destino, weight=weight)
+        return path, cost
+
+    g = convertir(graph, weight)
+    fuente, objetivo = g.indice[origen], g.indice[destino]
+    if backend == 'scipy':
+        try:
+            distancia, predecesor = bellman_ford(g.matriz, directed=True, indices=fuente, return_predecessors=True)
+        except NegativeCycleError:
+            raise nx.NetworkXUnbounded("Ciclo de peso negativo detectado.")
+    else:
+        distancia, predecesor = _bellman_ford_arreglos(g, fuente)
+    if not np.isfinite(distancia[objetivo]):
+        raise nx.NetworkXNoPath(f"No hay ruta entre {origen} y {destino}.")
+    return g.ruta_desde_predecesores(predecesor, fuente, objetivo), float(distancia[objetivo])
\ No newline at end of file
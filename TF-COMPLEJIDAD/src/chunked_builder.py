@@ -0,0 +1,187 @@
+# src/chunked_builder.py
+
+import os
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from src.columnar_graph import (
+    GrafoColumnar, codificar_serie, SIN_CATEGORIA,
+    TIPOS_NODO, TIPOS_ARISTA, TIPOS_VIA, RIESGOS_SISMICOS, TIPOS_INFRA, ATRIBUTOS_ZONA
+)
+
+TAMANO_LOTE = 100000
+
+
+def leer_lotes(fuente, tamano_lote=TAMANO_LOTE):
+    """
+    Entrega (generador) la tabla 'fuente' en DataFrames de a lo más 'tamano_lote' filas.
+    'fuente' puede ser la ruta de un archivo .csv o .parquet (se lee por partes, sin cargarlo
+    entero; Parquet requiere pyarrow), un DataFrame/GeoDataFrame o un iterable de DataFrames.
+    """
+    if isinstance(fuente, (str, os.PathLike)):
+        ruta = os.fspath(fuente)
+        if ruta.lower().endswith('.parquet'):
+            from src.export_results import _importar_pyarrow
+            _, pq = _importar_pyarrow()
+            for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_lote):
+                yield lote.to_pandas()
+        elif ruta.lower().endswith('.csv'):
+            yield from pd.read_csv(ruta, chunksize=tamano_lote)
+        else:
+            raise ValueError(f"Formato de archivo no reconocido: {ruta}. Use uno de: .csv, .parquet.")
+    elif isinstance(fuente, pd.DataFrame):
+        for inicio in range(0, len(fuente), tamano_lote):
+            yield fuente.iloc[inicio:inicio + tamano_lote]
+    else:
+        for lote in fuente:
+            yield from leer_lotes(lote, tamano_lote)
+
+
+class ArregloCreciente:
+    """
+    Arreglo 1-D que crece por lotes (duplicando su capacidad). Si se da 'ruta', vive en un
+    archivo mapeado en memoria (np.memmap) y el sistema operativo decide qué páginas quedan
+    en RAM; si no, es un arreglo de NumPy común.
+    """
+    def __init__(self, dtype, ruta=None, capacidad_inicial=1024):
+        self.dtype = np.dtype(dtype)
+        self.ruta = ruta
+        self.tamano = 0
+        self._datos = self._reservar(capacidad_inicial, nuevo=True)
+
+    def _reservar(self, capacidad, nuevo=False):
+        if self.ruta is None:
+            datos = np.empty(capacidad, dtype=self.dtype)
+            if not nuevo:
+                datos[:self.tamano] = self._datos[:self.tamano]
+            return datos
+        if not nuevo:
+            self._datos.flush()
+            del self._datos
+        with open(self.ruta, 'wb' if nuevo else 'r+b') as archivo:
+            archivo.truncate(capacidad * self.dtype.itemsize)
+        return np.memmap(self.ruta, dtype=self.dtype, mode='r+', shape=(capacidad,))
+
+    def agregar(self, valores):
+        valores = np.asarray(valores, dtype=self.dtype)
+        fin = self.tamano + len(valores)
+        if fin > len(self._datos):
+            self._datos = self._reservar(max(fin, 2 * len(self._datos)))
+        self._datos[self.tamano:fin] = valores
+        self.tamano = fin
+
+    def arreglo(self):
+        """Vista de los elementos agregados (sin copiar)."""
+        return self._datos[:self.tamano]
+
+
+def _coordenadas(lote):
+    # GeoDataFrame (geometry), columnas lon/lat o longitud/latitud, como en data_simulator
+    if 'geometry' in lote.columns:
+        return lote.geometry.x.to_numpy(dtype=np.float64), lote.geometry.y.to_numpy(dtype=np.float64)
+    if 'lon' in lote.columns:
+        return lote['lon'].to_numpy(dtype=np.float64), lote['lat'].to_numpy(dtype=np.float64)
+    return lote['longitud'].to_numpy(dtype=np.float64), lote['latitud'].to_numpy(dtype=np.float64)
+
+
+def build_columnar_graph_por_lotes(fuente_vial_nodes, fuente_vias, fuente_infra, fuente_zonas, riesgo_ponderacion,
+                                   tamano_lote=TAMANO_LOTE, directorio=None):
+    """
+    Construye el mismo GrafoColumnar que build_columnar_graph leyendo las tablas por lotes
+    (ver leer_lotes), sin tener ninguna tabla completa en memoria:
+      1. Nodos viales: IDs y coordenadas; con ellos se arma el índice de IDs y el KD-tree.
+      2. Vías: cada lote se traduce a índices y registros; se descartan las vías cuyos
+         extremos no son nodos viales.
+      3. Infraestructura y zonas: cada lote se conecta a la red consultando el KD-tree.
+    Las columnas de nodos y registros se escriben en arreglos crecientes; con 'directorio'
+    son archivos mapeados en memoria, así el pico de memoria queda en un múltiplo pequeño
+    del grafo final.
+    """
+    categorias = {'tipo_nodo': list(TIPOS_NODO), 'tipo_arista': list(TIPOS_ARISTA), 'tipo_via': list(TIPOS_VIA),
+                  'riesgo_sismico': list(RIESGOS_SISMICOS), 'tipo_infra': list(TIPOS_INFRA)}
+    if directorio is not None:
+        os.makedirs(directorio, exist_ok=True)
+
+    def columna(nombre, dtype):
+        return ArregloCreciente(dtype, os.path.join(directorio, nombre + '.bin') if directorio is not None else None)
+
+    lon, lat = columna('lon', np.float64), columna('lat', np.float64)
+    tipo_nodo, tipo_infra, fila_zona = columna('tipo_nodo', np.int8), columna('tipo_infra', np.int8), columna('fila_zona', np.int32)
+    atributos_zona = {attr: columna('zona_' + attr, np.float64) for attr in ATRIBUTOS_ZONA}
+    reg_origen, reg_destino = columna('reg_origen', np.int32), columna('reg_destino', np.int32)
+    reg_peso, reg_longitud = columna('reg_peso', np.float64), columna('reg_longitud', np.float64)
+    reg_tipo, reg_tipo_via, reg_riesgo = columna('reg_tipo', np.int8), columna('reg_tipo_via', np.int8), columna('reg_riesgo', np.int8)
+    ids = [] # Un arreglo de textos por lote; se concatenan al final
+
+    def agregar_nodos(lote_ids, lote_lon, lote_lat, codigo_tipo, codigos_infra=None):
+        ids.append(np.asarray(lote_ids, dtype=str))
+        lon.agregar(lote_lon)
+        lat.agregar(lote_lat)
+        tipo_nodo.agregar(np.full(len(lote_ids), codigo_tipo, dtype=np.int8))
+        tipo_infra.agregar(codigos_infra if codigos_infra is not None else np.full(len(lote_ids), SIN_CATEGORIA, dtype=np.int8))
+
+    # 1. Nodos viales
+    for lote in leer_lotes(fuente_vial_nodes, tamano_lote):
+        agregar_nodos(lote['node_id'].to_numpy(), lote['lon'].to_numpy(), lote['lat'].to_numpy(), 0)
+    num_vial = lon.tamano
+    fila_zona.agregar(np.full(num_vial, -1, dtype=np.int32))
+    indice_vial = pd.Index(np.concatenate(ids) if ids else np.empty(0, dtype=str))
+    kdtree = cKDTree(np.column_stack((lon.arreglo(), lat.arreglo())))
+
+    # 2. Vías (ambos extremos deben ser nodos viales)
+    codigo_road = categorias['tipo_arista'].index('road')
+    for lote in leer_lotes(fuente_vias, tamano_lote):
+        origen = indice_vial.get_indexer(lote['origen'])
+        destino = indice_vial.get_indexer(lote['destino'])
+        validas = (origen >= 0) & (destino >= 0)
+        vias = lote[validas]
+        longitud = vias['longitud'].to_numpy(dtype=np.float64)
+        factor = vias['riesgo_sismico_zona'].map(riesgo_ponderacion).fillna(1.0).to_numpy(dtype=np.float64)
+        reg_origen.agregar(origen[validas])
+        reg_destino.agregar(destino[validas])
+        reg_peso.agregar(longitud * factor)
+        reg_longitud.agregar(longitud)
+        reg_tipo.agregar(np.full(len(vias), codigo_road, dtype=np.int8))
+        reg_tipo_via.agregar(codificar_serie(vias['tipo_via'], categorias['tipo_via']))
+        reg_riesgo.agregar(codificar_serie(vias['riesgo_sismico_zona'], categorias['riesgo_sismico']))
+
+    # 3. Infraestructura crítica y zonas pobladas, conectadas por lote al nodo vial más cercano
+    codigo_access = categorias['tipo_arista'].index('access')
+
+    def agregar_accesos(lote_lon, lote_lat):
+        primero = lon.tamano - len(lote_lon)
+        distancias, cercanos = kdtree.query(np.column_stack((lote_lon, lote_lat)))
+        reg_origen.agregar(np.arange(primero, lon.tamano, dtype=np.int32))
+        reg_destino.agregar(cercanos)
+        reg_peso.agregar(distancias * 111000)
+        reg_longitud.agregar(np.full(len(lote_lon), np.nan))
+        reg_tipo.agregar(np.full(len(lote_lon), codigo_access, dtype=np.int8))
+        reg_tipo_via.agregar(np.full(len(lote_lon), SIN_CATEGORIA, dtype=np.int8))
+        reg_riesgo.agregar(np.full(len(lote_lon), SIN_CATEGORIA, dtype=np.int8))
+
+    for lote in leer_lotes(fuente_infra, tamano_lote):
+        lote_lon, lote_lat = _coordenadas(lote)
+        agregar_nodos(lote['nombre'].to_numpy(), lote_lon, lote_lat, 1, codificar_serie(lote['tipo'], categorias['tipo_infra']))
+        fila_zona.agregar(np.full(len(lote), -1, dtype=np.int32))
+        agregar_accesos(lote_lon, lote_lat)
+
+    num_zonas = 0
+    for lote in leer_lotes(fuente_zonas, tamano_lote):
+        lote_lon, lote_lat = _coordenadas(lote)
+        agregar_nodos(lote['manzana_id'].to_numpy(), lote_lon, lote_lat, 2)
+        fila_zona.agregar(np.arange(num_zonas, num_zonas + len(lote), dtype=np.int32))
+        num_zonas += len(lote)
+        for attr, valores in atributos_zona.items():
+            valores.agregar(lote[attr].to_numpy(dtype=np.float64))
+        agregar_accesos(lote_lon, lote_lat)
+
+    return GrafoColumnar(
+        np.concatenate(ids) if ids else np.empty(0, dtype=str),
+        lon.arreglo(), lat.arreglo(), tipo_nodo.arreglo(), tipo_infra.arreglo(), fila_zona.arreglo(),
+        {attr: valores.arreglo() for attr, valores in atributos_zona.items()},
+        reg_origen=reg_origen.arreglo(), reg_destino=reg_destino.arreglo(),
+        reg_peso=reg_peso.arreglo(), reg_longitud=reg_longitud.arreglo(), reg_tipo=reg_tipo.arreglo(),
+        reg_tipo_via=reg_tipo_via.arreglo(), reg_riesgo=reg_riesgo.arreglo(),
+        categorias=categorias
+    )
\ No newline at end of file
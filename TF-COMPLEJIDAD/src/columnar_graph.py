@@ -0,0 +1,241 @@
+# src/columnar_graph.py
+
+import numpy as np
+import networkx as nx
+from scipy.sparse import csr_matrix
+
+# Categorías conocidas; los valores nuevos se agregan al final al codificar
+TIPOS_NODO = ['vial', 'critical_infra', 'populated_zone']
+TIPOS_ARISTA = ['road', 'access']
+TIPOS_VIA = ['avenida', 'calle', 'pasaje']
+RIESGOS_SISMICOS = ['bajo', 'medio', 'alto']
+TIPOS_INFRA = ['hospital', 'refugio', 'estacion_rescate', 'centro_salud']
+
+# Atributos numéricos de las zonas pobladas (solo se almacenan para esos nodos)
+ATRIBUTOS_ZONA = ['poblacion', 'vulnerabilidad_nbi', 'p_ge_0a14', 'p_ge_65ym', 'p_dl_mov']
+
+SIN_CATEGORIA = -1
+
+
+def codificar_categorias(valores, categorias):
+    """
+    Convierte una secuencia de textos en códigos int8 según la lista 'categorias'
+    (que se amplía con los valores no vistos). None/NaN se codifica como SIN_CATEGORIA.
+    """
+    posicion = {c: i for i, c in enumerate(categorias)}
+    codigos = np.empty(len(valores), dtype=np.int8)
+    for i, valor in enumerate(valores):
+        if valor is None or (isinstance(valor, float) and valor != valor):
+            codigos[i] = SIN_CATEGORIA
+            continue
+        if valor not in posicion:
+            posicion[valor] = len(categorias)
+            categorias.append(valor)
+        codigos[i] = posicion[valor]
+    return codigos
+
+
+def codificar_serie(valores, categorias):
+    """
+    Versión vectorizada de codificar_categorias para una serie de pandas: solo los valores
+    distintos pasan por Python y el resto se codifica con pd.Categorical.
+    """
+    import pandas as pd # Solo la usan los constructores desde tablas, que ya cargan pandas
+
+    for valor in pd.unique(valores.dropna()):
+        if valor not in categorias:
+            categorias.append(valor)
+    return pd.Categorical(valores, categories=categorias).codes.astype(np.int8)
+
+
+class GrafoColumnar:
+    """
+    Almacenamiento columnar y compacto del grafo urbano.
+
+    - Los IDs de nodo ('V_1234', 'IC_5', 'M_12') se internan a índices int32; la búsqueda
+      ID -> índice es binaria sobre una copia ordenada, sin diccionarios de Python.
+    - Los atributos de nodo son arreglos (lon, lat, tipo, tipo de infraestructura); los
+      atributos de zona poblada solo ocupan una fila por manzana (fila_zona, -1 en los demás).
+    - Cada vía o acceso no dirigido es un único registro (origen, destino, peso, longitud,
+      tipo, tipo_via, riesgo_sismico) con categorías codificadas en int8.
+    - La adyacencia dirigida es CSR: cada sentido guarda solo el vecino y el índice del
+      registro compartido, por lo que ambas direcciones de una vía referencian el mismo registro.
+    """
+    def __init__(self, ids, lon, lat, tipo_nodo, tipo_infra, fila_zona, atributos_zona,
+                 reg_origen, reg_destino, reg_peso, reg_longitud, reg_tipo, reg_tipo_via, reg_riesgo,
+                 categorias):
+        self.ids = np.asarray(ids, dtype=str)
+        self._orden_ids = np.argsort(self.ids).astype(np.int32)
+        self._ids_ordenados = self.ids[self._orden_ids]
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.tipo_nodo = np.asarray(tipo_nodo, dtype=np.int8)
+        self.tipo_infra = np.asarray(tipo_infra, dtype=np.int8)
+        self.fila_zona = np.asarray(fila_zona, dtype=np.int32)
+        self.atributos_zona = {k: np.asarray(v, dtype=np.float64) for k, v in atributos_zona.items()}
+
+        self.reg_origen = np.asarray(reg_origen, dtype=np.int32)
+        self.reg_destino = np.asarray(reg_destino, dtype=np.int32)
+        self.reg_peso = np.asarray(reg_peso, dtype=np.float64)
+        self.reg_longitud = np.asarray(reg_longitud, dtype=np.float64)
+        self.reg_tipo = np.asarray(reg_tipo, dtype=np.int8)
+        self.reg_tipo_via = np.asarray(reg_tipo_via, dtype=np.int8)
+        self.reg_riesgo = np.asarray(reg_riesgo, dtype=np.int8)
+        self.categorias = categorias
+
+        self._construir_adyacencia()
+
+    def _construir_adyacencia(self):
+        # Ambos sentidos de cada registro, ordenados por nodo de salida (CSR)
+        num_registros = len(self.reg_origen)
+        salida = np.concatenate((self.reg_origen, self.reg_destino))
+        llegada = np.concatenate((self.reg_destino, self.reg_origen))
+        registro = np.concatenate((np.arange(num_registros, dtype=np.int32),) * 2)
+        orden = np.argsort(salida, kind='stable')
+        self.vecinos = llegada[orden].astype(np.int32)
+        self.registro_arista = registro[orden].astype(np.int32)
+        tipo_indptr = np.int32 if len(salida) < np.iinfo(np.int32).max else np.int64
+        self.indptr = np.zeros(self.num_nodos + 1, dtype=tipo_indptr)
+        np.cumsum(np.bincount(salida, minlength=self.num_nodos), out=self.indptr[1:])
+
+    @property
+    def num_nodos(self):
+        return len(self.ids)
+
+    @property
+    def num_registros(self):
+        return len(self.reg_origen)
+
+    @property
+    def num_aristas(self):
+        return len(self.vecinos)
+
+    def indices_de(self, node_ids):
+        """IDs de nodo -> arreglo de índices int32 (KeyError si alguno no existe)."""
+        buscados = np.asarray(node_ids, dtype=str).reshape(-1)
+        pos = np.searchsorted(self._ids_ordenados, buscados)
+        pos = np.minimum(pos, len(self._ids_ordenados) - 1)
+        encontrados = self._ids_ordenados[pos] == buscados
+        if not encontrados.all():
+            raise KeyError(buscados[~encontrados][0])
+        return self._orden_ids[pos]
+
+    def indice_de(self, node_id):
+        return int(self.indices_de([node_id])[0])
+
+    def __contains__(self, node_id):
+        pos = np.searchsorted(self._ids_ordenados, node_id)
+        return pos < len(self._ids_ordenados) and self._ids_ordenados[pos] == node_id
+
+    def nodos_de_tipo(self, tipo_nodo, tipo_infra=None):
+        """Índices de los nodos de un tipo ('critical_infra', ...) y, opcionalmente, subtipo ('refugio', ...)."""
+        if tipo_nodo not in self.categorias['tipo_nodo']:
+            return np.empty(0, dtype=np.int32)
+        mascara = self.tipo_nodo == self.categorias['tipo_nodo'].index(tipo_nodo)
+        if tipo_infra is not None:
+            if tipo_infra not in self.categorias['tipo_infra']:
+                return np.empty(0, dtype=np.int32)
+            mascara &= self.tipo_infra == self.categorias['tipo_infra'].index(tipo_infra)
+        return np.flatnonzero(mascara).astype(np.int32)
+
+    def aristas_dirigidas(self):
+        """Arreglos (origen, destino, registro) de todas las aristas dirigidas, en orden CSR."""
+        origen = np.repeat(np.arange(self.num_nodos, dtype=np.int32), np.diff(self.indptr))
+        return origen, self.vecinos, self.registro_arista
+
+    def registros_viales(self):
+        """Índices de los registros que son vías ('road')."""
+        return np.flatnonzero(self.reg_tipo == self.categorias['tipo_arista'].index('road'))
+
+    def matriz_csr(self, pesos_registro=None):
+        """
+        Matriz dispersa (scipy CSR) de la red dirigida, apta para scipy.sparse.csgraph.
+        'pesos_registro' permite usar pesos alternativos por registro (ej. con bloqueos).
+        """
+        pesos = self.reg_peso if pesos_registro is None else np.asarray(pesos_registro, dtype=np.float64)
+        return csr_matrix((pesos[self.registro_arista], self.vecinos, self.indptr),
+                          shape=(self.num_nodos, self.num_nodos))
+
+    def memoria_bytes(self):
+        """Memoria aproximada del almacenamiento (arreglos más los textos internados)."""
+        arreglos = [self.ids, self._orden_ids, self._ids_ordenados, self.lon, self.lat, self.tipo_nodo,
+                    self.tipo_infra, self.fila_zona, *self.atributos_zona.values(),
+                    self.reg_origen, self.reg_destino, self.reg_peso, self.reg_longitud, self.reg_tipo,
+                    self.reg_tipo_via, self.reg_riesgo, self.vecinos, self.registro_arista, self.indptr]
+        return sum(a.nbytes for a in arreglos)
+
+    @classmethod
+    def desde_networkx(cls, graph):
+        """
+        Convierte un grafo de build_urban_graph. Las aristas en ambos sentidos con los
+        mismos atributos se guardan como un solo registro.
+        """
+        ids = list(graph.nodes())
+        indice = {n: i for i, n in enumerate(ids)}
+        categorias = {'tipo_nodo': list(TIPOS_NODO), 'tipo_arista': list(TIPOS_ARISTA), 'tipo_via': list(TIPOS_VIA),
+                      'riesgo_sismico': list(RIESGOS_SISMICOS), 'tipo_infra': list(TIPOS_INFRA)}
+
+        datos_nodos = [graph.nodes[n] for n in ids]
+        lon = [d['pos'][0] for d in datos_nodos]
+        lat = [d['pos'][1] for d in datos_nodos]
+        tipo_nodo = codificar_categorias([d.get('type') for d in datos_nodos], categorias['tipo_nodo'])
+        tipo_infra = codificar_categorias([d.get('tipo') for d in datos_nodos], categorias['tipo_infra'])
+        zonas = [i for i, d in enumerate(datos_nodos) if d.get('type') == 'populated_zone']
+        fila_zona = np.full(len(ids), -1, dtype=np.int32)
+        fila_zona[zonas] = np.arange(len(zonas))
+        atributos_zona = {a: [datos_nodos[i].get(a, np.nan) for i in zonas] for a in ATRIBUTOS_ZONA}
+
+        registros = []
+        vistos = set()
+        for u, v, data in graph.edges(data=True):
+            if (v, u) in vistos:
+                inversa = graph[v][u]
+                if all(inversa.get(k) == data.get(k) for k in ('weight', 'type', 'longitud', 'tipo_via', 'riesgo_sismico')):
+                    continue
+            vistos.add((u, v))
+            if data.get('type') == 'access' and data.get('subtype') == 'in':
+                u, v = v, u # Los accesos se orientan punto -> nodo vial
+            registros.append((indice[u], indice[v], data.get('weight', 1.0), data.get('longitud', np.nan),
+                              data.get('type'), data.get('tipo_via'), data.get('riesgo_sismico')))
+
+        columnas = list(zip(*registros)) if registros else [[]] * 7
+        return cls(ids, lon, lat, tipo_nodo, tipo_infra, fila_zona, atributos_zona,
+                   columnas[0], columnas[1], columnas[2], columnas[3],
+                   codificar_categorias(columnas[4], categorias['tipo_arista']),
+                   codificar_categorias(columnas[5], categorias['tipo_via']),
+                   codificar_categorias(columnas[6], categorias['riesgo_sismico']),
+                   categorias)
+
+    def a_networkx(self):
+        """Materializa un nx.DiGraph equivalente al de build_urban_graph."""
+        G = nx.DiGraph()
+        tipos_nodo = self.categorias['tipo_nodo']
+        tipos_infra = self.categorias['tipo_infra']
+        ids = self.ids.tolist()
+
+        for i, node_id in enumerate(ids):
+            lon, lat = float(self.lon[i]), float(self.lat[i])
+            attrs = {'type': tipos_nodo[self.tipo_nodo[i]], 'pos': (lon, lat), 'lon': lon, 'lat': lat}
+            if self.tipo_infra[i] != SIN_CATEGORIA:
+                attrs['tipo'] = tipos_infra[self.tipo_infra[i]]
+            fila = self.fila_zona[i]
+            if fila >= 0:
+                for a, valores in self.atributos_zona.items():
+                    attrs[a] = int(valores[fila]) if a == 'poblacion' else float(valores[fila])
+            G.add_node(node_id, **attrs)
+
+        tipo_road = self.categorias['tipo_arista'].index('road')
+        for r in range(self.num_registros):
+            u, v = ids[self.reg_origen[r]], ids[self.reg_destino[r]]
+            peso = float(self.reg_peso[r])
+            if self.reg_tipo[r] == tipo_road:
+                attrs = {'weight': peso, 'type': 'road', 'longitud': float(self.reg_longitud[r]),
+                         'tipo_via': self.categorias['tipo_via'][self.reg_tipo_via[r]],
+                         'riesgo_sismico': self.categorias['riesgo_sismico'][self.reg_riesgo[r]]}
+                G.add_edge(u, v, **attrs)
+                G.add_edge(v, u, **attrs)
+            else:
+                tipo = self.categorias['tipo_arista'][self.reg_tipo[r]]
+                G.add_edge(u, v, weight=peso, type=tipo, subtype='out')
+                G.add_edge(v, u, weight=peso, type=tipo, subtype='in')
+        return G
\ No newline at end of file
@@ -0,0 +1,157 @@
+# src/dynamic_mst.py
+
+import networkx as nx
+
+from src.dynamic_sssp import ArbolCaminosIncremental
+from src.graph_algorithms import kruskal_mst, prim_mst
+
+INF = float('inf')
+
+
+class MSTDistribucionDinamico:
+    """
+    Red de distribución (MST sobre la clausura métrica de los terminales: centro de
+    abastecimiento y puntos de distribución, igual que calculate_mst_for_distribution)
+    que se mantiene al cambiar los bloqueos en lugar de recalcularse.
+
+    Cada terminal guarda su árbol de caminos mínimos (ArbolCaminosIncremental). En
+    actualizar(), los árboles se reparan solo en los subárboles afectados, solo se
+    revisan las entradas de la clausura de los terminales cuya distancia pudo cambiar, y
+    cada entrada cambiada repara el árbol de expansión:
+      - arista del árbol que empeora: se quita y se busca la arista de reemplazo más
+        liviana entre los dos lados del corte;
+      - arista fuera del árbol que mejora: entra si es más liviana que la arista más pesada
+        del ciclo que forma.
+    Con terminales desconectados el resultado es un bosque, como con Kruskal o Prim.
+    """
+    def __init__(self, graph, supply_center_id, distribution_points_ids, mst_algorithm='kruskal_custom', weight='weight'):
+        if mst_algorithm not in ('kruskal_custom', 'prim'):
+            raise ValueError("Algoritmo MST no reconocido. Use 'kruskal_custom' o 'prim'.")
+        self.terminales = []
+        for n in [supply_center_id] + list(distribution_points_ids):
+            if n not in graph:
+                print(f"Advertencia: El nodo {n} (centro/punto de distribución) no existe en el grafo post-sismo y será ignorado para el MST.")
+            elif n not in self.terminales:
+                self.terminales.append(n)
+        self.indice = {n: i for i, n in enumerate(self.terminales)}
+        self.entradas_actualizadas = 0
+        self.aristas_reemplazadas = 0
+        self.nodos_reasentados = 0
+
+        # Clausura: distancia del terminal i al j (i < j) por el árbol que sale de i
+        self.arboles = [ArbolCaminosIncremental(graph, [t], hacia_fuentes=False, weight=weight) for t in self.terminales[:-1]]
+        self.clausura = {}
+        for i, arbol in enumerate(self.arboles):
+            for j in range(i + 1, len(self.terminales)):
+                self.clausura[(i, j)] = arbol.distancia.get(self.terminales[j], INF)
+
+        # Árbol inicial con el algoritmo elegido sobre las entradas finitas
+        self.adyacencia = {i: {} for i in range(len(self.terminales))}
+        completo = nx.Graph()
+        completo.add_nodes_from(range(len(self.terminales)))
+        completo.add_weighted_edges_from((i, j, w) for (i, j), w in self.clausura.items() if w < INF)
+        mst_edges, _ = kruskal_mst(completo) if mst_algorithm == 'kruskal_custom' else prim_mst(completo)
+        for i, j, data in mst_edges:
+            self._agregar(i, j, data['weight'])
+
+    def _agregar(self, i, j, w):
+        self.adyacencia[i][j] = w
+        self.adyacencia[j][i] = w
+
+    def _quitar(self, i, j):
+        del self.adyacencia[i][j]
+        del self.adyacencia[j][i]
+
+    def _lado(self, inicio):
+        # Terminales del árbol que contiene 'inicio'
+        visitados = {inicio}
+        pila = [inicio]
+        while pila:
+            for y in self.adyacencia[pila.pop()]:
+                if y not in visitados:
+                    visitados.add(y)
+                    pila.append(y)
+        return visitados
+
+    def _camino(self, i, j):
+        # Aristas (a, b) del camino de i a j en el bosque, o None si están en árboles distintos
+        padre = {i: None}
+        pila = [i]
+        while pila and j not in padre:
+            x = pila.pop()
+            for y in self.adyacencia[x]:
+                if y not in padre:
+                    padre[y] = x
+                    pila.append(y)
+        if j not in padre:
+            return None
+        camino = []
+        while padre[j] is not None:
+            camino.append((padre[j], j))
+            j = padre[j]
+        return camino
+
+    def _peso(self, i, j):
+        return self.clausura[(i, j) if i < j else (j, i)]
+
+    def _cambiar_entrada(self, i, j, w):
+        anterior = self.clausura[(i, j)]
+        self.clausura[(i, j)] = w
+        if j in self.adyacencia[i]:
+            if w <= anterior:
+                self._agregar(i, j, w)
+                return
+            # Arista del árbol que empeora: reemplazo más liviano entre ambos lados del corte.
+            # El bosque es mínimo, así que toda arista finita que sale del lado de i llega al de j.
+            self._quitar(i, j)
+            lado = self._lado(i)
+            reemplazo = min(((self._peso(x, y), x, y) for x in lado for y in self.adyacencia if y not in lado), default=(INF, None, None))
+            if reemplazo[0] < INF:
+                self._agregar(reemplazo[1], reemplazo[2], reemplazo[0])
+                if (reemplazo[1], reemplazo[2]) not in ((i, j), (j, i)):
+                    self.aristas_reemplazadas += 1
+        elif w < anterior:
+            # Arista fuera del árbol que mejora: entra si une dos árboles o mejora el ciclo que cierra
+            camino = self._camino(i, j)
+            if camino is None:
+                self._agregar(i, j, w)
+                self.aristas_reemplazadas += 1
+                return
+            a, b = max(camino, key=lambda arista: self.adyacencia[arista[0]][arista[1]])
+            if self.adyacencia[a][b] > w:
+                self._quitar(a, b)
+                self._agregar(i, j, w)
+                self.aristas_reemplazadas += 1
+
+    def actualizar(self, graph, aristas_modificadas):
+        """
+        Aplica un cambio de bloqueos: 'aristas_modificadas' son las aristas dirigidas cuyo
+        peso cambió en 'graph' (ver dynamic_sssp.expandir_bloqueos). Retorna el número de
+        entradas de la clausura que cambiaron; el costo es proporcional a lo que cambió.
+        """
+        cambios = []
+        self.nodos_reasentados = 0
+        for i, arbol in enumerate(self.arboles):
+            arbol.reparar(graph, aristas_modificadas)
+            self.nodos_reasentados += arbol.nodos_reasentados
+            for n in arbol.nodos_modificados:
+                j = self.indice.get(n)
+                if j is not None and j > i:
+                    w = arbol.distancia.get(n, INF)
+                    if w != self.clausura[(i, j)]:
+                        cambios.append((i, j, w))
+
+        self.entradas_actualizadas = len(cambios)
+        self.aristas_reemplazadas = 0
+        for i, j, w in cambios:
+            self._cambiar_entrada(i, j, w)
+        return len(cambios)
+
+    def aristas_mst(self):
+        """
+        Aristas y costo de la red de distribución actual, en el mismo formato que
+        calculate_mst_for_distribution: ([(u, v, {'weight': w})], costo_total).
+        """
+        mst_edges = [(self.terminales[i], self.terminales[j], {'weight': w})
+                     for i, vecinos in self.adyacencia.items() for j, w in vecinos.items() if i < j]
+        return mst_edges, sum(data['weight'] for _, _, data in mst_edges)
\ No newline at end of file
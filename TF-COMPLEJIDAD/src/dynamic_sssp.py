@@ -0,0 +1,234 @@
+# src/dynamic_sssp.py
+
+import heapq
+
+from src.backends import huella_grafo
+
+INF = float('inf')
+
+
+def expandir_bloqueos(graph, bloqueos_aplicados):
+    """
+    Convierte la lista de bloqueos de SimuladorSismo ((u, v, peso_original) por vía)
+    en la lista de aristas dirigidas afectadas, incluyendo el sentido contrario si existe.
+    """
+    aristas = []
+    for bloqueo in bloqueos_aplicados:
+        u, v = bloqueo[0], bloqueo[1]
+        if graph.has_edge(u, v):
+            aristas.append((u, v))
+        if graph.has_edge(v, u):
+            aristas.append((v, u))
+    return aristas
+
+
+class ArbolCaminosIncremental:
+    """
+    Árbol de caminos mínimos multi-fuente que se repara incrementalmente cuando cambian
+    los pesos de algunas aristas (estilo Ramalingam–Reps).
+
+    Con hacia_fuentes=True guarda, para cada nodo, la distancia a la fuente más cercana
+    recorriendo las aristas en su sentido (ej. manzana -> refugio): es la tabla de
+    instalación más cercana. Con hacia_fuentes=False guarda el árbol que sale de las
+    fuentes (ej. centro de abastecimiento -> refugios).
+    """
+    def __init__(self, graph, fuentes, hacia_fuentes=True, weight='weight'):
+        self.graph = graph
+        self.hacia_fuentes = hacia_fuentes
+        self.weight = weight
+        self.fuentes = [f for f in fuentes if f in graph]
+        self.distancia = {}
+        self.padre = {}   # Siguiente salto hacia la fuente (o predecesor desde la fuente)
+        self.fuente = {}
+        self.hijos = {}
+        self.nodos_afectados = 0
+        self.nodos_reasentados = 0
+        self.nodos_modificados = set() # Nodos cuya distancia o fuente pudo cambiar en la última reparación
+        self._calcular_completo()
+
+    def _expansion(self, x):
+        # Nodos cuya distancia puede mejorar pasando por x, con el peso de la arista que los une
+        if self.hacia_fuentes:
+            for y, data in self.graph.pred[x].items():
+                yield y, data.get(self.weight, 1.0)
+        else:
+            for y, data in self.graph.succ[x].items():
+                yield y, data.get(self.weight, 1.0)
+
+    def _candidatos(self, x):
+        # Nodos a través de los cuales x puede obtener su distancia
+        if self.hacia_fuentes:
+            for y, data in self.graph.succ[x].items():
+                yield y, data.get(self.weight, 1.0)
+        else:
+            for y, data in self.graph.pred[x].items():
+                yield y, data.get(self.weight, 1.0)
+
+    def _nodo_hijo(self, u, v):
+        # Nodo cuyo enlace en el árbol es la arista (u, v), o None si no es arista del árbol
+        if self.hacia_fuentes:
+            return u if self.padre.get(u) == v else None
+        return v if self.padre.get(v) == u else None
+
+    def _enlazar(self, x, nuevo_padre):
+        anterior = self.padre.get(x)
+        if anterior is not None:
+            self.hijos[anterior].discard(x)
+        self.padre[x] = nuevo_padre
+        if nuevo_padre is not None:
+            self.hijos.setdefault(nuevo_padre, set()).add(x)
+            self.fuente[x] = self.fuente[nuevo_padre]
+
+    def _dijkstra(self, heap):
+        asentados = set()
+        while heap:
+            d, x, via = heapq.heappop(heap)
+            if d >= self.distancia.get(x, INF):
+                continue
+            self.distancia[x] = d
+            self._enlazar(x, via)
+            asentados.add(x)
+            for y, w in self._expansion(x):
+                nd = d + w
+                if nd < self.distancia.get(y, INF):
+                    heapq.heappush(heap, (nd, y, x))
+        return asentados
+
+    def _calcular_completo(self):
+        heap = []
+        for f in self.fuentes:
+            self.distancia[f] = 0.0
+            self.padre[f] = None
+            self.fuente[f] = f
+            for y, w in self._expansion(f):
+                if w < self.distancia.get(y, INF):
+                    heapq.heappush(heap, (w, y, f))
+        self.nodos_reasentados = len(self._dijkstra(heap)) + len(self.fuentes)
+
+    def copiar(self):
+        """
+        Copia independiente de las tablas (sin recalcular), para reparar un escenario
+        sin alterar el árbol base.
+        """
+        copia = ArbolCaminosIncremental.__new__(ArbolCaminosIncremental)
+        copia.graph = self.graph
+        copia.hacia_fuentes = self.hacia_fuentes
+        copia.weight = self.weight
+        copia.fuentes = list(self.fuentes)
+        copia.distancia = dict(self.distancia)
+        copia.padre = dict(self.padre)
+        copia.fuente = dict(self.fuente)
+        copia.hijos = {n: set(h) for n, h in self.hijos.items() if h}
+        copia.nodos_afectados = 0
+        copia.nodos_reasentados = 0
+        copia.nodos_modificados = set()
+        return copia
+
+    def reparar(self, graph, aristas_modificadas):
+        """
+        Actualiza el árbol tras cambiar el peso de las aristas dirigidas indicadas
+        (bloqueos con peso inf, reaperturas o cualquier otro cambio). Los pesos nuevos se
+        leen de 'graph'. Solo se recalculan los subárboles invalidados y los nodos que
+        mejoran, por lo que el costo es proporcional al daño y no al tamaño de la red.
+        """
+        self.graph = graph
+
+        # 1. Raíces invalidadas: nodos cuyo enlace en el árbol es una arista modificada
+        raices = set()
+        for u, v in aristas_modificadas:
+            hijo = self._nodo_hijo(u, v)
+            if hijo is not None:
+                raices.add(hijo)
+
+        # 2. Subárboles afectados
+        afectados = set()
+        pila = list(raices)
+        while pila:
+            x = pila.pop()
+            if x in afectados:
+                continue
+            afectados.add(x)
+            pila.extend(self.hijos.get(x, ()))
+
+        for x in afectados:
+            self._enlazar(x, None)
+            self.distancia.pop(x, None)
+            self.fuente.pop(x, None)
+
+        # 3. Distancias tentativas desde la frontera no afectada
+        heap = []
+        for x in afectados:
+            for y, w in self._candidatos(x):
+                if y in afectados:
+                    continue
+                d = self.distancia.get(y, INF) + w
+                if d < INF:
+                    heapq.heappush(heap, (d, x, y))
+
+        # 4. Aristas que ahora ofrecen un camino mejor (reaperturas o reducciones de peso)
+        for u, v in aristas_modificadas:
+            if not graph.has_edge(u, v):
+                continue
+            w = graph[u][v].get(self.weight, 1.0)
+            if self.hacia_fuentes:
+                x, via = u, v
+            else:
+                x, via = v, u
+            if via in afectados:
+                continue
+            d = self.distancia.get(via, INF) + w
+            if d < self.distancia.get(x, INF):
+                heapq.heappush(heap, (d, x, via))
+
+        reasentados = self._dijkstra(heap)
+        self.nodos_afectados = len(afectados)
+        self.nodos_reasentados = len(reasentados)
+        self.nodos_modificados = afectados | reasentados
+        return self
+
+    def ruta(self, nodo):
+        """
+        Ruta entre 'nodo' y su fuente más cercana, en el sentido del árbol.
+        Retorna (ruta, fuente, distancia), igual que find_shortest_path_dijkstra;
+        si no hay ruta retorna ([], None, inf).
+        """
+        if self.distancia.get(nodo, INF) == INF:
+            return [], None, INF
+
+        path = [nodo]
+        while self.padre.get(path[-1]) is not None:
+            path.append(self.padre[path[-1]])
+        if not self.hacia_fuentes:
+            path.reverse()
+        return path, self.fuente[nodo], self.distancia[nodo]
+
+def huella_bloqueos(bloqueos_aplicados):
+    """
+    Huella del conjunto de vías bloqueadas (sin importar el orden ni el sentido), para
+    detectar si un nuevo escenario deja exactamente las mismas vías cerradas que el anterior.
+    """
+    return frozenset(frozenset((bloqueo[0], bloqueo[1])) for bloqueo in bloqueos_aplicados)
+
+
+def arboles_instalacion_base(graph, tipos_destino, weight='weight'):
+    """
+    Tablas de instalación más cercana del grafo sin sismo, una por tipo de instalación.
+    Se calculan una sola vez y se guardan junto al grafo en graph.graph['arboles_instalacion'];
+    las llamadas siguientes (y las rutas "sin sismo") son consultas sobre esas tablas. Se
+    recalculan si cambia la huella del grafo (backends.huella_grafo), por ejemplo tras
+    BibliotecaEscenarios.aplicar(), que modifica pesos en sitio e invalida las cachés.
+    Retorna {tipo: ArbolCaminosIncremental}.
+    """
+    arboles = graph.graph.get('arboles_instalacion')
+    huella = huella_grafo(graph)
+    # graph.copy() comparte este atributo: las tablas solo valen para el grafo con que se calcularon
+    if (not arboles or graph.graph.get('huella_arboles_instalacion') != huella
+            or any(arbol.graph is not graph for arbol in arboles.values())):
+        arboles = {}
+        graph.graph['arboles_instalacion'] = arboles
+        graph.graph['huella_arboles_instalacion'] = huella
+    for tipo in tipos_destino:
+        if tipo not in arboles:
+            destinos = [n for n, data in graph.nodes(data=True) if data.get('type') == 'critical_infra' and data.get('tipo') == tipo]
+            arboles[tipo] = ArbolCaminosIncremental(graph, destinos, weight=weight)
+    return arboles
\ No newline at end of file
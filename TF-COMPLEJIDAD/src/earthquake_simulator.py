@@ -2,15 +2,56 @@
 
 import networkx as nx
 import random
+import numpy as np
+from math import cos, radians
+from scipy.spatial import cKDTree
+
+# Constante para la aproximación de metros por grado de latitud/longitud
+METERS_PER_DEGREE = 111000
+
+
+def ley_mmi_generica(magnitud, distancia_km):
+    """
+    Intensidad macrosísmica (MMI) aproximada en función de la magnitud y la
+    distancia hipocentral en km. Acepta escalares o arreglos de NumPy.
+    """
+    return 1.68 + 1.5 * magnitud - 3.5 * np.log10(np.maximum(distancia_km, 1.0))
+
+
+def ley_subduccion_peru(magnitud, distancia_km):
+    """
+    Variante con atenuación más lenta, típica de sismos de subducción en la costa peruana.
+    """
+    return 2.4 + 1.4 * magnitud - 2.6 * np.log10(np.maximum(distancia_km, 1.0) + 10.0)
+
+
+LEYES_ATENUACION = {
+    'mmi_generica': ley_mmi_generica,
+    'subduccion_peru': ley_subduccion_peru,
+}
+
+# Intensidad a la que una vía tiene 50% de probabilidad de quedar bloqueada, según su riesgo
+FRAGILIDAD_POR_RIESGO = {
+    'alto': 8.5,
+    'medio': 9.5,
+    'bajo': 10.5
+}
+DISPERSION_FRAGILIDAD = 0.4
+# Probabilidad por debajo de la cual una vía se considera fuera de la zona afectada
+PROBABILIDAD_MINIMA = 1e-3
+
 
 class SimuladorSismo:
     def __init__(self, graph):
         self.original_graph = graph.copy()
         self.current_graph = graph.copy()
+        self._aristas_viales = None
 
-    def simular_bloqueos(self, magnitud_sismo=7.0, porcentaje_bloqueo_alto_riesgo=0.5, porcentaje_bloqueo_medio_riesgo=0.1):
+    def simular_bloqueos(self, magnitud_sismo=7.0, porcentaje_bloqueo_alto_riesgo=0.5, porcentaje_bloqueo_medio_riesgo=0.1, semilla=None):
         self.current_graph = self.original_graph.copy() # Resetear a grafo original
         bloqueos_aplicados = []
+        # Con semilla se sortea con un generador propio, sin tocar el estado global de random
+        rng = random.Random(semilla) if semilla is not None else random
 
         for u, v, data in list(self.current_graph.edges(data=True)): # Iterar sobre una copia
             if data.get('type') == 'road':
@@ -18,10 +59,10 @@ class SimuladorSismo:
                 should_block = False
 
                 if riesgo_sismico == 'alto':
-                    if random.random() < porcentaje_bloqueo_alto_riesgo:
+                    if rng.random() < porcentaje_bloqueo_alto_riesgo:
                         should_block = True
                 elif riesgo_sismico == 'medio':
-                    if random.random() < porcentaje_bloqueo_medio_riesgo:
+                    if rng.random() < porcentaje_bloqueo_medio_riesgo:
                         should_block = True
 
                 if should_block:
@@ -36,4 +77,130 @@ class SimuladorSismo:
                          self.current_graph[v][u]['blocked'] = True
 
 
+        return self.current_graph, bloqueos_aplicados
+
+    def _preparar_aristas_viales(self):
+        """
+        Construye una sola vez los arreglos de las vías (una entrada por vía no dirigida):
+        extremos, punto medio proyectado en metros, intensidad de fragilidad y un
+        índice espacial (cKDTree) sobre los puntos medios.
+        """
+        if self._aristas_viales is not None:
+            return self._aristas_viales
+
+        origenes, destinos, lons, lats, fragilidad = [], [], [], [], []
+        vistas = set()
+        for u, v, data in self.original_graph.edges(data=True):
+            if data.get('type') != 'road' or (v, u) in vistas:
+                continue
+            vistas.add((u, v))
+            lon_u, lat_u = self.original_graph.nodes[u]['pos']
+            lon_v, lat_v = self.original_graph.nodes[v]['pos']
+            origenes.append(u)
+            destinos.append(v)
+            lons.append((lon_u + lon_v) / 2)
+            lats.append((lat_u + lat_v) / 2)
+            fragilidad.append(FRAGILIDAD_POR_RIESGO.get(data.get('riesgo_sismico', 'bajo'), FRAGILIDAD_POR_RIESGO['bajo']))
+
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        # Proyección equirectangular local (metros), suficiente a escala de ciudad
+        lat_ref = float(lats.mean()) if len(lats) else 0.0
+        factor_lon = cos(radians(lat_ref)) * METERS_PER_DEGREE
+        xy = np.column_stack((lons * factor_lon, lats * METERS_PER_DEGREE))
+
+        self._aristas_viales = {
+            'origenes': origenes,
+            'destinos': destinos,
+            'xy': xy,
+            'fragilidad': np.asarray(fragilidad, dtype=float),
+            'factor_lon': factor_lon,
+            'kdtree': cKDTree(xy) if len(xy) else None,
+        }
+        return self._aristas_viales
+
+    def _radio_afectacion_m(self, magnitud_sismo, ley, profundidad_km):
+        """
+        Distancia epicentral (m) a partir de la cual ni la vía más frágil supera
+        PROBABILIDAD_MINIMA. Se obtiene por bisección, ya que la intensidad decrece con la distancia.
+        """
+        umbral_min = min(FRAGILIDAD_POR_RIESGO.values())
+        # Intensidad bajo la cual la probabilidad logística cae por debajo de PROBABILIDAD_MINIMA
+        intensidad_limite = umbral_min - DISPERSION_FRAGILIDAD * np.log(1 / PROBABILIDAD_MINIMA - 1)
+
+        def intensidad(d_km):
+            return float(ley(magnitud_sismo, np.hypot(d_km, profundidad_km)))
+
+        bajo, alto = 0.0, 1.0
+        while intensidad(alto) > intensidad_limite and alto < 20000:
+            alto *= 2
+        for _ in range(50):
+            medio = (bajo + alto) / 2
+            if intensidad(medio) > intensidad_limite:
+                bajo = medio
+            else:
+                alto = medio
+        return alto * 1000
+
+    def probabilidades_bloqueo(self, epicentro, magnitud_sismo=7.0, ley_atenuacion='mmi_generica', profundidad_km=10.0):
+        """
+        Calcula la probabilidad de bloqueo de cada vía a partir de la distancia del epicentro
+        (lon, lat) al punto medio de la vía, en una sola pasada vectorizada.
+        Retorna (indices, probabilidades) solo para las vías dentro del radio de afectación;
+        el resto tiene probabilidad despreciable y no se evalúa.
+        """
+        if ley_atenuacion not in LEYES_ATENUACION:
+            raise ValueError(f"Ley de atenuación no reconocida. Use una de: {', '.join(LEYES_ATENUACION)}.")
+        ley = LEYES_ATENUACION[ley_atenuacion]
+        aristas = self._preparar_aristas_viales()
+        if aristas['kdtree'] is None:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        lon_epi, lat_epi = epicentro
+        punto = (lon_epi * aristas['factor_lon'], lat_epi * METERS_PER_DEGREE)
+        radio = self._radio_afectacion_m(magnitud_sismo, ley, profundidad_km)
+        indices = np.asarray(aristas['kdtree'].query_ball_point(punto, radio), dtype=np.intp)
+        if len(indices) == 0:
+            return indices, np.empty(0)
+
+        delta = aristas['xy'][indices] - punto
+        distancia_km = np.hypot(np.hypot(delta[:, 0], delta[:, 1]) / 1000, profundidad_km)
+        intensidad = ley(magnitud_sismo, distancia_km)
+        probabilidades = 1 / (1 + np.exp(-(intensidad - aristas['fragilidad'][indices]) / DISPERSION_FRAGILIDAD))
+        return indices, probabilidades
+
+    def sortear_vias_epicentro(self, epicentro, magnitud_sismo=7.0, ley_atenuacion='mmi_generica', profundidad_km=10.0, semilla=None):
+        """
+        Sorteo del modo con base física sin copiar el grafo: retorna los índices de las vías
+        bloqueadas (en el orden de _preparar_aristas_viales, el mismo de scenario_store.indice_vias).
+        El costo es el de la pasada vectorizada, así que sirve para generar muchos escenarios
+        (ej. para BibliotecaEscenarios.guardar); con la misma semilla bloquea las mismas vías
+        que simular_bloqueos_epicentro.
+        """
+        indices, probabilidades = self.probabilidades_bloqueo(epicentro, magnitud_sismo, ley_atenuacion, profundidad_km)
+        rng = np.random.default_rng(semilla)
+        return indices[rng.random(len(indices)) < probabilidades]
+
+    def simular_bloqueos_epicentro(self, epicentro, magnitud_sismo=7.0, ley_atenuacion='mmi_generica', profundidad_km=10.0, semilla=None):
+        """
+        Modo de daño con base física: la probabilidad de bloqueo de cada vía depende de la
+        magnitud, de la ley de atenuación y de la distancia al epicentro (lon, lat).
+        Retorna el grafo post-sismo y las vías bloqueadas, igual que simular_bloqueos.
+        Copia el grafo original en cada llamada; si solo se necesitan las vías bloqueadas,
+        usar sortear_vias_epicentro.
+        """
+        self.current_graph = self.original_graph.copy() # Resetear a grafo original
+        bloqueos_aplicados = []
+
+        bloqueadas = self.sortear_vias_epicentro(epicentro, magnitud_sismo, ley_atenuacion, profundidad_km, semilla)
+        aristas = self._aristas_viales
+        for i in bloqueadas:
+            u, v = aristas['origenes'][i], aristas['destinos'][i]
+            bloqueos_aplicados.append((u, v, self.current_graph[u][v]['weight']))
+            self.current_graph[u][v]['weight'] = float('inf')
+            self.current_graph[u][v]['blocked'] = True
+            if self.current_graph.has_edge(v, u) and self.current_graph[v][u].get('type') == 'road':
+                self.current_graph[v][u]['weight'] = float('inf')
+                self.current_graph[v][u]['blocked'] = True
+
         return self.current_graph, bloqueos_aplicados
\ No newline at end of file
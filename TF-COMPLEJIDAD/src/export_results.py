@@ -0,0 +1,165 @@
+# src/export_results.py
+
+import json
+import math
+import numpy as np
+
+
+def _valor_json(valor):
+    # JSON no admite inf/nan: se escriben como null; los escalares de NumPy se convierten a Python
+    if hasattr(valor, 'item'):
+        valor = valor.item()
+    if isinstance(valor, float) and (math.isinf(valor) or math.isnan(valor)):
+        return None
+    return valor
+
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("La exportación a Parquet requiere pyarrow. Instálalo con: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+class ExportadorGeoJSONL:
+    """
+    Escribe resultados como GeoJSON-lines (un Feature por línea) a medida que se producen,
+    sin acumularlos en memoria. QGIS, GDAL/ogr2ogr y geopandas.read_file leen el archivo directo.
+    Las coordenadas salen del atributo 'pos' (lon, lat) de los nodos del grafo.
+    """
+    def __init__(self, ruta_archivo, graph, modo='w'):
+        self.graph = graph
+        self.archivo = open(ruta_archivo, modo, encoding='utf-8')
+        self.registros = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        if not self.archivo.closed:
+            self.archivo.close()
+
+    def _coordenadas(self, nodos):
+        return [list(self.graph.nodes[n]['pos']) for n in nodos]
+
+    def escribir_feature(self, geometria, propiedades):
+        feature = {
+            'type': 'Feature',
+            'geometry': geometria,
+            'properties': {k: _valor_json(v) for k, v in propiedades.items()},
+        }
+        self.archivo.write(json.dumps(feature, ensure_ascii=False) + '\n')
+        self.registros += 1
+
+    def escribir_ruta(self, path, costo, **propiedades):
+        """Ruta (lista de nodos, ej. de find_shortest_path_dijkstra) como LineString con su costo."""
+        if len(path) < 2:
+            return
+        propiedades = dict(propiedades, origen=path[0], destino=path[-1], costo=costo, num_nodos=len(path))
+        self.escribir_feature({'type': 'LineString', 'coordinates': self._coordenadas(path)}, propiedades)
+
+    def escribir_aristas_mst(self, mst_edges, **propiedades):
+        """Cada arista (u, v, data) de calculate_mst_for_distribution como un LineString con su costo."""
+        for u, v, data in mst_edges:
+            self.escribir_feature({'type': 'LineString', 'coordinates': self._coordenadas([u, v])},
+                                  dict(propiedades, origen=u, destino=v, costo=data.get('weight')))
+
+    def escribir_componentes(self, componentes, **propiedades):
+        """
+        Cada componente (conjunto de nodos, ej. de backends.componentes_debiles o el componente
+        principal de analyze_post_earthquake_connectivity) como un MultiPoint con su tamaño.
+        """
+        componentes = sorted(componentes, key=len, reverse=True)
+        for i, componente in enumerate(componentes):
+            self.escribir_feature({'type': 'MultiPoint', 'coordinates': self._coordenadas(componente)},
+                                  dict(propiedades, componente=i, tamano=len(componente)))
+
+
+class ExportadorParquet:
+    """
+    Escribe métricas tabulares (ej. una fila por nodo y escenario) en un archivo Parquet por
+    lotes columnares: las filas se acumulan hasta 'tamano_lote' y se vuelcan como un row group,
+    así un ensamble grande se escribe con memoria constante. Requiere pyarrow (se importa al usarlo).
+    """
+    def __init__(self, ruta_archivo, tamano_lote=65536):
+        self.pa, self.pq = _importar_pyarrow()
+        self.ruta_archivo = ruta_archivo
+        self.tamano_lote = tamano_lote
+        self.escritor = None
+        self.columnas = {}
+        self.filas_pendientes = 0
+        self.registros = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def escribir_lote(self, columnas):
+        """Agrega un lote de filas dado como {columna: arreglo}, todas de la misma longitud."""
+        longitudes = {len(valores) for valores in columnas.values()}
+        if len(longitudes) != 1:
+            raise ValueError("Todas las columnas del lote deben tener la misma longitud.")
+        for nombre, valores in columnas.items():
+            self.columnas.setdefault(nombre, []).append(np.asarray(valores))
+        self.filas_pendientes += longitudes.pop()
+        if self.filas_pendientes >= self.tamano_lote:
+            self.vaciar()
+
+    def escribir_fila(self, **valores):
+        self.escribir_lote({nombre: [valor] for nombre, valor in valores.items()})
+
+    def vaciar(self):
+        if not self.filas_pendientes:
+            return
+        tabla = self.pa.table({nombre: np.concatenate(partes) for nombre, partes in self.columnas.items()})
+        if self.escritor is None:
+            # El esquema queda fijado por el primer lote
+            self.escritor = self.pq.ParquetWriter(self.ruta_archivo, tabla.schema)
+        self.escritor.write_table(tabla)
+        self.registros += self.filas_pendientes
+        self.columnas = {}
+        self.filas_pendientes = 0
+
+    def cerrar(self):
+        self.vaciar()
+        if self.escritor is not None:
+            self.escritor.close()
+            self.escritor = None
+
+
+def exportar_ensamble_escenarios(grafo_columnar, num_escenarios, ruta_parquet, tamano_bloque=100,
+                                 tipo_destino='refugio', porcentaje_bloqueo_alto_riesgo=0.5,
+                                 porcentaje_bloqueo_medio_riesgo=0.1, semilla=None):
+    """
+    Sortea y evalúa un ensamble de escenarios por bloques (scenario_batch) y escribe en Parquet
+    una fila por manzana y escenario: escenario, nodo, distancia a la instalación más cercana
+    (inf si quedó sin acceso) y población. La memoria depende del tamaño del bloque, no de K.
+    Retorna el número de filas escritas.
+    """
+    from src.scenario_batch import muestrear_mascaras_bloqueo, evaluar_escenarios
+
+    rng = np.random.default_rng(semilla)
+    with ExportadorParquet(ruta_parquet) as exportador:
+        for inicio in range(0, num_escenarios, tamano_bloque):
+            k = min(tamano_bloque, num_escenarios - inicio)
+            vias, mascaras = muestrear_mascaras_bloqueo(grafo_columnar, k, porcentaje_bloqueo_alto_riesgo,
+                                                        porcentaje_bloqueo_medio_riesgo, semilla=rng)
+            resumen = evaluar_escenarios(grafo_columnar, vias, mascaras, tipo_destino, devolver_distancias=True)
+            zonas = resumen['zonas']
+            poblacion = grafo_columnar.atributos_zona['poblacion'][grafo_columnar.fila_zona[zonas]]
+            for j in range(k):
+                exportador.escribir_lote({
+                    'escenario': np.full(len(zonas), inicio + j, dtype=np.int64),
+                    'nodo': grafo_columnar.ids[zonas],
+                    'distancia': resumen['distancias_zonas'][j],
+                    'poblacion': poblacion,
+                })
+        exportador.vaciar()
+        return exportador.registros
\ No newline at end of file
@@ -1,24 +1,101 @@
 import networkx as nx
 import heapq 
 
-def find_shortest_path_dijkstra(graph, origin_node_id, target_nodes_ids):
-    best_path_length = float('inf')
-    best_target_node = None
-    best_path = []
+from src.backends import ruta_dijkstra, distancias_desde, componentes_debiles
 
-    lengths, paths_predecessors = nx.single_source_dijkstra(graph, source=origin_node_id, weight='weight')
-
-    for target_id in target_nodes_ids:
-        if target_id in lengths:
-            current_path_length = lengths[target_id]
-            if current_path_length < best_path_length:
-                best_path_length = current_path_length
-                best_target_node = target_id
-
-    if best_target_node is not None:
-        best_path = nx.shortest_path(graph, source=origin_node_id, target=best_target_node, weight='weight')
+def find_shortest_path_dijkstra(graph, origin_node_id, target_nodes_ids, backend=None, estadisticas=None):
+    """
+    Ruta mínima desde el origen al destino más cercano de la lista.
+    'backend' elige el motor ('networkx', 'scipy' o 'arrays'); por defecto el global de src.backends.
+    Si se pasa un diccionario 'estadisticas' se usa el motor propio 'arrays' (el único que expone
+    su trabajo) y se llenan sus contadores de heap, aristas relajadas y nodos asentados.
+    """
+    if estadisticas is not None and backend is None:
+        backend = 'arrays'
+    return ruta_dijkstra(graph, origin_node_id, target_nodes_ids, backend, estadisticas=estadisticas)
 
-    return best_path, best_target_node, best_path_length
+def bidirectional_dijkstra(graph, origin_node_id, target_node_id, weight='weight', estadisticas=None):
+    """
+    Ruta mínima punto a punto con Dijkstra bidireccional: una búsqueda avanza desde el origen
+    por los sucesores y otra retrocede desde el destino por los predecesores, expandiendo
+    siempre el lado con menos nodos en cola. Las aristas bloqueadas (peso inf) se ignoran.
+    Se detiene cuando la suma de los mínimos de ambas colas alcanza el mejor costo encontrado
+    (mu), lo que garantiza que la ruta es óptima.
+    Retorna (ruta, costo), o ([], inf) si no hay ruta. Si se pasa un diccionario 'estadisticas',
+    se llenan los contadores de nodos asentados por lado, aristas relajadas u omitidas y
+    operaciones del heap.
+    En una red vial plana cada búsqueda cubre un disco de la mitad del radio, así que la
+    ganancia frente a Dijkstra detenido en el destino es a lo más ~2x (mediana medida de
+    1.6x a 1.8x en consultas manzana -> instalación, con o sin sismo). Para reducir varias
+    veces los nodos asentados usar landmarks.PuntosReferenciaALT.
+    """
+    if estadisticas is None:
+        estadisticas = {}
+    for clave in ('asentados_adelante', 'asentados_atras', 'aristas_relajadas', 'aristas_bloqueadas_omitidas',
+                  'heap_push', 'heap_pop', 'entradas_obsoletas'):
+        estadisticas[clave] = 0
+
+    if origin_node_id == target_node_id:
+        return [origin_node_id], 0.0
+
+    inf = float('inf')
+    if graph.is_directed():
+        vecinos = (graph.succ, graph.pred)
+    else:
+        vecinos = (graph.adj, graph.adj)
+    distancia = ({origin_node_id: 0.0}, {target_node_id: 0.0})
+    padre = ({origin_node_id: None}, {target_node_id: None})
+    asentados = (set(), set())
+    colas = ([(0.0, 0, origin_node_id)], [(0.0, 0, target_node_id)])
+    estadisticas['heap_push'] = 2
+    contador = 1 # Desempate estable en el heap
+    claves_asentados = ('asentados_adelante', 'asentados_atras')
+
+    mu = inf
+    encuentro = None
+    while colas[0] and colas[1]:
+        if colas[0][0][0] + colas[1][0][0] >= mu:
+            break
+
+        lado = 0 if len(colas[0]) <= len(colas[1]) else 1
+        d, _, u = heapq.heappop(colas[lado])
+        estadisticas['heap_pop'] += 1
+        if u in asentados[lado]:
+            estadisticas['entradas_obsoletas'] += 1
+            continue
+        asentados[lado].add(u)
+        estadisticas[claves_asentados[lado]] += 1
+
+        for v, data in vecinos[lado][u].items():
+            w = data.get(weight, 1.0)
+            if w == inf:
+                estadisticas['aristas_bloqueadas_omitidas'] += 1
+                continue
+            estadisticas['aristas_relajadas'] += 1
+            nd = d + w
+            if nd < distancia[lado].get(v, inf):
+                distancia[lado][v] = nd
+                padre[lado][v] = u
+                heapq.heappush(colas[lado], (nd, contador, v))
+                contador += 1
+                estadisticas['heap_push'] += 1
+            # Mejor ruta que pasa por la arista (u, v) y une ambas búsquedas
+            if v in distancia[1 - lado] and distancia[lado][v] + distancia[1 - lado][v] < mu:
+                mu = distancia[lado][v] + distancia[1 - lado][v]
+                encuentro = v
+
+    if encuentro is None:
+        return [], inf
+
+    path = [encuentro]
+    while padre[0][path[-1]] is not None:
+        path.append(padre[0][path[-1]])
+    path.reverse()
+    nodo = encuentro
+    while padre[1][nodo] is not None:
+        nodo = padre[1][nodo]
+        path.append(nodo)
+    return path, mu
 
 class DisjointSet:
     """
@@ -50,10 +127,48 @@ class DisjointSet:
             return True
         return False
 
-def kruskal_mst(graph):
+class DisjointSetContado(DisjointSet):
+    """
+    DisjointSet que cuenta su propio trabajo: llamadas a find y union, pasos de compresión de
+    caminos y uniones que sí juntaron dos conjuntos. Kruskal lo usa solo cuando se piden
+    estadísticas; contadores() los entrega como diccionario.
+    """
+    def __init__(self, nodes):
+        super().__init__(nodes)
+        self.llamadas_find = 0
+        self.llamadas_union = 0
+        self.pasos_compresion = 0
+        self.uniones_efectivas = 0
+
+    def find(self, i):
+        self.llamadas_find += 1
+        return self._raiz(i)
+
+    def _raiz(self, i):
+        if self.parent[i] == i:
+            return i
+        # Cada nodo recorrido queda apuntando a la raíz: un paso de compresión
+        self.pasos_compresion += 1
+        self.parent[i] = self._raiz(self.parent[i])
+        return self.parent[i]
+
+    def union(self, i, j):
+        self.llamadas_union += 1
+        if super().union(i, j):
+            self.uniones_efectivas += 1
+            return True
+        return False
+
+    def contadores(self):
+        return {'llamadas_find': self.llamadas_find, 'llamadas_union': self.llamadas_union,
+                'pasos_compresion': self.pasos_compresion, 'uniones_efectivas': self.uniones_efectivas}
+
+def kruskal_mst(graph, estadisticas=None):
     """
     Implementación del algoritmo de Kruskal para encontrar el Árbol/Bosque de Expansión Mínima.
     Devuelve las aristas del MST/MSF y su costo total.
+    Si se pasa un diccionario 'estadisticas', se llenan las aristas ordenadas y los contadores
+    del Union-Find (ver DisjointSetContado.contadores).
     """
     mst_edges = []
     total_cost = 0.0
@@ -70,7 +185,7 @@ def kruskal_mst(graph):
 
     edges.sort()
 
-    ds = DisjointSet(nodes)
+    ds = DisjointSet(nodes) if estadisticas is None else DisjointSetContado(nodes)
     
     # Kruskal para un bosque de expansión mínima
     for weight, u, v in edges:
@@ -81,14 +196,20 @@ def kruskal_mst(graph):
     # No se incluye la validación de grafo conectado aquí,
     # se permite el bosque de expansión mínima.
 
+    if estadisticas is not None:
+        estadisticas['aristas_ordenadas'] = len(edges)
+        estadisticas.update(ds.contadores())
     return mst_edges, total_cost
 
 
-def prim_mst(graph):
+def prim_mst(graph, estadisticas=None):
     """
     Implementación del algoritmo de Prim para encontrar el Árbol/Bosque de Expansión Mínima.
     Devuelve las aristas del MST/MSF y su costo total.
+    Si se pasa un diccionario 'estadisticas', se llenan los contadores de operaciones del heap
+    (inserciones, extracciones y entradas obsoletas descartadas), aristas relajadas y nodos asentados.
     """
+    pushes = 0 # Único contador del ciclo; el resto se deduce al final si se piden estadísticas
     mst_edges = []
     total_cost = 0.0
     nodes = list(graph.nodes())
@@ -125,6 +246,7 @@ def prim_mst(graph):
         
         min_cost[start_node] = 0 # El costo para el nodo inicial es 0
         heapq.heappush(priority_queue, (0, start_node, None)) # (costo, nodo_destino, nodo_origen)
+        pushes += 1
 
         while priority_queue:
             weight, u, prev_v = heapq.heappop(priority_queue)
@@ -149,6 +271,7 @@ def prim_mst(graph):
                     min_cost[v] = edge_weight
                     parent_edge[v] = (u, v, edge_weight) # Guarda la arista
                     heapq.heappush(priority_queue, (edge_weight, v, u))
+                    pushes += 1
 
         # Después de procesar un componente, añadir sus aristas al resultado final
         all_mst_edges.extend(current_mst_edges)
@@ -161,14 +284,20 @@ def prim_mst(graph):
                 min_cost[node] = float('inf')
                 parent_edge[node] = None
 
+    if estadisticas is not None:
+        # El heap se vacía en cada componente: toda entrada insertada se extrae una vez
+        relajadas = sum(1 for u in visited for data in graph[u].values() if data.get('weight') is not None)
+        estadisticas.update({'heap_push': pushes, 'heap_pop': pushes, 'entradas_obsoletas': pushes - len(visited),
+                             'aristas_relajadas': relajadas, 'nodos_asentados': len(visited)})
     return all_mst_edges, all_total_costs
 
 
-def calculate_mst_for_distribution(graph_post_sismo, supply_center_id, distribution_points_ids, mst_algorithm='kruskal_custom'):
+def calculate_mst_for_distribution(graph_post_sismo, supply_center_id, distribution_points_ids, mst_algorithm='kruskal_custom', backend=None):
     """
     Calcula el Árbol de Expansión Mínimo para conectar un centro de abastecimiento
     con puntos de distribución, usando las rutas más cortas entre ellos.
     Permite seleccionar entre los algoritmos 'prim' y 'kruskal'.
+    Las distancias entre terminales se obtienen con una búsqueda por terminal en el 'backend' indicado.
     """
     mst_subgraph = nx.Graph()
 
@@ -182,17 +311,14 @@ def calculate_mst_for_distribution(graph_post_sismo, supply_center_id, distribut
 
 
     for i in range(len(nodes_for_mst)):
+        source = nodes_for_mst[i]
+        if source not in mst_subgraph:
+            continue
+        lengths = distancias_desde(graph_post_sismo, source, backend)
         for j in range(i + 1, len(nodes_for_mst)):
-            source = nodes_for_mst[i]
             target = nodes_for_mst[j]
-            if source in graph_post_sismo and target in graph_post_sismo and \
-               source in mst_subgraph and target in mst_subgraph:
-                try:
-                    path_length = nx.shortest_path_length(graph_post_sismo, source=source, target=target, weight='weight')
-                    if path_length != float('inf'):
-                        mst_subgraph.add_edge(source, target, weight=path_length)
-                except nx.NetworkXNoPath:
-                    pass
+            if target in mst_subgraph and lengths.get(target, float('inf')) != float('inf'):
+                mst_subgraph.add_edge(source, target, weight=lengths[target])
 
     if mst_subgraph.number_of_nodes() < 2:
         return [], 0.0
@@ -211,15 +337,12 @@ def calculate_mst_for_distribution(graph_post_sismo, supply_center_id, distribut
         return [], float('inf')
 
 
-def analyze_post_earthquake_connectivity(graph_post_sismo):
+def analyze_post_earthquake_connectivity(graph_post_sismo, backend=None):
     """
     Analiza la conectividad del grafo después de un sismo para identificar
     el componente conectado más grande y los nodos aislados.
     """
-    if graph_post_sismo.is_directed():
-        components = list(nx.weakly_connected_components(graph_post_sismo))
-    else:
-        components = list(nx.connected_components(graph_post_sismo))
+    components = componentes_debiles(graph_post_sismo, backend)
 
     if not components:
         return set(), set(graph_post_sismo.nodes())
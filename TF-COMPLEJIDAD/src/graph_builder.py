@@ -4,6 +4,13 @@ import networkx as nx
 import geopandas as gpd
 from shapely.geometry import Point
 from scipy.spatial import cKDTree
+import numpy as np
+import pandas as pd
+
+from src.columnar_graph import (
+    GrafoColumnar, codificar_serie, SIN_CATEGORIA,
+    TIPOS_NODO, TIPOS_ARISTA, TIPOS_VIA, RIESGOS_SISMICOS, TIPOS_INFRA, ATRIBUTOS_ZONA
+)
 
 # Función auxiliar para conectar puntos (infraestructura, zonas pobladas) a la red vial
 def _add_and_connect_points(G, gdf_points, gdf_vial_nodes, node_type, id_col, additional_attrs):
@@ -73,4 +80,62 @@ def build_urban_graph(df_red_vial_edges, gdf_vial_nodes, gdf_infra_critica, gdf_
                        longitud=row['longitud'],
                        tipo_via=row['tipo_via'],
                        riesgo_sismico=row['riesgo_sismico_zona'])
-    return G
\ No newline at end of file
+    return G
+
+
+def build_columnar_graph(df_red_vial_edges, gdf_vial_nodes, gdf_infra_critica, gdf_zonas_pobladas, riesgo_ponderacion):
+    """
+    Construye el mismo grafo urbano que build_urban_graph, pero en almacenamiento columnar
+    (GrafoColumnar): IDs internados a int32, categorías codificadas y un solo registro por
+    vía o acceso no dirigido. Todo el proceso es vectorizado, sin iterar fila por fila.
+    """
+    categorias = {'tipo_nodo': list(TIPOS_NODO), 'tipo_arista': list(TIPOS_ARISTA), 'tipo_via': list(TIPOS_VIA),
+                  'riesgo_sismico': list(RIESGOS_SISMICOS), 'tipo_infra': list(TIPOS_INFRA)}
+
+    vial_ids = gdf_vial_nodes['node_id'].to_numpy()
+    infra_ids = gdf_infra_critica['nombre'].to_numpy()
+    zona_ids = gdf_zonas_pobladas['manzana_id'].to_numpy()
+    num_vial, num_infra, num_zonas = len(vial_ids), len(infra_ids), len(zona_ids)
+    ids = np.concatenate((vial_ids, infra_ids, zona_ids))
+
+    lon = np.concatenate((gdf_vial_nodes['lon'].to_numpy(), gdf_infra_critica.geometry.x.to_numpy(), gdf_zonas_pobladas.geometry.x.to_numpy()))
+    lat = np.concatenate((gdf_vial_nodes['lat'].to_numpy(), gdf_infra_critica.geometry.y.to_numpy(), gdf_zonas_pobladas.geometry.y.to_numpy()))
+    tipo_nodo = np.repeat(np.arange(3, dtype=np.int8), [num_vial, num_infra, num_zonas])
+    tipo_infra = np.full(len(ids), SIN_CATEGORIA, dtype=np.int8)
+    tipo_infra[num_vial:num_vial + num_infra] = codificar_serie(gdf_infra_critica['tipo'], categorias['tipo_infra'])
+    fila_zona = np.full(len(ids), -1, dtype=np.int32)
+    fila_zona[num_vial + num_infra:] = np.arange(num_zonas)
+    atributos_zona = {attr: gdf_zonas_pobladas[attr].to_numpy(dtype=np.float64) for attr in ATRIBUTOS_ZONA}
+
+    # Accesos: cada punto se conecta al nodo vial más cercano (una consulta vectorizada al KD-tree)
+    kdtree = cKDTree(np.column_stack((lon[:num_vial], lat[:num_vial])))
+    puntos = np.arange(num_vial, len(ids), dtype=np.int32)
+    distancias, cercanos = kdtree.query(np.column_stack((lon[num_vial:], lat[num_vial:])))
+    acceso_peso = distancias * 111000
+
+    # Vías: solo las que tienen ambos extremos en el grafo
+    indice_ids = pd.Index(ids)
+    origen = indice_ids.get_indexer(df_red_vial_edges['origen'])
+    destino = indice_ids.get_indexer(df_red_vial_edges['destino'])
+    validas = (origen >= 0) & (destino >= 0)
+    vias = df_red_vial_edges[validas]
+    longitud = vias['longitud'].to_numpy(dtype=np.float64)
+    factor = vias['riesgo_sismico_zona'].map(riesgo_ponderacion).fillna(1.0).to_numpy(dtype=np.float64)
+
+    num_vias = len(vias)
+    num_accesos = len(puntos)
+    tipo_arista = np.repeat(np.array([categorias['tipo_arista'].index('road'), categorias['tipo_arista'].index('access')], dtype=np.int8),
+                            [num_vias, num_accesos])
+    sin_categoria = np.full(num_accesos, SIN_CATEGORIA, dtype=np.int8)
+
+    return GrafoColumnar(
+        ids, lon, lat, tipo_nodo, tipo_infra, fila_zona, atributos_zona,
+        reg_origen=np.concatenate((origen[validas], puntos)),
+        reg_destino=np.concatenate((destino[validas], cercanos)),
+        reg_peso=np.concatenate((longitud * factor, acceso_peso)),
+        reg_longitud=np.concatenate((longitud, np.full(num_accesos, np.nan))),
+        reg_tipo=tipo_arista,
+        reg_tipo_via=np.concatenate((codificar_serie(vias['tipo_via'], categorias['tipo_via']), sin_categoria)),
+        reg_riesgo=np.concatenate((codificar_serie(vias['riesgo_sismico_zona'], categorias['riesgo_sismico']), sin_categoria)),
+        categorias=categorias
+    )
\ No newline at end of file
@@ -1,11 +1,17 @@
 # src/graph_operations.py
 
 import networkx as nx
+import numpy as np
 from math import radians, sin, cos, sqrt, atan2
 
+from src.backends import ruta_dijkstra, componentes_debiles, aristas_mst, ruta_bellman_ford
+
 # Constante para la aproximación de metros por grado de latitud/longitud
 METERS_PER_DEGREE = 111000
 
+# Formas de aplicar un bloqueo: quitar la arista o dejarla con peso infinito (marcada como bloqueada)
+DAMAGE_MODES = ('remove', 'mask')
+
 def haversine_distance(lat1, lon1, lat2, lon2):
     """
     Calcula la distancia Haversine entre dos puntos geográficos en metros.
@@ -22,11 +28,28 @@ def haversine_distance(lat1, lon1, lat2, lon2):
 
     return R * c
 
+def haversine_distances(lat1, lon1, lat2, lon2):
+    """
+    Versión vectorizada de haversine_distance: recibe arreglos (o escalares) de coordenadas
+    y calcula todas las distancias en metros en una sola expresión de NumPy.
+    """
+    R = 6371000  # Radio de la Tierra en metros
+
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=float)) for x in (lat1, lon1, lat2, lon2))
+
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return R * c
+
 def create_graph(data):
     """
     Crea un grafo NetworkX a partir de los datos procesados.
     Cada nodo tiene una posición (lat, lon) y un tipo.
-    Las aristas tienen un 'weight' (distancia en metros).
+    Las aristas tienen un 'weight' (distancia en metros), calculado para todas a la vez.
     """
     G = nx.Graph()
 
@@ -34,71 +57,76 @@ def create_graph(data):
     for node_id, attrs in data['nodes'].items():
         G.add_node(node_id, pos=(attrs['lon'], attrs['lat']), type=attrs['type'], subtype=attrs.get('subtype'))
 
-    # Añadir aristas
-    for edge_id, attrs in data['edges'].items():
-        u = attrs['source']
-        v = attrs['target']
-        # Calcular peso basado en la distancia Haversine
-        if u in G.nodes and v in G.nodes:
-            lat1, lon1 = G.nodes[u]['pos'][1], G.nodes[u]['pos'][0]
-            lat2, lon2 = G.nodes[v]['pos'][1], G.nodes[v]['pos'][0]
-            distance = haversine_distance(lat1, lon1, lat2, lon2)
-            G.add_edge(u, v, weight=distance, type=attrs['type'])
+    # Añadir aristas (solo las que unen nodos existentes)
+    edges = [(attrs['source'], attrs['target'], attrs['type']) for attrs in data['edges'].values()
+             if attrs['source'] in G.nodes and attrs['target'] in G.nodes]
+    if not edges:
+        return G
+    pos_u = np.array([G.nodes[u]['pos'] for u, _, _ in edges], dtype=float)
+    pos_v = np.array([G.nodes[v]['pos'] for _, v, _ in edges], dtype=float)
+    distances = haversine_distances(pos_u[:, 1], pos_u[:, 0], pos_v[:, 1], pos_v[:, 0])
+    G.add_edges_from((u, v, {'weight': float(w), 'type': t}) for (u, v, t), w in zip(edges, distances))
     return G
 
-def apply_earthquake_damage(G_original, affected_nodes_data):
+def apply_edge_blocks(G_original, sources, targets, mode='remove'):
     """
-    Aplica daños al grafo, marcando ciertas aristas como bloqueadas.
+    Aplica en lote los bloqueos dados como arreglos de extremos (sources[i], targets[i]).
+    Con mode='remove' quita las aristas (en ambos sentidos si el grafo es dirigido); con
+    mode='mask' las conserva con peso infinito y 'blocked'=True, igual que SimuladorSismo,
+    para que la visualización siga mostrándolas. Los pares que no son aristas se ignoran.
     Retorna un nuevo grafo con los cambios.
     """
-    G_post_sismo = G_original.copy()
-    for edge_id, status in affected_nodes_data.items():
-        if status == 'blocked':
-            u, v = G_post_sismo.edges[edge_id]['source'], G_post_sismo.edges[edge_id]['target']
-            # Para simular un bloqueo total, podemos remover la arista o asignarle un peso infinito.
-            # Remover la arista es más directo para Dijkstra y Bellman-Ford.
-            if G_post_sismo.has_edge(u, v):
-                G_post_sismo.remove_edge(u, v)
-            elif G_post_sismo.has_edge(v, u): # Considerar aristas no dirigidas
-                 G_post_sismo.remove_edge(v, u)
-            # También podríamos añadir un atributo 'blocked' para la visualización
-            # G_post_sismo.edges[u,v]['blocked'] = True # Esto no funcionaría si se remueve
-
-            # Para la visualización, necesitamos saber qué aristas estaban bloqueadas en el original
-            # pero no las eliminamos completamente, sino que las marcamos y asignamos un peso muy alto
-            # para Dijkstra. Para Bellman-Ford, es mejor simplemente quitarlas si el peso es infinito.
-            # Una estrategia es crear un grafo 'con_bloqueos_marcados' para visualización
-            # y otro 'sin_bloqueos_para_algoritmos'
-    
-    # Para el propósito de visualización y Bellman-Ford/Dijkstra,
-    # es mejor simplemente quitar las aristas bloqueadas del grafo que se pasa a los algoritmos.
-    # La información de "bloqueado" para la visualización se manejará aparte.
+    if mode not in DAMAGE_MODES:
+        raise ValueError(f"Modo de daño no reconocido. Use uno de: {', '.join(DAMAGE_MODES)}.")
 
-    # Regresamos el grafo sin las aristas bloqueadas para los cálculos
+    G_post_sismo = G_original.copy()
+    pairs = list(zip(np.asarray(sources).tolist(), np.asarray(targets).tolist()))
+    if G_post_sismo.is_directed():
+        pairs += [(v, u) for u, v in pairs]
+    blocked = [(u, v) for u, v in pairs if G_post_sismo.has_edge(u, v)]
+
+    if mode == 'remove':
+        G_post_sismo.remove_edges_from(blocked)
+    else:
+        nx.set_edge_attributes(G_post_sismo, {edge: {'weight': float('inf'), 'blocked': True} for edge in blocked})
     return G_post_sismo
 
+def apply_earthquake_damage(G_original, affected_nodes_data, mode='remove'):
+    """
+    Aplica daños al grafo, marcando ciertas aristas como bloqueadas.
+    affected_nodes_data puede ser un diccionario {(u, v): estado}, con las aristas indicadas
+    por sus claves de NetworkX y estado 'blocked' para bloquearlas, o un par de arreglos
+    (sources, targets) con los extremos de las aristas bloqueadas.
+    Retorna un nuevo grafo con los cambios (ver apply_edge_blocks para 'mode').
+    """
+    if isinstance(affected_nodes_data, dict):
+        blocked = [edge_id for edge_id, status in affected_nodes_data.items() if status == 'blocked']
+        sources = [u for u, _ in blocked]
+        targets = [v for _, v in blocked]
+    else:
+        sources, targets = affected_nodes_data
+    return apply_edge_blocks(G_original, sources, targets, mode)
+
 
-def find_shortest_path_dijkstra(G, start_node, end_node):
+def find_shortest_path_dijkstra(G, start_node, end_node, backend=None):
     """
     Encuentra la ruta más corta usando Dijkstra.
     Retorna la ruta y el costo total.
     """
-    try:
-        path = nx.shortest_path(G, source=start_node, target=end_node, weight='weight')
-        cost = nx.shortest_path_length(G, source=start_node, target=end_node, weight='weight')
-        return path, cost
-    except nx.NetworkXNoPath:
+    path, _, cost = ruta_dijkstra(G, start_node, [end_node], backend)
+    if not path:
         return None, float('inf')
+    return path, cost
 
 
-def find_mst(G, start_node=None):
+def find_mst(G, start_node=None, backend=None):
     """
     Calcula el Árbol de Expansión Mínimo (MST) del grafo G.
     Retorna una lista de aristas que forman el MST.
     Si se proporciona un start_node, se asegura que el MST conecte ese nodo
     a los demás componentes o sea el centro si el grafo es conectado.
     """
-    if not nx.is_connected(G):
+    if len(componentes_debiles(G, backend)) > 1:
         # Si el grafo no está conectado, Kruskal puede encontrar un bosque de expansión mínimo.
         # Necesitamos decidir si queremos el MST de cada componente o unificarlos.
         # Para un problema de distribución, usualmente esperamos un grafo conectado.
@@ -106,11 +134,11 @@ def find_mst(G, start_node=None):
         print("Advertencia: El grafo no está completamente conectado para el MST. Se calculará un bosque de expansión mínimo.")
     
     # Usamos Kruskal para encontrar el MST
-    mst_edges = list(nx.tree.minimum_spanning_edges(G, weight='weight', data=True))
+    mst_edges = aristas_mst(G, backend)
     return mst_edges
 
 
-def bellman_ford_path(G_original, start_node, end_node, reabastecimiento_points_benefits=None):
+def bellman_ford_path(G_original, start_node, end_node, reabastecimiento_points_benefits=None, backend=None):
     """
     Encuentra la ruta más eficiente usando Bellman-Ford, considerando beneficios (pesos negativos)
     en puntos de reabastecimiento.
@@ -123,6 +151,7 @@ def bellman_ford_path(G_original, start_node, end_node, reabastecimiento_points_
                                                  de reabastecimiento y los valores son los beneficios
                                                  (ej. {'R1': 1000, 'R5': 500}). Estos se convierten
                                                  a pesos negativos.
+        backend (str): Motor de cálculo ('networkx', 'scipy' o 'arrays'); por defecto el global.
 
     Returns:
         tuple: Una tupla (path, cost) de la ruta más eficiente y su costo neto,
@@ -161,8 +190,7 @@ def bellman_ford_path(G_original, start_node, end_node, reabastecimiento_points_
 
     try:
         # NetworkX tiene una implementación de Bellman-Ford
-        path = nx.bellman_ford_path(G_bellman, source=start_node, target=end_node, weight='weight')
-        cost = nx.bellman_ford_path_length(G_bellman, source=start_node, target=end_node, weight='weight')
+        path, cost = ruta_bellman_ford(G_bellman, start_node, end_node, backend)
         return path, cost
     except nx.NetworkXNoPath:
         return None, float('inf')
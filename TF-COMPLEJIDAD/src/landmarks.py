@@ -0,0 +1,145 @@
+# src/landmarks.py
+
+import heapq
+import math
+from itertools import count
+
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from src.backends import convertir
+
+INF = float('inf')
+
+
+def nodos_periferia(graph, num_sectores=8, pos_attr='pos'):
+    """
+    Nodos de la periferia: en cada sector angular alrededor del centroide, el nodo más alejado.
+    Los puntos de referencia en el borde de la red dan cotas ajustadas para rutas que la cruzan.
+    """
+    posiciones = {n: data[pos_attr] for n, data in graph.nodes(data=True) if pos_attr in data}
+    if not posiciones:
+        return []
+    cx = sum(p[0] for p in posiciones.values()) / len(posiciones)
+    cy = sum(p[1] for p in posiciones.values()) / len(posiciones)
+    extremos = {}
+    for n, (x, y) in posiciones.items():
+        sector = int((math.atan2(y - cy, x - cx) + math.pi) / (2 * math.pi) * num_sectores) % num_sectores
+        radio = (x - cx) ** 2 + (y - cy) ** 2
+        if radio > extremos.get(sector, (-1.0, None))[0]:
+            extremos[sector] = (radio, n)
+    return [n for _, n in sorted(extremos.values(), reverse=True)]
+
+
+class PuntosReferenciaALT:
+    """
+    Preprocesamiento ALT (A*, Landmarks, desigualdad triangular) sobre el grafo sin sismo.
+
+    Se eligen puntos de referencia L entre las instalaciones críticas y la periferia, y se
+    guardan las distancias d(L, v) y d(v, L) a todos los nodos. Por la desigualdad triangular,
+    max_L max(d(v, L) - d(t, L), d(L, t) - d(L, v)) es una cota inferior de d(v, t).
+    Como SimuladorSismo solo aumenta pesos (bloqueos a inf), las distancias pre-sismo siguen
+    siendo cotas válidas y consistentes en cualquier escenario post-sismo: el preprocesamiento
+    se hace una vez y se reutiliza sin cambios para todos los escenarios.
+    """
+    def __init__(self, graph, num_landmarks=8, landmarks=None, candidatos=None, weight='weight'):
+        self.weight = weight
+        g = convertir(graph, weight)
+        self.ids = g.ids
+        self.indice = g.indice
+        matriz = g.matriz
+        matriz_inversa = matriz.T.tocsr()
+
+        self._distancias = {} # Caché de la selección: cada punto elegido se recorre una sola vez
+        if landmarks is None:
+            if candidatos is None:
+                candidatos = nodos_periferia(graph)
+                candidatos += [n for n, data in graph.nodes(data=True) if data.get('type') == 'critical_infra']
+            landmarks = self._seleccionar(matriz, matriz_inversa, list(dict.fromkeys(candidatos)), num_landmarks)
+        self.landmarks = [L for L in landmarks if L in self.indice]
+
+        # desde[i, v] = d(L_i, v) y hacia[i, v] = d(v, L_i)
+        filas = [self._distancias_landmark(matriz, matriz_inversa, L) for L in self.landmarks]
+        self.desde = np.array([ida for ida, _ in filas]).reshape(len(filas), len(self.ids))
+        self.hacia = np.array([vuelta for _, vuelta in filas]).reshape(len(filas), len(self.ids))
+        self._distancias = {}
+
+    def _distancias_landmark(self, matriz, matriz_inversa, L):
+        if L not in self._distancias:
+            i = self.indice[L]
+            self._distancias[L] = (dijkstra(matriz, directed=True, indices=i),
+                                   dijkstra(matriz_inversa, directed=True, indices=i))
+        return self._distancias[L]
+
+    def _seleccionar(self, matriz, matriz_inversa, candidatos, num_landmarks):
+        # Selección por el más lejano: el primero es el primer candidato (el nodo más periférico);
+        # cada siguiente es el candidato más alejado (ida + vuelta) de los ya elegidos
+        candidatos = [c for c in candidatos if c in self.indice]
+        if not candidatos:
+            return []
+        idx = np.array([self.indice[c] for c in candidatos])
+        elegidos = [0]
+        cercania = np.full(len(candidatos), INF)
+        while len(elegidos) < min(num_landmarks, len(candidatos)):
+            ida, vuelta = self._distancias_landmark(matriz, matriz_inversa, candidatos[elegidos[-1]])
+            cercania = np.minimum(cercania, ida[idx] + vuelta[idx])
+            cercania[elegidos] = -INF
+            # Un candidato inalcanzable (inf) cubre una zona que ningún punto elegido acota
+            elegidos.append(int(np.argmax(cercania)))
+        return [candidatos[i] for i in elegidos]
+
+    def cotas_hacia(self, destino):
+        """Cota inferior de d(v, destino) para todos los nodos v, como arreglo indexado como self.ids."""
+        t = self.indice[destino]
+        with np.errstate(invalid='ignore'):
+            # inf - inf = nan: ese punto de referencia no aporta información (fmax ignora nan)
+            cota = np.fmax(self.hacia - self.hacia[:, [t]], self.desde[:, [t]] - self.desde)
+            cota = np.fmax.reduce(cota, axis=0, initial=0.0)
+        return np.nan_to_num(cota, nan=0.0, posinf=INF)
+
+    def ruta(self, graph, origen, destino, estadisticas=None):
+        """
+        Ruta mínima de 'origen' a 'destino' con A* guiado por las cotas ALT, en el grafo dado
+        (base o post-sismo, con los mismos nodos). Ignora aristas bloqueadas (peso inf).
+        Retorna (ruta, costo) o ([], inf), como graph_algorithms.bidirectional_dijkstra.
+        """
+        if estadisticas is None:
+            estadisticas = {}
+        estadisticas['nodos_asentados'] = 0
+        estadisticas['aristas_relajadas'] = 0
+
+        cota = self.cotas_hacia(destino).tolist() # Floats de Python: más rápidos en el ciclo
+        indice = self.indice
+        if cota[indice[origen]] == INF:
+            return [], INF
+
+        contador = count()
+        g = {origen: 0.0}
+        padre = {origen: None}
+        cerrados = set()
+        heap = [(cota[indice[origen]], next(contador), origen)]
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if u in cerrados:
+                continue
+            cerrados.add(u)
+            estadisticas['nodos_asentados'] += 1
+            if u == destino:
+                path = [u]
+                while padre[path[-1]] is not None:
+                    path.append(padre[path[-1]])
+                return path[::-1], g[u]
+            for v, data in graph.succ[u].items():
+                w = data.get(self.weight, 1.0)
+                if w == INF or v in cerrados:
+                    continue
+                estadisticas['aristas_relajadas'] += 1
+                h = cota[indice[v]]
+                if h == INF: # No puede llegar al destino ni siquiera sin bloqueos
+                    continue
+                nd = g[u] + w
+                if nd < g.get(v, INF):
+                    g[v] = nd
+                    padre[v] = u
+                    heapq.heappush(heap, (nd + h, next(contador), v))
+        return [], INF
\ No newline at end of file
@@ -0,0 +1,170 @@
+# src/map_canvas.py
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+COLORES_INFRA = {
+    'hospital': 'red',
+    'refugio': 'green',
+    'estacion_rescate': 'blue',
+    'centro_salud': 'purple',
+}
+
+
+class MapaInteractivo:
+    """
+    Mapa de la red embebido en un contenedor de Tk (FigureCanvasTkAgg con barra de navegación).
+
+    La red base se dibuja una sola vez con colecciones (LineCollection y scatter), que se
+    mantienen fluidas al hacer pan/zoom en redes grandes. Rutas, bloqueos, MST y resaltados
+    son capas de artistas animados: agregarlas o quitarlas restaura el fondo guardado y
+    redibuja solo las capas (blitting), sin volver a dibujar la red.
+    """
+    def __init__(self, master):
+        self.figura = Figure(figsize=(8, 6))
+        self.ax = self.figura.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figura, master=master)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, master)
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.posiciones = {}
+        self.capas = {}
+        self._fondo = None
+        # Cada redibujado completo (pan, zoom, cambio de tamaño) renueva el fondo y repinta las capas
+        self.canvas.mpl_connect('draw_event', self._al_dibujar)
+
+    def dibujar_base(self, graph, title="Red Urbana Simulada"):
+        """Dibuja la red base y elimina todas las capas anteriores."""
+        self.capas = {}
+        self.ax.clear()
+        self.posiciones = {n: data['pos'] for n, data in graph.nodes(data=True) if 'pos' in data}
+
+        vias, accesos = [], []
+        for u, v, data in graph.edges(data=True):
+            if u > v and graph.has_edge(v, u):
+                continue # Un solo segmento por vía bidireccional
+            segmento = (self.posiciones[u], self.posiciones[v])
+            (vias if data.get('type') == 'road' else accesos).append(segmento)
+        self.ax.add_collection(LineCollection(vias, colors='#888888', linewidths=0.5, alpha=0.6))
+        self.ax.add_collection(LineCollection(accesos, colors='#bbbbbb', linewidths=0.3, alpha=0.5))
+
+        leyenda = []
+        grupos = {}
+        for n, data in graph.nodes(data=True):
+            if data.get('type') == 'critical_infra':
+                grupos.setdefault(data.get('tipo'), []).append(n)
+            elif data.get('type') == 'populated_zone':
+                grupos.setdefault('manzana', []).append(n)
+        for grupo, nodos in grupos.items():
+            xy = np.array([self.posiciones[n] for n in nodos])
+            color = COLORES_INFRA.get(grupo, 'orange')
+            tamano = 6 if grupo == 'manzana' else 30
+            self.ax.scatter(xy[:, 0], xy[:, 1], s=tamano, c=color, zorder=2)
+            leyenda.append(Line2D([0], [0], marker='o', color='w', label=grupo.replace('_', ' ').title(),
+                                  markerfacecolor=color, markersize=7))
+
+        self.ax.legend(handles=leyenda, loc='upper right', fontsize=7)
+        self.ax.set_title(title)
+        self.ax.set_aspect('equal', adjustable='datalim')
+        self.ax.autoscale_view()
+        self.canvas.draw()
+
+    def _al_dibujar(self, event):
+        self._fondo = self.canvas.copy_from_bbox(self.figura.bbox)
+        self._dibujar_capas()
+
+    def _dibujar_capas(self):
+        for artistas in self.capas.values():
+            for artista in artistas:
+                self.ax.draw_artist(artista)
+
+    def _actualizar(self):
+        if self._fondo is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._fondo)
+        self._dibujar_capas()
+        self.canvas.blit(self.figura.bbox)
+        self.canvas.flush_events()
+
+    def set_capa(self, nombre, artistas):
+        """Reemplaza la capa 'nombre' por los artistas dados y actualiza el mapa con blitting."""
+        self.quitar_capa(nombre, actualizar=False)
+        for artista in artistas:
+            artista.set_animated(True)
+        self.capas[nombre] = artistas
+        self._actualizar()
+
+    def quitar_capa(self, nombre, actualizar=True):
+        for artista in self.capas.pop(nombre, []):
+            artista.remove()
+        if actualizar:
+            self._actualizar()
+
+    def quitar_capas(self, prefijo=''):
+        """Quita todas las capas cuyo nombre empieza con 'prefijo' (todas si se omite)."""
+        for nombre in [n for n in self.capas if n.startswith(prefijo)]:
+            self.quitar_capa(nombre, actualizar=False)
+        self._actualizar()
+
+    def _segmentos(self, aristas):
+        return [(self.posiciones[u], self.posiciones[v]) for u, v in aristas]
+
+    def mostrar_ruta(self, nombre, path, color='cyan', ancho=3.0):
+        """Capa con la ruta (lista de nodos) y sus extremos: origen en magenta, destino en verde."""
+        if not path:
+            self.quitar_capa(nombre)
+            return
+        xy = np.array([self.posiciones[n] for n in path])
+        linea, = self.ax.plot(xy[:, 0], xy[:, 1], color=color, linewidth=ancho, alpha=0.9, zorder=3)
+        extremos = self.ax.scatter(xy[[0, -1], 0], xy[[0, -1], 1], s=80, c=['magenta', 'lime'], zorder=4)
+        self.set_capa(nombre, [linea, extremos])
+
+    def mostrar_aristas(self, nombre, aristas, color='black', ancho=1.5):
+        coleccion = LineCollection(self._segmentos(aristas), colors=color, linewidths=ancho, zorder=3)
+        self.ax.add_collection(coleccion)
+        self.set_capa(nombre, [coleccion])
+
+    def mostrar_bloqueos(self, graph_post_sismo, nombre='bloqueos'):
+        """Capa con las aristas bloqueadas del grafo post-sismo."""
+        bloqueadas = [(u, v) for u, v, data in graph_post_sismo.edges(data=True) if data.get('blocked', False)]
+        self.mostrar_aristas(nombre, bloqueadas, color='black', ancho=1.5)
+
+    def mostrar_mst(self, mst_edges, nombre='mst', color='blue'):
+        """Capa con las conexiones directas del MST de distribución (u, v, data)."""
+        self.mostrar_aristas(nombre, [(u, v) for u, v, _ in mst_edges], color=color, ancho=2.5)
+
+    def mostrar_nodos(self, nombre, nodos, color='red', tamano=40):
+        nodos = [n for n in nodos if n in self.posiciones]
+        if not nodos:
+            self.quitar_capa(nombre)
+            return
+        xy = np.array([self.posiciones[n] for n in nodos])
+        puntos = self.ax.scatter(xy[:, 0], xy[:, 1], s=tamano, c=color, edgecolors='black', zorder=4)
+        self.set_capa(nombre, [puntos])
+
+    def mostrar_areas_servicio(self, propietario, instalaciones, nombre='areas_servicio'):
+        """
+        Capa con las áreas de servicio: cada nodo atendido con el color de su instalación
+        ('propietario', de service_areas.areas_de_servicio) y las instalaciones como cuadrados,
+        con la misma paleta que visualize_graph.draw_service_areas_subplot.
+        """
+        colores = colormaps['tab20'](np.linspace(0, 1, 20))
+        color_instalacion = {f: colores[i % len(colores)] for i, f in enumerate(instalaciones)}
+        atendidos = [n for n, f in propietario.items() if n in self.posiciones and n not in color_instalacion]
+        artistas = []
+        if atendidos:
+            xy = np.array([self.posiciones[n] for n in atendidos])
+            artistas.append(self.ax.scatter(xy[:, 0], xy[:, 1], s=12, c=[color_instalacion[propietario[n]] for n in atendidos], zorder=3))
+        centros = [f for f in instalaciones if f in self.posiciones]
+        if centros:
+            xy = np.array([self.posiciones[f] for f in centros])
+            artistas.append(self.ax.scatter(xy[:, 0], xy[:, 1], s=90, c=[color_instalacion[f] for f in centros],
+                                            marker='s', edgecolors='black', zorder=4))
+        if not artistas:
+            self.quitar_capa(nombre)
+            return
+        self.set_capa(nombre, artistas)
\ No newline at end of file
@@ -0,0 +1,88 @@
+# src/operation_counts.py
+
+import math
+import random
+
+from src.data_simulator import simulate_vial_network, simulate_critical_infrastructure, simulate_populated_zones, RIESGO_PONDERACION
+from src.graph_builder import build_urban_graph
+from src.graph_algorithms import find_shortest_path_dijkstra, kruskal_mst, prim_mst
+
+# Tamaños de grilla (nodos viales por lado) que se miden por defecto
+TAMANOS_GRILLA = (10, 20, 40, 80)
+
+
+def log_estrella(n):
+    """Logaritmo iterado (base 2): cuántas veces hay que aplicar log2 para llegar a 1 o menos."""
+    pasos = 0
+    while n > 1:
+        n = math.log2(n)
+        pasos += 1
+    return pasos
+
+
+# Por algoritmo: (operaciones medidas, cota teórica de esas operaciones, texto de la cota, si la
+# cota es exacta). V y E son los nodos y aristas del grafo sobre el que corre (E cuenta cada
+# arista una vez; en el grafo no dirigido de los MST cada una aparece dos veces en la adyacencia).
+COTAS = {
+    'dijkstra': (lambda c: c['heap_push'] + c['heap_pop'], lambda v, e: 2 * (e + 1),
+                 "push + pop <= 2(E + 1)", True),
+    'prim': (lambda c: c['heap_push'] + c['heap_pop'], lambda v, e: 2 * (2 * e + v),
+             "push + pop <= 2(2E + V)", True),
+    'kruskal': (lambda c: c['llamadas_find'] + c['pasos_compresion'], lambda v, e: 2 * e * max(log_estrella(v), 1),
+                "find + compresión = O(E log* V)", False),
+}
+
+
+def _grafo_simulado(tamano_grilla, semilla):
+    # Misma densidad de instalaciones y manzanas que la interfaz (grilla 40x40, 100 y 500).
+    # Los simuladores usan el generador global: se restaura su estado para no alterar al llamador
+    estado = random.getstate()
+    random.seed(semilla)
+    try:
+        base_lat, base_lon, spacing = -12.0463, -77.0428, 0.002
+        area = tamano_grilla / 2 * spacing
+        df_red_vial_edges, gdf_vial_nodes = simulate_vial_network(base_lat, base_lon, tamano_grilla, tamano_grilla, spacing)
+        gdf_infra_critica = simulate_critical_infrastructure(base_lat, base_lon, area, max(tamano_grilla ** 2 // 16, 5))
+        gdf_zonas_pobladas = simulate_populated_zones(base_lat, base_lon, area, max(tamano_grilla ** 2 * 5 // 16, 5))
+    finally:
+        random.setstate(estado)
+    return build_urban_graph(df_red_vial_edges, gdf_vial_nodes, gdf_infra_critica, gdf_zonas_pobladas, RIESGO_PONDERACION)
+
+
+def medir_operaciones(tamanos_grilla=TAMANOS_GRILLA, semilla=1):
+    """
+    Corre Dijkstra (motor 'arrays'), Prim y Kruskal con contadores sobre redes simuladas de
+    tamaño creciente y compara las operaciones medidas con su cota teórica (ver COTAS).
+    Dijkstra va desde una manzana al refugio más cercano sobre el grafo dirigido; los MST,
+    sobre la red no dirigida completa.
+    Retorna una lista de filas: {'algoritmo', 'nodos', 'aristas', 'medido', 'cota', 'razon',
+    'cota_exacta', 'contadores'}; una 'razon' (medido / cota) que no crece con el tamaño
+    confirma la complejidad, y con cota exacta nunca debe pasar de 1.
+    """
+    filas = []
+    for tamano in tamanos_grilla:
+        graph = _grafo_simulado(tamano, semilla)
+        no_dirigido = graph.to_undirected()
+        zonas = [n for n, data in graph.nodes(data=True) if data.get('type') == 'populated_zone']
+        refugios = [n for n, data in graph.nodes(data=True) if data.get('type') == 'critical_infra' and data.get('tipo') == 'refugio']
+
+        contadores = {algoritmo: {} for algoritmo in COTAS}
+        find_shortest_path_dijkstra(graph, random.Random(semilla).choice(zonas), refugios, estadisticas=contadores['dijkstra'])
+        prim_mst(no_dirigido, estadisticas=contadores['prim'])
+        kruskal_mst(no_dirigido, estadisticas=contadores['kruskal'])
+
+        tamanos_grafo = {'dijkstra': (graph.number_of_nodes(), graph.number_of_edges()),
+                         'prim': (no_dirigido.number_of_nodes(), no_dirigido.number_of_edges()),
+                         'kruskal': (no_dirigido.number_of_nodes(), no_dirigido.number_of_edges())}
+        for algoritmo, (medir, cota, _, exacta) in COTAS.items():
+            v, e = tamanos_grafo[algoritmo]
+            medido, limite = medir(contadores[algoritmo]), cota(v, e)
+            filas.append({'algoritmo': algoritmo, 'nodos': v, 'aristas': e, 'medido': medido, 'cota': limite,
+                          'razon': medido / limite if limite else 0.0, 'cota_exacta': exacta,
+                          'contadores': contadores[algoritmo]})
+    return filas
+
+
+def textos_cotas():
+    """Texto de la cota de cada algoritmo (para tablas y gráficos)."""
+    return {algoritmo: texto for algoritmo, (_, _, texto, _) in COTAS.items()}
\ No newline at end of file
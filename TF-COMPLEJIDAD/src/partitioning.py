@@ -0,0 +1,304 @@
+# src/partitioning.py
+
+import heapq
+from itertools import count
+from concurrent.futures import ProcessPoolExecutor
+
+from src.graph_algorithms import DisjointSet
+
+INF = float('inf')
+
+
+def biseccion_recursiva(graph, num_distritos, pos_attr='pos'):
+    """
+    Divide los nodos en 'num_distritos' distritos por bisección recursiva de coordenadas:
+    en cada paso se corta por la mediana del eje (lon o lat) de mayor extensión, en
+    proporción al número de distritos de cada lado. Los cortes rectos sobre una red vial
+    plana cortan pocas aristas. Retorna {nodo: distrito}.
+    """
+    asignacion = {}
+
+    def dividir(nodos, k, primer_distrito):
+        if k == 1 or len(nodos) <= 1:
+            for n in nodos:
+                asignacion[n] = primer_distrito
+            return
+        lons = [graph.nodes[n][pos_attr][0] for n in nodos]
+        lats = [graph.nodes[n][pos_attr][1] for n in nodos]
+        eje = 0 if max(lons) - min(lons) >= max(lats) - min(lats) else 1
+        nodos = sorted(nodos, key=lambda n: (graph.nodes[n][pos_attr][eje], n))
+        k_izq = k // 2
+        corte = len(nodos) * k_izq // k
+        dividir(nodos[:corte], k_izq, primer_distrito)
+        dividir(nodos[corte:], k - k_izq, primer_distrito + k_izq)
+
+    dividir(list(graph.nodes()), num_distritos, 0)
+    return asignacion
+
+
+def _dijkstra_local(adyacencia, fuentes):
+    # fuentes: {nodo: distancia inicial}; ignora aristas bloqueadas (peso inf)
+    distancia = {}
+    heap = [(d, n) for n, d in fuentes.items()]
+    heapq.heapify(heap)
+    while heap:
+        d, x = heapq.heappop(heap)
+        if x in distancia:
+            continue
+        distancia[x] = d
+        for y, w in adyacencia.get(x, ()):
+            if y not in distancia and w != INF:
+                heapq.heappush(heap, (d + w, y))
+    return distancia
+
+
+def _procesar_distrito(nodos, aristas, frontera):
+    """
+    Trabajo local de un distrito (se ejecuta en un proceso del pool): componentes conexas
+    internas y tabla de distancias entre sus nodos frontera dentro del distrito.
+    Recibe solo listas de nodos y aristas (u, v, peso) para que el envío al proceso sea barato.
+    """
+    adyacencia = {}
+    padre = {n: n for n in nodos}
+
+    def find(i):
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    for u, v, w in aristas:
+        adyacencia.setdefault(u, []).append((v, w))
+        padre[find(u)] = find(v)
+
+    componentes = {}
+    for n in nodos:
+        componentes.setdefault(find(n), []).append(n)
+
+    tabla = {}
+    for b in frontera:
+        distancia = _dijkstra_local(adyacencia, {b: 0.0})
+        tabla[b] = {c: distancia[c] for c in frontera if c in distancia and c != b}
+    return list(componentes.values()), tabla
+
+
+class GrafoParticionado:
+    """
+    Grafo dividido en distritos geográficos. Cada distrito guarda sus componentes internas
+    y la tabla de distancias entre sus nodos frontera (extremos de aristas de corte),
+    calculadas en paralelo en procesos separados. El overlay (nodos frontera + atajos de
+    las tablas + aristas de corte) une los resultados locales y da las mismas distancias y
+    componentes que el cálculo sobre el grafo completo.
+
+    Sin 'executor' se crea un ProcessPoolExecutor propio la primera vez que hay más de un
+    distrito que recalcular, y se reutiliza en los escenarios siguientes; cerrar() (o salir
+    del bloque 'with') lo libera.
+    """
+    def __init__(self, graph, num_distritos=4, asignacion=None, executor=None, weight='weight'):
+        self.graph = graph
+        self.weight = weight
+        self.distrito = asignacion if asignacion is not None else biseccion_recursiva(graph, num_distritos)
+        self.num_distritos = max(self.distrito.values()) + 1 if self.distrito else 0
+        self.executor = executor
+        self._pool_propio = None
+
+        self.nodos_distrito = [[] for _ in range(self.num_distritos)]
+        for n in graph.nodes():
+            self.nodos_distrito[self.distrito[n]].append(n)
+
+        self.aristas_corte = {}
+        self.frontera = [set() for _ in range(self.num_distritos)]
+        for u, v, data in graph.edges(data=True):
+            if self.distrito[u] != self.distrito[v]:
+                self.aristas_corte[(u, v)] = data.get(weight, 1.0)
+                self.frontera[self.distrito[u]].add(u)
+                self.frontera[self.distrito[v]].add(v)
+
+        self.componentes_locales = [None] * self.num_distritos
+        self.tablas = [None] * self.num_distritos
+        self._adyacencias = {}
+        self.aristas_bloqueadas = set() # Aristas dirigidas (a, b) bloqueadas en el escenario actual
+        self.recalcular_distritos(range(self.num_distritos))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        """Cierra el pool propio (si se creó); el executor entregado por el usuario no se toca."""
+        if self._pool_propio is not None:
+            self._pool_propio.shutdown()
+            self._pool_propio = None
+
+    def _aristas_internas(self, d):
+        for u in self.nodos_distrito[d]:
+            for v, data in self.graph.succ[u].items():
+                if self.distrito[v] == d:
+                    yield u, v, data.get(self.weight, 1.0)
+
+    def recalcular_distritos(self, distritos):
+        """Recalcula (en paralelo) las componentes y tablas frontera de los distritos indicados."""
+        distritos = list(distritos)
+        trabajos = [(self.nodos_distrito[d], list(self._aristas_internas(d)), sorted(self.frontera[d])) for d in distritos]
+        executor = self.executor
+        if executor is None and len(distritos) > 1:
+            if self._pool_propio is None:
+                self._pool_propio = ProcessPoolExecutor()
+            executor = self._pool_propio
+        ejecutar = executor.map if executor is not None else map
+        resultados = list(ejecutar(_procesar_distrito, *zip(*trabajos))) if trabajos else []
+        for d, (componentes, tabla) in zip(distritos, resultados):
+            self.componentes_locales[d] = componentes
+            self.tablas[d] = tabla
+            self._adyacencias.pop((d, False), None)
+            self._adyacencias.pop((d, True), None)
+
+    def aplicar_bloqueos(self, graph_post_sismo, bloqueos_aplicados):
+        """
+        Pasa a otro escenario (desde el grafo base o desde un escenario anterior): vuelve a
+        leer de 'graph_post_sismo' los pesos de todas las aristas de corte y recalcula solo
+        los distritos con vías internas que cambiaron de estado respecto del escenario
+        anterior (diferencia simétrica de los bloqueos). Retorna los distritos recalculados.
+        """
+        self.graph = graph_post_sismo
+        for a, b in self.aristas_corte:
+            self.aristas_corte[(a, b)] = graph_post_sismo[a][b].get(self.weight, 1.0)
+
+        bloqueadas = set()
+        for bloqueo in bloqueos_aplicados:
+            u, v = bloqueo[0], bloqueo[1]
+            for a, b in ((u, v), (v, u)):
+                if graph_post_sismo.has_edge(a, b):
+                    bloqueadas.add((a, b))
+        afectados = {self.distrito[a] for a, b in bloqueadas ^ self.aristas_bloqueadas if (a, b) not in self.aristas_corte}
+        self.aristas_bloqueadas = bloqueadas
+        self.recalcular_distritos(sorted(afectados))
+        return afectados
+
+    def componentes(self):
+        """
+        Componentes débilmente conexas del grafo completo: une las componentes locales de
+        cada distrito a través de las aristas de corte. Como analyze_post_earthquake_connectivity,
+        toda arista existente cuenta, aunque esté bloqueada.
+        """
+        conjuntos = DisjointSet(self.graph.nodes())
+        for componentes in self.componentes_locales:
+            for componente in componentes:
+                for n in componente[1:]:
+                    conjuntos.union(componente[0], n)
+        for u, v in self.aristas_corte:
+            conjuntos.union(u, v)
+        grupos = {}
+        for n in self.graph.nodes():
+            grupos.setdefault(conjuntos.find(n), set()).add(n)
+        return list(grupos.values())
+
+    def _adyacencia_local(self, d, inversa=False):
+        # Se guarda en caché hasta que el distrito se recalcula
+        if (d, inversa) not in self._adyacencias:
+            adyacencia = {}
+            for u, v, w in self._aristas_internas(d):
+                if inversa:
+                    adyacencia.setdefault(v, []).append((u, w))
+                else:
+                    adyacencia.setdefault(u, []).append((v, w))
+            self._adyacencias[(d, inversa)] = adyacencia
+        return self._adyacencias[(d, inversa)]
+
+    def ruta_minima(self, origen, destinos):
+        """
+        Ruta mínima desde 'origen' al destino más cercano de la lista, combinando búsquedas
+        locales en el distrito del origen y de los destinos con una búsqueda sobre el overlay.
+        Retorna (ruta, destino, distancia) o ([], None, inf), como backends.ruta_dijkstra.
+        """
+        destinos = [t for t in destinos if t in self.graph]
+        d_origen = self.distrito[origen]
+        desde_origen = _dijkstra_local(self._adyacencia_local(d_origen), {origen: 0.0})
+
+        # Distancia local de cada nodo frontera al destino más cercano de su distrito
+        salida = {}
+        for d in sorted({self.distrito[t] for t in destinos}):
+            locales = [t for t in destinos if self.distrito[t] == d]
+            hacia_destino = _dijkstra_local(self._adyacencia_local(d, inversa=True), {t: 0.0 for t in locales})
+            for b in self.frontera[d]:
+                if b in hacia_destino:
+                    salida[b] = hacia_destino[b]
+
+        mejor, mejor_frontera = INF, None
+        for t in destinos:
+            if desde_origen.get(t, INF) < mejor:
+                mejor, mejor_frontera = desde_origen[t], None
+
+        # Dijkstra sobre el overlay: atajos intra-distrito y aristas de corte
+        distancia = {}
+        padre = {}
+        desempate = count()
+        heap = [(desde_origen[b], next(desempate), b, None) for b in self.frontera[d_origen] if b in desde_origen]
+        heapq.heapify(heap)
+        while heap:
+            d, _, x, via = heapq.heappop(heap)
+            if d >= mejor:
+                break
+            if x in distancia:
+                continue
+            distancia[x] = d
+            padre[x] = via
+            if d + salida.get(x, INF) < mejor:
+                mejor, mejor_frontera = d + salida[x], x
+            for y, w in self.tablas[self.distrito[x]].get(x, {}).items():
+                if y not in distancia:
+                    heapq.heappush(heap, (d + w, next(desempate), y, x))
+            for y in self.graph.succ[x]:
+                w = self.aristas_corte.get((x, y))
+                if w is not None and w != INF and y not in distancia:
+                    heapq.heappush(heap, (d + w, next(desempate), y, x))
+
+        if mejor == INF:
+            return [], None, INF
+        path, destino = self._reconstruir(origen, destinos, mejor_frontera, padre)
+        return path, destino, mejor
+
+    def _tramo_local(self, d, fuentes, objetivo):
+        # Camino mínimo dentro del distrito d desde cualquiera de 'fuentes' hasta 'objetivo'
+        adyacencia = self._adyacencia_local(d)
+        distancia, previo = {}, {}
+        desempate = count()
+        heap = [(0.0, next(desempate), f, None) for f in fuentes]
+        heapq.heapify(heap)
+        while heap:
+            dist, _, x, via = heapq.heappop(heap)
+            if x in distancia:
+                continue
+            distancia[x] = dist
+            previo[x] = via
+            if objetivo(x):
+                path = [x]
+                while previo[path[-1]] is not None:
+                    path.append(previo[path[-1]])
+                return path[::-1]
+            for y, w in adyacencia.get(x, ()):
+                if y not in distancia and w != INF:
+                    heapq.heappush(heap, (dist + w, next(desempate), y, x))
+        return []
+
+    def _reconstruir(self, origen, destinos, ultima_frontera, padre):
+        objetivos = set(destinos)
+        if ultima_frontera is None:
+            path = self._tramo_local(self.distrito[origen], [origen], lambda x: x in objetivos)
+            return path, path[-1]
+
+        saltos = [ultima_frontera]
+        while padre[saltos[-1]] is not None:
+            saltos.append(padre[saltos[-1]])
+        saltos.reverse()
+
+        path = self._tramo_local(self.distrito[origen], [origen], lambda x: x == saltos[0])
+        for a, b in zip(saltos[:-1], saltos[1:]):
+            if self.distrito[a] != self.distrito[b]: # Arista de corte
+                path.append(b)
+            else:
+                path += self._tramo_local(self.distrito[a], [a], lambda x, b=b: x == b)[1:]
+        path += self._tramo_local(self.distrito[ultima_frontera], [ultima_frontera], lambda x: x in objetivos)[1:]
+        return path, path[-1]
\ No newline at end of file
@@ -0,0 +1,133 @@
+# src/reliable_routing.py
+
+import heapq
+import math
+import weakref
+
+from src.backends import huella_grafo
+
+INF = float('inf')
+
+_cache_tablas = weakref.WeakKeyDictionary()
+
+
+def probabilidad_bloqueo(graph, u, v, prob_alto, prob_medio):
+    """
+    Probabilidad de que la arista (u, v) quede bloqueada con SimuladorSismo.simular_bloqueos:
+    p = 'prob_alto' para las vías de riesgo 'alto', 'prob_medio' para las de riesgo 'medio' y
+    0 para el resto (vías de riesgo bajo y aristas de acceso). El simulador sortea cada
+    sentido por separado y cualquiera de los dos sorteos cierra la vía completa, así que una
+    vía de doble sentido queda cerrada con probabilidad 1 - (1 - p)^2.
+    """
+    data = graph[u][v]
+    if data.get('type') != 'road':
+        return 0.0
+    riesgo = data.get('riesgo_sismico', 'bajo')
+    if riesgo == 'alto':
+        p = prob_alto
+    elif riesgo == 'medio':
+        p = prob_medio
+    else:
+        return 0.0
+    inversa = graph.get_edge_data(v, u)
+    if inversa is not None and inversa.get('type') == 'road':
+        return 1.0 - (1.0 - p) ** 2
+    return p
+
+
+def costo_riesgo(probabilidad):
+    """-log(probabilidad de que la arista siga abierta): se suma a lo largo de una ruta."""
+    if probabilidad >= 1.0:
+        return INF
+    return -math.log1p(-probabilidad)
+
+
+def probabilidad_ruta(graph, path, prob_alto, prob_medio):
+    """
+    Probabilidad de que la ruta quede completamente abierta, tomando las vías como
+    independientes (así las sortea el simulador).
+    """
+    riesgo = sum(costo_riesgo(probabilidad_bloqueo(graph, u, v, prob_alto, prob_medio)) for u, v in zip(path[:-1], path[1:]))
+    return math.exp(-riesgo) if path else 0.0
+
+
+class TablaRutasConfiables:
+    """
+    Tabla de instalación "más confiable" para todos los nodos, con un único Dijkstra
+    multi-fuente hacia las instalaciones (como ArbolCaminosIncremental con hacia_fuentes=True).
+
+    El costo de cada arista es su riesgo -log(1 - p), con p de probabilidad_bloqueo: la
+    suma a lo largo de una ruta es -log de la probabilidad de que quede abierta, así que la
+    ruta de menor riesgo es la más confiable (a igual riesgo, la más corta).
+    Con 'lambda_riesgo' el costo es combinado: peso + lambda_riesgo * riesgo, donde
+    lambda_riesgo son los metros que se está dispuesto a recorrer de más por unidad de riesgo.
+    Las aristas bloqueadas (peso inf) se ignoran.
+    """
+    def __init__(self, graph, destinos, prob_alto, prob_medio, lambda_riesgo=None, weight='weight'):
+        self.graph = graph
+        self.destinos = [d for d in destinos if d in graph]
+        self.lambda_riesgo = lambda_riesgo
+        self.distancia = {} # Metros (según 'weight') hasta la instalación
+        self.riesgo = {}    # -log(probabilidad de llegar)
+        self.siguiente = {}
+        self.destino = {}
+        self.huella = huella_grafo(graph)
+
+        # Clave del heap: (riesgo, metros) en modo confiable; (costo combinado, 0) en modo combinado
+        heap = [(0.0, 0.0, 0.0, 0.0, i, d, None, d) for i, d in enumerate(self.destinos)]
+        heapq.heapify(heap)
+        while heap:
+            _, _, riesgo, metros, i, x, siguiente, destino = heapq.heappop(heap)
+            if x in self.riesgo:
+                continue
+            self.riesgo[x] = riesgo
+            self.distancia[x] = metros
+            self.siguiente[x] = siguiente
+            self.destino[x] = destino
+            for y, data in graph.pred[x].items():
+                w = data.get(weight, 1.0)
+                if y in self.riesgo or w == INF:
+                    continue
+                nuevo_riesgo = riesgo + costo_riesgo(probabilidad_bloqueo(graph, y, x, prob_alto, prob_medio))
+                if nuevo_riesgo == INF:
+                    continue
+                nuevos_metros = metros + w
+                if lambda_riesgo is None:
+                    clave = (nuevo_riesgo, nuevos_metros)
+                else:
+                    clave = (nuevos_metros + lambda_riesgo * nuevo_riesgo, 0.0)
+                heapq.heappush(heap, clave + (nuevo_riesgo, nuevos_metros, i, y, x, destino))
+
+    def probabilidad_llegada(self, nodo):
+        """Probabilidad de que la ruta de 'nodo' a su instalación quede abierta (0 si no hay ruta)."""
+        return math.exp(-self.riesgo[nodo]) if nodo in self.riesgo else 0.0
+
+    def ruta(self, nodo):
+        """
+        Ruta de 'nodo' a su instalación según el criterio de la tabla.
+        Retorna (ruta, instalación, metros), igual que find_shortest_path_dijkstra;
+        si no hay ruta retorna ([], None, inf).
+        """
+        if nodo not in self.riesgo:
+            return [], None, INF
+        path = [nodo]
+        while self.siguiente[path[-1]] is not None:
+            path.append(self.siguiente[path[-1]])
+        return path, self.destino[nodo], self.distancia[nodo]
+
+
+def tabla_rutas_confiables(graph, destinos, prob_alto, prob_medio, lambda_riesgo=None, weight='weight'):
+    """
+    TablaRutasConfiables guardada en caché por grafo y por configuración de probabilidades
+    (prob_alto, prob_medio, lambda_riesgo): cambiar el origen es solo una consulta, y volver a
+    una configuración ya usada no repite la búsqueda. Igual que backends.convertir, la caché se
+    descarta si cambia la huella del grafo (huella_grafo); tras modificar pesos en sitio,
+    llamar a backends.invalidar_cache(graph).
+    """
+    clave = (tuple(destinos), prob_alto, prob_medio, lambda_riesgo, weight)
+    por_grafo = _cache_tablas.setdefault(graph, {})
+    tabla = por_grafo.get(clave)
+    if tabla is None or tabla.huella != huella_grafo(graph):
+        tabla = TablaRutasConfiables(graph, destinos, prob_alto, prob_medio, lambda_riesgo, weight)
+        por_grafo[clave] = tabla
+    return tabla
\ No newline at end of file
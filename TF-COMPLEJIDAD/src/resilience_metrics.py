@@ -0,0 +1,148 @@
+# src/resilience_metrics.py
+
+import math
+import random
+from statistics import NormalDist
+
+from src.backends import distancias_desde
+from src.service_areas import areas_de_servicio
+
+INF = float('inf')
+
+
+def _instalaciones(graph, tipo):
+    return [n for n, data in graph.nodes(data=True) if data.get('type') == 'critical_infra' and data.get('tipo') == tipo]
+
+
+def metricas_acceso(graph, tipo_destino='refugio', weight='weight'):
+    """
+    Métricas de acceso de la población a la instalación más cercana de un tipo, con un único
+    Dijkstra multi-fuente (areas_de_servicio) sobre las aristas abiertas:
+      - poblacion_total, poblacion_sin_acceso y fraccion_sin_acceso (de 'poblacion').
+      - distancia_media_ponderada: promedio de la distancia de cada manzana con acceso,
+        ponderado por su población (inf si nadie tiene acceso).
+    """
+    _, distancia = areas_de_servicio(graph, _instalaciones(graph, tipo_destino), weight=weight)
+
+    poblacion_total = poblacion_sin_acceso = zonas_sin_acceso = 0
+    suma_ponderada = 0.0
+    for n, data in graph.nodes(data=True):
+        if data.get('type') != 'populated_zone':
+            continue
+        poblacion = data.get('poblacion', 0)
+        poblacion_total += poblacion
+        if n in distancia:
+            suma_ponderada += poblacion * distancia[n]
+        else:
+            poblacion_sin_acceso += poblacion
+            zonas_sin_acceso += 1
+
+    poblacion_con_acceso = poblacion_total - poblacion_sin_acceso
+    return {
+        'tipo_destino': tipo_destino,
+        'poblacion_total': poblacion_total,
+        'poblacion_sin_acceso': poblacion_sin_acceso,
+        'zonas_sin_acceso': zonas_sin_acceso,
+        'fraccion_sin_acceso': poblacion_sin_acceso / poblacion_total if poblacion_total else 0.0,
+        'distancia_media_ponderada': suma_ponderada / poblacion_con_acceso if poblacion_con_acceso else INF,
+    }
+
+
+def _intervalo(valores, total_poblacion, nivel_confianza):
+    # Media muestral con intervalo normal y corrección por población finita (muestreo sin reemplazo)
+    k = len(valores)
+    media = sum(valores) / k
+    if k < 2:
+        return media, (media, media)
+    varianza = sum((x - media) ** 2 for x in valores) / (k - 1)
+    correccion = (total_poblacion - k) / (total_poblacion - 1) if total_poblacion > 1 else 0.0
+    error = NormalDist().inv_cdf(0.5 + nivel_confianza / 2) * math.sqrt(varianza / k * correccion)
+    return media, (media - error, media + error)
+
+
+def _eficiencia_desde(graph, fuente, nodos, backend, weight):
+    # Eficiencia local de la fuente: promedio de 1/d hacia los demás nodos (0 si no es alcanzable)
+    distancia = distancias_desde(graph, fuente, backend, weight)
+    suma = 0.0
+    for n in nodos:
+        d = distancia.get(n, INF)
+        if n != fuente and 0 < d < INF:
+            suma += 1.0 / d
+    return suma / (len(nodos) - 1)
+
+
+def muestrear_fuentes(graph, num_muestras, nodos=None, semilla=None):
+    """Muestra sin reemplazo de nodos fuente; todos los nodos si num_muestras los cubre."""
+    nodos = sorted(graph.nodes()) if nodos is None else list(nodos)
+    if num_muestras >= len(nodos):
+        return nodos
+    return random.Random(semilla).sample(nodos, num_muestras)
+
+
+def eficiencia_global(graph, num_muestras=50, nodos=None, fuentes=None, nivel_confianza=0.95,
+                      semilla=None, backend=None, weight='weight'):
+    """
+    Eficiencia global E = promedio sobre pares (i, j) de 1/d(i, j), con 1/inf = 0, estimada
+    con 'num_muestras' fuentes al azar: cada fuente cuesta un Dijkstra y aporta el promedio
+    de 1/d hacia el resto, y E es la media de esos aportes sobre todas las fuentes.
+    Si la muestra cubre todos los nodos el resultado es exacto.
+    Retorna {'estimacion', 'intervalo', 'num_fuentes', 'exacto'}.
+    """
+    nodos = list(graph.nodes()) if nodos is None else list(nodos)
+    if len(nodos) < 2:
+        return {'estimacion': 0.0, 'intervalo': (0.0, 0.0), 'num_fuentes': 0, 'exacto': True}
+    if fuentes is None:
+        fuentes = muestrear_fuentes(graph, num_muestras, nodos, semilla)
+
+    valores = [_eficiencia_desde(graph, f, nodos, backend, weight) for f in fuentes]
+    estimacion, intervalo = _intervalo(valores, len(nodos), nivel_confianza)
+    return {
+        'estimacion': estimacion,
+        'intervalo': intervalo,
+        'num_fuentes': len(fuentes),
+        'exacto': len(fuentes) >= len(nodos),
+    }
+
+
+def comparar_resiliencia(graph_original, graph_post_sismo, tipos_destino=('refugio',), num_muestras=50,
+                         nivel_confianza=0.95, semilla=None, backend=None, weight='weight'):
+    """
+    Degradación de la red entre el escenario original y el post-sismo:
+      - Métricas de acceso exactas por tipo de instalación (un Dijkstra multi-fuente por grafo).
+      - Eficiencia global estimada en ambos grafos con las mismas fuentes, de modo que la
+        pérdida se estima con diferencias pareadas y su intervalo es más angosto que el de
+        restar dos estimaciones independientes.
+    El costo es 2 * (len(tipos_destino) + num_muestras) búsquedas, no todos los pares.
+    """
+    nodos = list(graph_original.nodes())
+    fuentes = muestrear_fuentes(graph_original, num_muestras, nodos, semilla)
+
+    acceso = {}
+    for tipo in tipos_destino:
+        antes = metricas_acceso(graph_original, tipo, weight)
+        despues = metricas_acceso(graph_post_sismo, tipo, weight)
+        acceso[tipo] = {
+            'original': antes,
+            'post_sismo': despues,
+            'aumento_poblacion_sin_acceso': despues['poblacion_sin_acceso'] - antes['poblacion_sin_acceso'],
+            'aumento_distancia_media': despues['distancia_media_ponderada'] - antes['distancia_media_ponderada'],
+        }
+
+    if len(nodos) < 2:
+        valores_original = valores_post = [0.0]
+    else:
+        valores_original = [_eficiencia_desde(graph_original, f, nodos, backend, weight) for f in fuentes]
+        valores_post = [_eficiencia_desde(graph_post_sismo, f, nodos, backend, weight) for f in fuentes]
+    eficiencias = {}
+    for nombre, valores in (('original', valores_original), ('post_sismo', valores_post),
+                            ('perdida', [a - b for a, b in zip(valores_original, valores_post)])):
+        estimacion, intervalo = _intervalo(valores, len(nodos), nivel_confianza)
+        eficiencias[nombre] = {'estimacion': estimacion, 'intervalo': intervalo}
+
+    return {
+        'acceso': acceso,
+        'eficiencia_original': eficiencias['original'],
+        'eficiencia_post_sismo': eficiencias['post_sismo'],
+        'perdida_eficiencia': eficiencias['perdida'],
+        'num_fuentes': len(fuentes),
+    }
\ No newline at end of file
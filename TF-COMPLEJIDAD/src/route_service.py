@@ -0,0 +1,237 @@
+# src/route_service.py
+
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from src.earthquake_simulator import SimuladorSismo
+from src.dynamic_sssp import ArbolCaminosIncremental
+from src.graph_algorithms import calculate_mst_for_distribution, analyze_post_earthquake_connectivity
+
+TIPOS_DESTINO = ['refugio', 'hospital', 'estacion_rescate', 'centro_salud']
+
+# Escenarios que se retienen en memoria: el actual y los anteriores más recientes
+MAX_ESCENARIOS = 4
+
+MENSAJES_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class ErrorConsulta(Exception):
+    """Error de la consulta del cliente; se responde con el código HTTP indicado."""
+    def __init__(self, mensaje, codigo=400):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+def _tabla_instalacion_mas_cercana(graph, destinos_ids):
+    # Función de nivel de módulo para poder ejecutarse también en un ProcessPoolExecutor
+    return ArbolCaminosIncremental(graph, destinos_ids)
+
+
+def _costo_json(valor):
+    # JSON no admite inf: las rutas inexistentes se reportan como null
+    return None if valor is None or math.isinf(valor) else valor
+
+
+class ServicioRutas:
+    """
+    Servicio HTTP/JSON local (asyncio) para consultar rutas sobre el escenario sísmico actual.
+
+    Las búsquedas se ejecutan en un pool (hilos por defecto; puede pasarse un
+    ProcessPoolExecutor). Las consultas concurrentes de evacuación sobre el mismo
+    escenario y tipo de destino se agrupan en una sola búsqueda multi-fuente desde
+    las instalaciones, cuyo resultado queda en caché para las consultas siguientes.
+    Solo se retienen los últimos 'max_escenarios' escenarios (incluido el actual); al
+    descartar uno se descartan también sus resultados en caché.
+    """
+    def __init__(self, graph, graph_post_sismo=None, executor=None, max_escenarios=MAX_ESCENARIOS):
+        self.graph = graph
+        self.executor = executor or ThreadPoolExecutor()
+        self.max_escenarios = max(1, max_escenarios)
+        self.escenarios = {0: graph_post_sismo if graph_post_sismo is not None else graph}
+        self.escenario_actual = 0
+        self._resultados = {}
+        self._en_curso = {}
+        self.busquedas_ejecutadas = 0
+
+    def publicar_escenario(self, graph_post_sismo):
+        """
+        Registra un nuevo grafo post-sismo y lo marca como escenario actual. Descarta los
+        escenarios más antiguos que excedan max_escenarios junto con sus resultados.
+        """
+        self.escenario_actual = max(self.escenarios) + 1
+        self.escenarios[self.escenario_actual] = graph_post_sismo
+        while len(self.escenarios) > self.max_escenarios:
+            self.descartar_escenario(min(self.escenarios))
+        return self.escenario_actual
+
+    def descartar_escenario(self, escenario):
+        """Libera el grafo de un escenario (que no sea el actual) y sus resultados en caché."""
+        if escenario == self.escenario_actual:
+            raise ErrorConsulta("No se puede descartar el escenario actual.")
+        self.escenarios.pop(escenario, None)
+        # Todas las claves de caché tienen el escenario en la segunda posición
+        for clave in [clave for clave in self._resultados if clave[1] == escenario]:
+            del self._resultados[clave]
+
+    def _grafo_escenario(self, escenario):
+        escenario = self.escenario_actual if escenario is None else int(escenario)
+        if escenario not in self.escenarios:
+            raise ErrorConsulta(f"El escenario {escenario} no existe.", 404)
+        return escenario, self.escenarios[escenario]
+
+    async def _coalescer(self, clave, funcion, *args):
+        """
+        Ejecuta funcion(*args) en el pool una sola vez por clave: las llamadas concurrentes
+        con la misma clave esperan el mismo futuro y las posteriores usan la caché.
+        """
+        if clave in self._resultados:
+            return self._resultados[clave]
+        if clave not in self._en_curso:
+            loop = asyncio.get_running_loop()
+            self._en_curso[clave] = loop.run_in_executor(self.executor, funcion, *args)
+            self.busquedas_ejecutadas += 1
+        futuro = self._en_curso[clave]
+        try:
+            resultado = await asyncio.shield(futuro)
+        finally:
+            self._en_curso.pop(clave, None)
+        if clave[1] in self.escenarios: # El escenario pudo descartarse mientras se calculaba
+            self._resultados[clave] = resultado
+        return resultado
+
+    async def evacuacion(self, origen, tipo='refugio', escenario=None):
+        escenario, graph = self._grafo_escenario(escenario)
+        if tipo not in TIPOS_DESTINO:
+            raise ErrorConsulta(f"Tipo de destino no reconocido. Use uno de: {', '.join(TIPOS_DESTINO)}.")
+        if origen not in graph:
+            raise ErrorConsulta(f"El nodo '{origen}' no existe en el grafo.", 404)
+
+        destinos_ids = [n for n, data in self.graph.nodes(data=True) if data.get('type') == 'critical_infra' and data.get('tipo') == tipo]
+        tabla = await self._coalescer(('evacuacion', escenario, tipo), _tabla_instalacion_mas_cercana, graph, destinos_ids)
+        path, destino, costo = tabla.ruta(origen)
+        return {'escenario': escenario, 'origen': origen, 'tipo': tipo, 'destino': destino,
+                'ruta': path, 'costo': _costo_json(costo)}
+
+    async def mst(self, centro, puntos, algoritmo='kruskal_custom', escenario=None):
+        escenario, graph = self._grafo_escenario(escenario)
+        if centro not in graph:
+            raise ErrorConsulta(f"El nodo '{centro}' no existe en el grafo.", 404)
+        if algoritmo not in ('kruskal_custom', 'prim'):
+            raise ErrorConsulta("Algoritmo MST no reconocido. Use 'kruskal_custom' o 'prim'.")
+
+        clave = ('mst', escenario, centro, tuple(sorted(puntos)), algoritmo)
+        mst_edges, total_cost = await self._coalescer(clave, calculate_mst_for_distribution, graph, centro, puntos, algoritmo)
+        return {'escenario': escenario, 'centro': centro, 'algoritmo': algoritmo,
+                'aristas': [[u, v, data['weight']] for u, v, data in mst_edges],
+                'costo_total': _costo_json(total_cost)}
+
+    async def conectividad(self, escenario=None):
+        escenario, graph = self._grafo_escenario(escenario)
+        largest_component_nodes, isolated_nodes = await self._coalescer(('conectividad', escenario), analyze_post_earthquake_connectivity, graph)
+        return {'escenario': escenario,
+                'nodos_componente_principal': len(largest_component_nodes),
+                'nodos_aislados': sorted(isolated_nodes)}
+
+    async def simular_sismo(self, magnitud=7.0, prob_alto=0.5, prob_medio=0.1, epicentro=None):
+        """Simula un sismo sobre el grafo base (en el pool) y lo publica como escenario actual."""
+        simulador = SimuladorSismo(self.graph)
+        loop = asyncio.get_running_loop()
+        if epicentro is not None:
+            graph_post_sismo, bloqueos = await loop.run_in_executor(
+                self.executor, simulador.simular_bloqueos_epicentro, tuple(epicentro), magnitud)
+        else:
+            graph_post_sismo, bloqueos = await loop.run_in_executor(
+                self.executor, simulador.simular_bloqueos, magnitud, prob_alto, prob_medio)
+        escenario = self.publicar_escenario(graph_post_sismo)
+        return {'escenario': escenario, 'aristas_bloqueadas': len(bloqueos)}
+
+    async def _despachar(self, metodo, ruta, parametros, cuerpo):
+        def param(nombre, defecto=None):
+            return parametros.get(nombre, [defecto])[0]
+
+        if ruta == '/evacuacion' and metodo == 'GET':
+            if not param('origen'):
+                raise ErrorConsulta("Falta el parámetro 'origen'.")
+            return await self.evacuacion(param('origen'), param('tipo', 'refugio'), param('escenario'))
+        if ruta == '/mst' and metodo == 'GET':
+            if not param('centro') or not param('puntos'):
+                raise ErrorConsulta("Faltan los parámetros 'centro' y/o 'puntos'.")
+            puntos = [p for p in param('puntos').split(',') if p]
+            return await self.mst(param('centro'), puntos, param('algoritmo', 'kruskal_custom'), param('escenario'))
+        if ruta == '/conectividad' and metodo == 'GET':
+            return await self.conectividad(param('escenario'))
+        if ruta == '/escenarios' and metodo == 'GET':
+            return {'actual': self.escenario_actual, 'escenarios': sorted(self.escenarios)}
+        if ruta == '/escenario' and metodo == 'POST':
+            datos = json.loads(cuerpo or b'{}')
+            return await self.simular_sismo(datos.get('magnitud', 7.0), datos.get('prob_alto', 0.5),
+                                            datos.get('prob_medio', 0.1), datos.get('epicentro'))
+        if ruta in ('/evacuacion', '/mst', '/conectividad', '/escenarios', '/escenario'):
+            raise ErrorConsulta(f"Método {metodo} no permitido en {ruta}.", 405)
+        raise ErrorConsulta(f"Ruta {ruta} no encontrada.", 404)
+
+    async def manejar_conexion(self, reader, writer):
+        """Atiende una petición HTTP/1.1 y responde en JSON (una petición por conexión)."""
+        try:
+            linea = await reader.readline()
+            metodo, objetivo, _ = linea.decode('latin-1').split(' ', 2)
+            cabeceras = {}
+            while True:
+                linea = await reader.readline()
+                if linea in (b'\r\n', b'\n', b''):
+                    break
+                nombre, _, valor = linea.decode('latin-1').partition(':')
+                cabeceras[nombre.strip().lower()] = valor.strip()
+            longitud = int(cabeceras.get('content-length', 0))
+            cuerpo = await reader.readexactly(longitud) if longitud else b''
+
+            url = urlsplit(objetivo)
+            try:
+                respuesta = await self._despachar(metodo.upper(), url.path, parse_qs(url.query), cuerpo)
+                codigo = 200
+            except ErrorConsulta as e:
+                respuesta, codigo = {'error': str(e)}, e.codigo
+            except (ValueError, KeyError) as e:
+                respuesta, codigo = {'error': f"Consulta inválida: {e}"}, 400
+            except Exception as e:
+                respuesta, codigo = {'error': f"Error interno: {e}"}, 500
+        except (ValueError, asyncio.IncompleteReadError):
+            respuesta, codigo = {'error': "Petición HTTP mal formada."}, 400
+
+        contenido = json.dumps(respuesta, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {codigo} {MENSAJES_HTTP[codigo]}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(contenido)}\r\n"
+                     f"Connection: close\r\n\r\n".encode('latin-1') + contenido)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def iniciar(self, host='127.0.0.1', port=8765):
+        """Inicia el servidor; retorna el asyncio.Server (port=0 elige un puerto libre)."""
+        return await asyncio.start_server(self.manejar_conexion, host, port)
+
+
+async def _servir_por_defecto(host, port):
+    from src.data_simulator import simulate_vial_network, simulate_critical_infrastructure, simulate_populated_zones, RIESGO_PONDERACION
+    from src.graph_builder import build_urban_graph
+
+    base_lat, base_lon, num_grid, spacing = -12.0463, -77.0428, 40, 0.002
+    df_red_vial_edges, gdf_vial_nodes = simulate_vial_network(base_lat, base_lon, num_grid, num_grid, spacing)
+    gdf_infra_critica = simulate_critical_infrastructure(base_lat, base_lon, num_grid / 2 * spacing, 100)
+    gdf_zonas_pobladas = simulate_populated_zones(base_lat, base_lon, num_grid / 2 * spacing, 500)
+    graph = build_urban_graph(df_red_vial_edges, gdf_vial_nodes, gdf_infra_critica, gdf_zonas_pobladas, RIESGO_PONDERACION)
+
+    servicio = ServicioRutas(graph)
+    server = await servicio.iniciar(host, port)
+    print(f"Servicio de rutas escuchando en http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(_servir_por_defecto('127.0.0.1', 8765))
\ No newline at end of file
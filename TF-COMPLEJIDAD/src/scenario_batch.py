@@ -0,0 +1,107 @@
+# src/scenario_batch.py
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+
+
+def probabilidades_bloqueo_vias(grafo_columnar, porcentaje_bloqueo_alto_riesgo=0.5, porcentaje_bloqueo_medio_riesgo=0.1):
+    """
+    Probabilidad de bloqueo de cada vía (registro 'road' de un GrafoColumnar) según su riesgo sísmico.
+    SimuladorSismo sortea cada sentido de la vía por separado y bloquea ambos si cualquiera
+    sale bloqueado, por lo que la probabilidad por vía es 1 - (1 - p)^2.
+    """
+    vias = grafo_columnar.registros_viales()
+    riesgos = grafo_columnar.categorias['riesgo_sismico']
+    por_sentido = np.zeros(len(riesgos) + 1) # La última posición corresponde a SIN_CATEGORIA (-1)
+    if 'alto' in riesgos:
+        por_sentido[riesgos.index('alto')] = porcentaje_bloqueo_alto_riesgo
+    if 'medio' in riesgos:
+        por_sentido[riesgos.index('medio')] = porcentaje_bloqueo_medio_riesgo
+    p = por_sentido[grafo_columnar.reg_riesgo[vias]]
+    return vias, 1 - (1 - p) ** 2
+
+
+def muestrear_mascaras_bloqueo(grafo_columnar, num_escenarios, porcentaje_bloqueo_alto_riesgo=0.5,
+                               porcentaje_bloqueo_medio_riesgo=0.1, semilla=None):
+    """
+    Sortea K escenarios de una sola vez: una muestra Bernoulli vectorizada de tamaño K×E
+    sobre las E vías. Retorna (vias, mascaras), donde 'vias' son los índices de registro
+    y mascaras[k, e] indica si la vía vias[e] quedó bloqueada en el escenario k.
+    """
+    vias, probabilidades = probabilidades_bloqueo_vias(grafo_columnar, porcentaje_bloqueo_alto_riesgo, porcentaje_bloqueo_medio_riesgo)
+    rng = np.random.default_rng(semilla)
+    mascaras = rng.random((num_escenarios, len(vias))) < probabilidades
+    return vias, mascaras
+
+
+def evaluar_escenarios(grafo_columnar, vias, mascaras, tipo_destino='refugio', devolver_distancias=False):
+    """
+    Evalúa cada escenario (fila de 'mascaras') con scipy.sparse.csgraph sobre la matriz
+    dispersa de la red sin las vías bloqueadas, sin construir grafos de NetworkX.
+
+    Como cada registro existe en ambos sentidos con el mismo peso, la matriz es simétrica y
+    una sola búsqueda multi-fuente desde las instalaciones da la distancia de cada manzana
+    a la instalación más cercana.
+
+    Retorna un diccionario de arreglos de longitud K:
+      aristas_bloqueadas, num_componentes, tamano_componente_principal,
+      nodos_fuera_componente_principal, zonas_sin_acceso, poblacion_sin_acceso y
+      distancia_media_ponderada (distancia media a la instalación más cercana ponderada
+      por población, solo sobre las manzanas con acceso).
+    Con devolver_distancias=True agrega 'distancias_zonas' (K×Z) y 'zonas' (índices de nodo).
+    """
+    mascaras = np.atleast_2d(np.asarray(mascaras, dtype=bool))
+    num_escenarios = mascaras.shape[0]
+    n = grafo_columnar.num_nodos
+
+    origen, destino, registro = grafo_columnar.aristas_dirigidas()
+    pesos = grafo_columnar.reg_peso[registro]
+    fuentes = grafo_columnar.nodos_de_tipo('critical_infra', tipo_destino)
+    zonas = grafo_columnar.nodos_de_tipo('populated_zone')
+    poblacion = np.nan_to_num(grafo_columnar.atributos_zona['poblacion'][grafo_columnar.fila_zona[zonas]])
+
+    resumen = {
+        'aristas_bloqueadas': mascaras.sum(axis=1),
+        'num_componentes': np.zeros(num_escenarios, dtype=np.int64),
+        'tamano_componente_principal': np.zeros(num_escenarios, dtype=np.int64),
+        'nodos_fuera_componente_principal': np.zeros(num_escenarios, dtype=np.int64),
+        'zonas_sin_acceso': np.zeros(num_escenarios, dtype=np.int64),
+        'poblacion_sin_acceso': np.zeros(num_escenarios),
+        'distancia_media_ponderada': np.full(num_escenarios, np.inf),
+    }
+    if devolver_distancias:
+        resumen['distancias_zonas'] = np.full((num_escenarios, len(zonas)), np.inf, dtype=np.float32)
+        resumen['zonas'] = zonas
+
+    registro_abierto = np.ones(grafo_columnar.num_registros, dtype=bool)
+    for k in range(num_escenarios):
+        registro_abierto[:] = True
+        registro_abierto[vias[mascaras[k]]] = False
+        abiertas = registro_abierto[registro]
+
+        indptr = np.zeros(n + 1, dtype=grafo_columnar.indptr.dtype)
+        np.cumsum(np.bincount(origen[abiertas], minlength=n), out=indptr[1:])
+        matriz = csr_matrix((pesos[abiertas], destino[abiertas], indptr), shape=(n, n))
+
+        num_componentes, etiquetas = connected_components(matriz, directed=True, connection='weak')
+        tamanos = np.bincount(etiquetas)
+        resumen['num_componentes'][k] = num_componentes
+        resumen['tamano_componente_principal'][k] = tamanos.max() if len(tamanos) else 0
+        resumen['nodos_fuera_componente_principal'][k] = n - resumen['tamano_componente_principal'][k]
+
+        if len(fuentes) == 0:
+            resumen['zonas_sin_acceso'][k] = len(zonas)
+            resumen['poblacion_sin_acceso'][k] = poblacion.sum()
+            continue
+
+        distancias = dijkstra(matriz, directed=True, indices=fuentes, min_only=True)[zonas]
+        con_acceso = np.isfinite(distancias)
+        resumen['zonas_sin_acceso'][k] = len(zonas) - con_acceso.sum()
+        resumen['poblacion_sin_acceso'][k] = poblacion[~con_acceso].sum()
+        if poblacion[con_acceso].sum() > 0:
+            resumen['distancia_media_ponderada'][k] = np.average(distancias[con_acceso], weights=poblacion[con_acceso])
+        if devolver_distancias:
+            resumen['distancias_zonas'][k] = distancias
+
+    return resumen
\ No newline at end of file
@@ -0,0 +1,222 @@
+# src/scenario_store.py
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from src.backends import invalidar_cache
+
+INF = float('inf')
+
+ARCHIVO_VIAS = 'vias.json'
+ARCHIVO_MASCARAS = 'escenarios.bin'
+ARCHIVO_METADATOS = 'escenarios.jsonl'
+
+
+def indice_vias(graph):
+    """
+    Vías del grafo base en orden fijo, una entrada (u, v) por vía no dirigida (el mismo
+    orden que SimuladorSismo._preparar_aristas_viales). La posición en esta lista es el bit
+    de la vía en las máscaras de la biblioteca.
+    """
+    vias = []
+    vistas = set()
+    for u, v, data in graph.edges(data=True):
+        if data.get('type') != 'road' or (v, u) in vistas:
+            continue
+        vistas.add((u, v))
+        vias.append((u, v))
+    return vias
+
+
+def huella_red(graph):
+    """Identificador corto de la red base (hash de indice_vias), para separar bibliotecas de redes distintas."""
+    return hashlib.sha1(json.dumps(indice_vias(graph)).encode('utf-8')).hexdigest()[:12]
+
+
+class BibliotecaEscenarios:
+    """
+    Biblioteca en disco de escenarios sísmicos sobre una misma red base. Cada escenario se
+    guarda como una máscara de bits sobre las vías (un bit por vía, ver indice_vias), más su
+    semilla y parámetros, en lugar de una copia del grafo post-sismo:
+      - vias.json: las vías de la red base, para verificar que la biblioteca corresponde al grafo.
+      - escenarios.bin: las máscaras empaquetadas (np.packbits), una fila de ancho fijo por escenario.
+      - escenarios.jsonl: semilla, parámetros y número de vías bloqueadas de cada escenario.
+    Los escenarios se identifican por su posición (0, 1, 2, ...).
+    """
+    def __init__(self, directorio, graph):
+        self.directorio = directorio
+        self.vias = indice_vias(graph)
+        self.posicion = {}
+        for i, (u, v) in enumerate(self.vias):
+            self.posicion[(u, v)] = i
+            self.posicion[(v, u)] = i
+        self.ancho = (len(self.vias) + 7) // 8
+
+        os.makedirs(directorio, exist_ok=True)
+        ruta_vias = os.path.join(directorio, ARCHIVO_VIAS)
+        if os.path.exists(ruta_vias):
+            with open(ruta_vias, encoding='utf-8') as archivo:
+                guardadas = [tuple(via) for via in json.load(archivo)]
+            if guardadas != self.vias:
+                raise ValueError(f"La biblioteca de escenarios en {directorio} corresponde a otra red base.")
+        else:
+            with open(ruta_vias, 'w', encoding='utf-8') as archivo:
+                json.dump(self.vias, archivo)
+
+        self.metadatos = []
+        ruta_metadatos = os.path.join(directorio, ARCHIVO_METADATOS)
+        if os.path.exists(ruta_metadatos):
+            with open(ruta_metadatos, encoding='utf-8') as archivo:
+                self.metadatos = [json.loads(linea) for linea in archivo if linea.strip()]
+        self._mascaras = None
+
+    def __len__(self):
+        return len(self.metadatos)
+
+    def _filas(self):
+        # Vista mapeada en memoria de todas las máscaras empaquetadas (se reabre al crecer)
+        if self._mascaras is None or len(self._mascaras) != len(self):
+            if len(self) == 0:
+                return np.zeros((0, self.ancho), dtype=np.uint8)
+            self._mascaras = np.memmap(os.path.join(self.directorio, ARCHIVO_MASCARAS), dtype=np.uint8,
+                                       mode='r', shape=(len(self), self.ancho))
+        return self._mascaras
+
+    # --- Conversión entre bloqueos y máscaras ---
+
+    def mascara_desde_bloqueos(self, bloqueos_aplicados):
+        """Máscara booleana (una posición por vía) de una lista de bloqueos (u, v, ...) de SimuladorSismo."""
+        mascara = np.zeros(len(self.vias), dtype=bool)
+        for bloqueo in bloqueos_aplicados:
+            mascara[self.posicion[(bloqueo[0], bloqueo[1])]] = True
+        return mascara
+
+    def mascara(self, escenario):
+        return np.unpackbits(self._filas()[escenario], count=len(self.vias)).astype(bool)
+
+    def vias_bloqueadas(self, escenario):
+        """Vías (u, v) bloqueadas en el escenario."""
+        return [self.vias[i] for i in np.flatnonzero(self.mascara(escenario))]
+
+    # --- Escritura ---
+
+    def guardar(self, bloqueos_aplicados, semilla=None, **parametros):
+        """
+        Agrega un escenario a partir de los bloqueos de SimuladorSismo, de una máscara
+        booleana sobre las vías o de los índices de las vías bloqueadas (como los que retorna
+        SimuladorSismo.sortear_vias_epicentro, sin copiar el grafo), con la semilla y los
+        parámetros que lo generaron. Retorna su identificador. La máscara debe tener una
+        posición por vía de la biblioteca; si no, lanza ValueError.
+        """
+        if isinstance(bloqueos_aplicados, np.ndarray) and bloqueos_aplicados.dtype == bool:
+            mascara = bloqueos_aplicados
+        elif isinstance(bloqueos_aplicados, np.ndarray) and np.issubdtype(bloqueos_aplicados.dtype, np.integer):
+            mascara = np.zeros(len(self.vias), dtype=bool)
+            mascara[bloqueos_aplicados] = True
+        else:
+            mascara = self.mascara_desde_bloqueos(bloqueos_aplicados)
+        if len(mascara) != len(self.vias):
+            # packbits rellena hasta múltiplos de 8: una máscara de otro largo desalinearía el archivo
+            raise ValueError(f"La máscara tiene {len(mascara)} posiciones y la biblioteca {len(self.vias)} vías.")
+        with open(os.path.join(self.directorio, ARCHIVO_MASCARAS), 'ab') as archivo:
+            archivo.write(np.packbits(mascara).tobytes())
+        registro = {'id': len(self), 'semilla': semilla, 'parametros': parametros, 'aristas_bloqueadas': int(mascara.sum())}
+        with open(os.path.join(self.directorio, ARCHIVO_METADATOS), 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        self.metadatos.append(registro)
+        return registro['id']
+
+    # --- Reconstrucción sobre el grafo base ---
+
+    def aplicar(self, graph, escenario, weight='weight'):
+        """
+        Bloquea en sitio, sobre el grafo base (o una copia sin bloqueos), las vías del
+        escenario en ambos sentidos, igual que SimuladorSismo. El costo es proporcional al
+        número de vías bloqueadas. Retorna bloqueos_aplicados en el formato del simulador,
+        que revertir() usa para volver al grafo base. Invalida las cachés del grafo
+        (backends.invalidar_cache), ya que los pesos cambian en sitio.
+        """
+        bloqueos_aplicados = []
+        for u, v in self.vias_bloqueadas(escenario):
+            bloqueos_aplicados.append((u, v, graph[u][v][weight]))
+            for a, b in ((u, v), (v, u)):
+                if graph.has_edge(a, b) and graph[a][b].get('type') == 'road':
+                    graph[a][b][weight] = INF
+                    graph[a][b]['blocked'] = True
+        invalidar_cache(graph)
+        return bloqueos_aplicados
+
+    def revertir(self, graph, bloqueos_aplicados, weight='weight'):
+        """
+        Deshace aplicar(): reabre las vías con el peso guardado en cada bloqueo (ambos
+        sentidos de una vía tienen el mismo peso en build_urban_graph) e invalida las
+        cachés del grafo.
+        """
+        for u, v, peso in bloqueos_aplicados:
+            for a, b in ((u, v), (v, u)):
+                if graph.has_edge(a, b) and graph[a][b].get('type') == 'road':
+                    graph[a][b][weight] = peso
+                    graph[a][b]['blocked'] = False
+        invalidar_cache(graph)
+
+    def reconstruir(self, graph_base, escenario, weight='weight'):
+        """
+        Estado post-sismo del escenario: (graph_post_sismo, bloqueos_aplicados), igual que
+        SimuladorSismo.simular_bloqueos. Copia el grafo base; para recorrer muchos escenarios
+        sin copiar, usar aplicar() y revertir() sobre un mismo grafo.
+        """
+        graph_post_sismo = graph_base.copy()
+        return graph_post_sismo, self.aplicar(graph_post_sismo, escenario, weight)
+
+    # --- Comparación y recorrido ---
+
+    def diferencia(self, escenario_a, escenario_b):
+        """
+        Vías que cambian de estado entre dos escenarios, con un XOR sobre las máscaras
+        empaquetadas. Retorna (solo_en_a, solo_en_b): vías bloqueadas solo en a y solo en b.
+        """
+        filas = self._filas()
+        distintas = np.flatnonzero(np.unpackbits(filas[escenario_a] ^ filas[escenario_b], count=len(self.vias)))
+        en_a = np.unpackbits(filas[escenario_a], count=len(self.vias))[distintas].astype(bool)
+        return [self.vias[i] for i in distintas[en_a]], [self.vias[i] for i in distintas[~en_a]]
+
+    def iterar_mascaras(self, tamano_bloque=1000):
+        """
+        Entrega (generador) bloques (ids, mascaras): mascaras es una matriz booleana
+        bloque×vías leída directamente del archivo mapeado en memoria.
+        """
+        filas = self._filas()
+        for inicio in range(0, len(filas), tamano_bloque):
+            bloque = np.unpackbits(filas[inicio:inicio + tamano_bloque], axis=1, count=len(self.vias)).astype(bool)
+            yield np.arange(inicio, inicio + len(bloque)), bloque
+
+    def registros_columnar(self, grafo_columnar):
+        """
+        Índice de registro en 'grafo_columnar' de cada vía de la biblioteca, para evaluar
+        las máscaras con scenario_batch.evaluar_escenarios.
+        """
+        vias = grafo_columnar.registros_viales()
+        registro = {}
+        for r, o, d in zip(vias, grafo_columnar.reg_origen[vias], grafo_columnar.reg_destino[vias]):
+            registro[(int(o), int(d))] = r
+            registro[(int(d), int(o))] = r
+        origenes = grafo_columnar.indices_de([u for u, _ in self.vias])
+        destinos = grafo_columnar.indices_de([v for _, v in self.vias])
+        return np.array([registro[(int(o), int(d))] for o, d in zip(origenes, destinos)], dtype=np.int64)
+
+    def reanalizar(self, grafo_columnar, tipo_destino='refugio', tamano_bloque=1000):
+        """
+        Evalúa todos los escenarios guardados con scenario_batch.evaluar_escenarios, por
+        bloques, sin reconstruir ningún grafo. Retorna el mismo resumen (arreglos por escenario).
+        """
+        from src.scenario_batch import evaluar_escenarios
+
+        vias = self.registros_columnar(grafo_columnar)
+        resultados = [evaluar_escenarios(grafo_columnar, vias, mascaras, tipo_destino)
+                      for _, mascaras in self.iterar_mascaras(tamano_bloque)]
+        if not resultados:
+            return {}
+        return {clave: np.concatenate([r[clave] for r in resultados]) for clave in resultados[0]}
\ No newline at end of file
@@ -0,0 +1,66 @@
+# src/service_areas.py
+
+import heapq
+
+INF = float('inf')
+
+
+def areas_de_servicio(graph, instalaciones, radio_max=INF, hacia_instalaciones=True, weight='weight'):
+    """
+    Partición del grafo en áreas de servicio con un único Dijkstra multi-fuente acotado.
+    Cada nodo a distancia <= radio_max de alguna instalación queda etiquetado con la
+    instalación más cercana y esa distancia; los demás no aparecen en los resultados.
+
+    Con hacia_instalaciones=True la distancia se mide recorriendo las aristas en su sentido
+    desde el nodo hasta la instalación (ej. manzana -> hospital); con False, desde la
+    instalación hacia el nodo. Las aristas bloqueadas (peso inf) se ignoran.
+    Retorna (propietario, distancia): {nodo: instalación} y {nodo: metros}.
+    """
+    propietario = {}
+    distancia = {}
+    vecinos = graph.pred if hacia_instalaciones else graph.succ
+    # El índice de la instalación desempata distancias iguales: la partición es determinista
+    heap = [(0.0, i, f, f) for i, f in enumerate(instalaciones) if f in graph]
+    heapq.heapify(heap)
+
+    while heap:
+        d, i, x, dueno = heapq.heappop(heap)
+        if x in distancia:
+            continue
+        distancia[x] = d
+        propietario[x] = dueno
+        for y, data in vecinos[x].items():
+            nd = d + data.get(weight, 1.0)
+            if y not in distancia and nd <= radio_max and nd != INF:
+                heapq.heappush(heap, (nd, i, y, dueno))
+    return propietario, distancia
+
+
+def cobertura_por_instalacion(graph, instalaciones, propietario):
+    """
+    Resume la partición por instalación usando las manzanas ('populated_zone') y su 'poblacion'.
+    Retorna (cobertura, sin_cobertura): cobertura = {instalación: {'manzanas': n, 'poblacion': p}}
+    y sin_cobertura = {'manzanas': n, 'poblacion': p} para las manzanas fuera de todo radio.
+    """
+    cobertura = {f: {'manzanas': 0, 'poblacion': 0} for f in instalaciones}
+    sin_cobertura = {'manzanas': 0, 'poblacion': 0}
+    for n, data in graph.nodes(data=True):
+        if data.get('type') != 'populated_zone':
+            continue
+        resumen = cobertura.get(propietario.get(n), sin_cobertura)
+        resumen['manzanas'] += 1
+        resumen['poblacion'] += data.get('poblacion', 0)
+    return cobertura, sin_cobertura
+
+
+def comparar_cobertura(cobertura_base, cobertura_post):
+    """
+    Cambio de población atendida por instalación entre dos escenarios (ej. antes y después del sismo).
+    Retorna {instalación: (poblacion_base, poblacion_post, diferencia)}, ordenado por mayor pérdida.
+    """
+    cambios = {}
+    for f in cobertura_base:
+        base = cobertura_base[f]['poblacion']
+        post = cobertura_post.get(f, {'poblacion': 0})['poblacion']
+        cambios[f] = (base, post, post - base)
+    return dict(sorted(cambios.items(), key=lambda item: item[1][2]))
\ No newline at end of file
@@ -0,0 +1,238 @@
+# src/shared_graph.py
+
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from src.columnar_graph import GrafoColumnar
+from src.scenario_batch import evaluar_escenarios
+
+ALMACENES = ('shared_memory', 'memmap')
+
+# Arreglos de GrafoColumnar que se publican; los atributos de zona van como 'zona_<atributo>'
+_ARREGLOS = ('ids', '_orden_ids', '_ids_ordenados', 'lon', 'lat', 'tipo_nodo', 'tipo_infra', 'fila_zona',
+             'reg_origen', 'reg_destino', 'reg_peso', 'reg_longitud', 'reg_tipo', 'reg_tipo_via', 'reg_riesgo',
+             'vecinos', 'registro_arista', 'indptr')
+
+# Grafos ya adjuntados en este proceso (cada worker adjunta una sola vez por grafo)
+_adjuntos = {}
+
+
+def _adjuntar_bloque(nombre):
+    # El bloque pertenece al proceso que lo publicó: el worker no debe liberarlo al terminar.
+    # En Python < 3.13 (sin 'track') los workers del pool comparten el resource_tracker del
+    # dueño, que ya tiene el bloque registrado, así que adjuntarlo no cambia quién lo libera.
+    try:
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=nombre)
+
+
+class GrafoCompartido:
+    """
+    Publica los arreglos de un GrafoColumnar (topología CSR, pesos, coordenadas, tipos) una
+    sola vez en memoria compartida (multiprocessing.shared_memory) o en archivos .npy mapeados
+    en memoria. Los workers reciben solo 'descriptor' (nombres, tipos y formas: unos pocos
+    cientos de bytes) y adjuntan los arreglos sin copiarlos; entre procesos solo viajan los
+    cambios de cada escenario y los resultados.
+
+    El proceso que lo crea es el dueño: cerrar() (o salir del bloque 'with') libera la memoria.
+    Las funciones de este módulo que reciben el grafo compartido sin 'executor' usan pool(),
+    un ProcessPoolExecutor propio que se crea al primer uso y se mantiene entre trabajos
+    (los workers siguen adjuntos al grafo); cerrar() también lo cierra.
+    """
+    def __init__(self, grafo_columnar, almacen='shared_memory', directorio=None):
+        if almacen not in ALMACENES:
+            raise ValueError(f"Almacén no reconocido. Use uno de: {', '.join(ALMACENES)}.")
+        if almacen == 'memmap' and directorio is None:
+            raise ValueError("El almacén 'memmap' requiere un directorio.")
+        self.grafo = grafo_columnar
+        self._bloques = []
+        self._pool = None
+        clave = uuid.uuid4().hex
+        arreglos = {nombre: getattr(grafo_columnar, nombre) for nombre in _ARREGLOS}
+        arreglos.update({'zona_' + attr: valores for attr, valores in grafo_columnar.atributos_zona.items()})
+
+        ubicaciones = {}
+        for nombre, arreglo in arreglos.items():
+            arreglo = np.ascontiguousarray(arreglo)
+            if almacen == 'shared_memory':
+                bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+                np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=bloque.buf)[...] = arreglo
+                self._bloques.append(bloque)
+                ubicaciones[nombre] = (bloque.name, arreglo.dtype.str, arreglo.shape)
+            else:
+                ruta = os.path.join(directorio, f'{clave}_{nombre}.npy')
+                np.save(ruta, arreglo)
+                ubicaciones[nombre] = (ruta, arreglo.dtype.str, arreglo.shape)
+
+        self.descriptor = {'clave': clave, 'almacen': almacen, 'arreglos': ubicaciones,
+                           'categorias': grafo_columnar.categorias}
+        # El dueño (y los workers creados por fork, que heredan esta caché) usa sus propios bloques
+        vistas = {nombre: np.ndarray(forma, dtype=np.dtype(dtype), buffer=bloque.buf)
+                  for bloque, (nombre, (_, dtype, forma)) in zip(self._bloques, ubicaciones.items())}
+        if almacen == 'shared_memory':
+            _adjuntos[clave] = (_vista_grafo(self.descriptor, vistas), [])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def pool(self):
+        """ProcessPoolExecutor propio, creado al primer uso y reutilizado hasta cerrar()."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor()
+        return self._pool
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        _adjuntos.pop(self.descriptor['clave'], None)
+        for bloque in self._bloques:
+            try:
+                bloque.close()
+            except BufferError:
+                pass # Aún hay vistas en uso: la memoria se libera cuando desaparezcan
+            bloque.unlink()
+        self._bloques = []
+        if self.descriptor['almacen'] == 'memmap':
+            for ruta, _, _ in self.descriptor['arreglos'].values():
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+
+
+def adjuntar(descriptor):
+    """
+    GrafoColumnar cuyos arreglos son vistas de la memoria publicada por GrafoCompartido
+    (sin copiar ni reconstruir la adyacencia). Se guarda en caché por proceso.
+    """
+    clave = descriptor['clave']
+    if clave in _adjuntos:
+        return _adjuntos[clave][0]
+
+    bloques = []
+    arreglos = {}
+    for nombre, (ubicacion, dtype, forma) in descriptor['arreglos'].items():
+        if descriptor['almacen'] == 'shared_memory':
+            bloque = _adjuntar_bloque(ubicacion)
+            bloques.append(bloque)
+            arreglo = np.ndarray(forma, dtype=np.dtype(dtype), buffer=bloque.buf)
+        else:
+            arreglo = np.load(ubicacion, mmap_mode='r')
+        arreglos[nombre] = arreglo
+
+    grafo = _vista_grafo(descriptor, arreglos)
+    # Los bloques deben seguir abiertos mientras existan las vistas
+    _adjuntos[clave] = (grafo, bloques)
+    return grafo
+
+
+def _vista_grafo(descriptor, arreglos):
+    # GrafoColumnar armado directamente sobre los arreglos publicados (solo lectura)
+    grafo = GrafoColumnar.__new__(GrafoColumnar)
+    for arreglo in arreglos.values():
+        arreglo.flags.writeable = False
+    grafo.atributos_zona = {nombre[len('zona_'):]: arreglo for nombre, arreglo in arreglos.items() if nombre.startswith('zona_')}
+    for nombre in _ARREGLOS:
+        setattr(grafo, nombre, arreglos[nombre])
+    grafo.categorias = descriptor['categorias']
+    return grafo
+
+
+# --- Trabajos que se ejecutan en los workers (reciben el descriptor y los cambios del escenario) ---
+
+def _evaluar_bloque(descriptor, bloqueos_por_escenario, tipo_destino):
+    grafo = adjuntar(descriptor)
+    bloqueadas = [np.asarray(b, dtype=np.int64) for b in bloqueos_por_escenario]
+    vias = np.unique(np.concatenate(bloqueadas)) if bloqueadas else np.empty(0, dtype=np.int64)
+    mascaras = np.array([np.isin(vias, b) for b in bloqueadas], dtype=bool).reshape(len(bloqueadas), len(vias))
+    return evaluar_escenarios(grafo, vias, mascaras, tipo_destino)
+
+
+def _rutas_bloque(descriptor, pares, registros_bloqueados):
+    grafo = adjuntar(descriptor)
+    pesos = np.array(grafo.reg_peso) # Copia local: el escenario no modifica la memoria compartida
+    pesos[np.asarray(registros_bloqueados, dtype=np.int64)] = np.inf
+    abiertas = np.isfinite(pesos[grafo.registro_arista])
+    origen, destino, registro = grafo.aristas_dirigidas()
+    n = grafo.num_nodos
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(origen[abiertas], minlength=n), out=indptr[1:])
+    matriz = csr_matrix((pesos[registro[abiertas]], destino[abiertas], indptr), shape=(n, n))
+
+    origenes = sorted({o for o, _ in pares})
+    distancias, predecesores = dijkstra(matriz, directed=True, indices=origenes, return_predecessors=True)
+    fila = {o: i for i, o in enumerate(origenes)}
+    resultados = []
+    for o, d in pares:
+        costo = float(distancias[fila[o], d])
+        if not np.isfinite(costo):
+            resultados.append(([], np.inf))
+            continue
+        camino = [d]
+        while camino[-1] != o:
+            camino.append(int(predecesores[fila[o], camino[-1]]))
+        resultados.append((camino[::-1], costo))
+    return resultados
+
+
+def _repartir(compartido, executor, funcion, *trabajos):
+    # Igual que partitioning.GrafoParticionado.recalcular_distritos: sin executor, el pool del dueño
+    if executor is None and len(trabajos[0]) > 1:
+        executor = compartido.pool()
+    ejecutar = executor.map if executor is not None else map
+    return list(ejecutar(funcion, *trabajos))
+
+
+def evaluar_escenarios_en_paralelo(compartido, bloqueos_por_escenario, tipo_destino='refugio', tamano_bloque=50, executor=None):
+    """
+    Evalúa un ensamble de escenarios repartido en bloques entre procesos. Cada escenario se
+    envía solo como la lista de registros de vía bloqueados; el grafo se adjunta desde la
+    memoria compartida. Retorna el mismo resumen que scenario_batch.evaluar_escenarios.
+    """
+    bloques = [bloqueos_por_escenario[i:i + tamano_bloque] for i in range(0, len(bloqueos_por_escenario), tamano_bloque)]
+    resultados = _repartir(compartido, executor, _evaluar_bloque, [compartido.descriptor] * len(bloques), bloques, [tipo_destino] * len(bloques))
+    if not resultados:
+        return {}
+    return {clave: np.concatenate([r[clave] for r in resultados]) for clave in resultados[0]}
+
+
+def rutas_en_paralelo(compartido, pares, registros_bloqueados=(), tamano_bloque=200, executor=None):
+    """
+    Rutas mínimas para muchos pares (origen, destino) de índices de nodo en un escenario dado
+    por sus registros bloqueados. Cada worker resuelve un bloque de pares con una búsqueda
+    por origen distinto. Retorna [(camino en índices, costo)] en el orden de 'pares'.
+    """
+    pares = [(int(o), int(d)) for o, d in pares]
+    registros_bloqueados = np.asarray(registros_bloqueados, dtype=np.int64)
+    bloques = [pares[i:i + tamano_bloque] for i in range(0, len(pares), tamano_bloque)]
+    resultados = _repartir(compartido, executor, _rutas_bloque, [compartido.descriptor] * len(bloques), bloques,
+                           [registros_bloqueados] * len(bloques))
+    return [ruta for bloque in resultados for ruta in bloque]
+
+
+def criticidad_vias(compartido, tipo_destino='refugio', vias=None, tamano_bloque=50, executor=None):
+    """
+    Criticidad de cada vía: el efecto de cerrarla sola sobre el acceso de la población a la
+    instalación más cercana. Es un ensamble de un escenario por vía, evaluado en paralelo.
+    Retorna (vias, aumento_poblacion_sin_acceso, aumento_distancia_media) respecto de la red
+    sin bloqueos, ordenado de la vía más crítica a la menos crítica.
+    """
+    grafo = compartido.grafo
+    vias = grafo.registros_viales() if vias is None else np.asarray(vias)
+    base = evaluar_escenarios(grafo, np.empty(0, dtype=np.int64), np.zeros((1, 0), dtype=bool), tipo_destino)
+    resumen = evaluar_escenarios_en_paralelo(compartido, [[v] for v in vias], tipo_destino, tamano_bloque, executor)
+    if not resumen:
+        return vias, np.empty(0), np.empty(0)
+    aumento_poblacion = resumen['poblacion_sin_acceso'] - base['poblacion_sin_acceso'][0]
+    aumento_distancia = resumen['distancia_media_ponderada'] - base['distancia_media_ponderada'][0]
+    orden = np.lexsort((-aumento_distancia, -aumento_poblacion))
+    return vias[orden], aumento_poblacion[orden], aumento_distancia[orden]
\ No newline at end of file
@@ -0,0 +1,251 @@
+# src/vehicle_routing.py
+
+import random
+import time
+import weakref
+
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from src.backends import convertir, huella_grafo
+from src.graph_algorithms import bidirectional_dijkstra
+
+INF = float('inf')
+VECINOS_CANDIDATOS = 20 # Posiciones de inserción evaluadas por segmento en or-opt
+TAMANO_BLOQUE_BUSQUEDAS = 64 # Filas de distancias por llamada a Dijkstra (acota la memoria)
+
+_cache_matrices = weakref.WeakKeyDictionary()
+
+
+def matriz_distancias(graph, nodos, weight='weight'):
+    """
+    Matriz de distancias mínimas D[i, j] de nodos[i] a nodos[j] en el grafo (inf si no hay ruta),
+    con búsquedas multi-fuente de scipy por bloques. Se guarda en caché por grafo mientras no
+    cambie su huella (huella_grafo), como backends.convertir.
+    """
+    clave = (tuple(nodos), weight)
+    por_grafo = _cache_matrices.setdefault(graph, {})
+    huella = huella_grafo(graph)
+    if clave in por_grafo and por_grafo[clave][0] == huella:
+        return por_grafo[clave][1]
+
+    g = convertir(graph, weight)
+    indices = np.array([g.indice[n] for n in nodos])
+    matriz = np.empty((len(nodos), len(nodos)))
+    for inicio in range(0, len(nodos), TAMANO_BLOQUE_BUSQUEDAS):
+        bloque = indices[inicio:inicio + TAMANO_BLOQUE_BUSQUEDAS]
+        matriz[inicio:inicio + len(bloque)] = np.atleast_2d(dijkstra(g.matriz, directed=True, indices=bloque))[:, indices]
+    por_grafo[clave] = (huella, matriz)
+    return matriz
+
+
+# --- Heurística (se ejecuta en los procesos del pool; trabaja con índices 0..m, 0 = depósito) ---
+
+def _costo_ruta(d, ruta):
+    costo = d[0][ruta[0]] + d[ruta[-1]][0]
+    for a, b in zip(ruta[:-1], ruta[1:]):
+        costo += d[a][b]
+    return costo
+
+
+def _ahorros(matriz, demandas, capacidad, rng, ruido):
+    """
+    Construcción de Clarke-Wright para distancias asimétricas: se une la ruta que termina en i
+    con la que empieza en j en orden de ahorro d(i,0) + d(0,j) - d(i,j). Con ruido > 0 los
+    ahorros se perturban, así cada reinicio parte de una solución distinta.
+    """
+    m = len(matriz) - 1
+    with np.errstate(invalid='ignore'):
+        ahorro = matriz[1:, [0]] + matriz[[0], 1:] - matriz[1:, 1:]
+    if ruido:
+        ahorro = ahorro * (1 + ruido * (2 * rng.random(ahorro.shape) - 1))
+    np.fill_diagonal(ahorro, -INF)
+    ahorro[~np.isfinite(ahorro)] = -INF
+    i_validos, j_validos = np.nonzero(ahorro > 0)
+    orden = np.argsort(-ahorro[i_validos, j_validos], kind='stable')
+
+    rutas = {i: [i] for i in range(1, m + 1)}
+    ruta_de = {i: i for i in range(1, m + 1)}
+    carga = {i: demandas[i] for i in range(1, m + 1)}
+    for k in orden:
+        i, j = int(i_validos[k]) + 1, int(j_validos[k]) + 1
+        ri, rj = ruta_de[i], ruta_de[j]
+        if ri == rj or rutas[ri][-1] != i or rutas[rj][0] != j or carga[ri] + carga[rj] > capacidad:
+            continue
+        rutas[ri].extend(rutas.pop(rj))
+        carga[ri] += carga.pop(rj)
+        for x in rutas[ri]:
+            ruta_de[x] = ri
+    return list(rutas.values())
+
+
+def _dos_opt(d, ruta):
+    """2-opt dentro de una ruta (distancias asimétricas: el tramo invertido se recorre al revés)."""
+    mejoro = False
+    while True:
+        s = [0] + ruta + [0]
+        # Prefijos del costo del recorrido hacia adelante y hacia atrás
+        adelante, atras = [0.0], [0.0]
+        for a, b in zip(s[:-1], s[1:]):
+            adelante.append(adelante[-1] + d[a][b])
+            atras.append(atras[-1] + d[b][a])
+        mejor, movimiento = -1e-9, None
+        for i in range(1, len(s) - 2):
+            for j in range(i + 1, len(s) - 1):
+                delta = (d[s[i - 1]][s[j]] + d[s[i]][s[j + 1]] + atras[j] - atras[i]
+                         - d[s[i - 1]][s[i]] - d[s[j]][s[j + 1]] - adelante[j] + adelante[i])
+                if delta < mejor:
+                    mejor, movimiento = delta, (i, j)
+        if movimiento is None:
+            return mejoro
+        i, j = movimiento
+        ruta[i - 1:j] = ruta[i - 1:j][::-1]
+        mejoro = True
+
+
+def _or_opt(d, rutas, demandas, capacidad, cercanos, fin):
+    """
+    Mueve segmentos de 1 a 3 refugios a otra posición, en la misma ruta o en otra con
+    capacidad. Solo se prueba insertar el segmento justo después de los refugios más
+    cercanos a su inicio (vecindario granular), así cada pasada escala a cientos de refugios.
+    """
+    cargas = [sum(demandas[x] for x in r) for r in rutas]
+    posicion = {}
+    for ir, r in enumerate(rutas):
+        for p, x in enumerate(r):
+            posicion[x] = (ir, p)
+    mejoro = False
+    for largo in (1, 2, 3):
+        for cabeza in list(posicion):
+            if time.time() >= fin:
+                # Un movimiento pudo vaciar una ruta justo antes de agotar el tiempo
+                rutas[:] = [r for r in rutas if r]
+                return mejoro
+            ir, p = posicion[cabeza]
+            r = rutas[ir]
+            if p + largo > len(r):
+                continue
+            segmento = r[p:p + largo]
+            cola = segmento[-1]
+            anterior = r[p - 1] if p > 0 else 0
+            siguiente = r[p + largo] if p + largo < len(r) else 0
+            ganancia = d[anterior][cabeza] + d[cola][siguiente] - d[anterior][siguiente]
+            carga_segmento = sum(demandas[x] for x in segmento)
+
+            for x in cercanos[cabeza]:
+                if x in segmento or x == anterior:
+                    continue
+                jr, q = posicion[x]
+                if jr != ir and cargas[jr] + carga_segmento > capacidad:
+                    continue
+                destino = rutas[jr]
+                despues = destino[q + 1] if q + 1 < len(destino) else 0
+                if despues == cabeza:
+                    continue
+                costo = d[x][cabeza] + d[cola][despues] - d[x][despues]
+                if costo - ganancia < -1e-9:
+                    # Mover el segmento: se quita de su ruta y se inserta después de x
+                    del r[p:p + largo]
+                    q = destino.index(x)
+                    destino[q + 1:q + 1] = segmento
+                    cargas[ir] -= carga_segmento
+                    cargas[jr] += carga_segmento
+                    for ruta_afectada in {ir, jr}:
+                        for k, y in enumerate(rutas[ruta_afectada]):
+                            posicion[y] = (ruta_afectada, k)
+                    mejoro = True
+                    break
+    rutas[:] = [r for r in rutas if r]
+    return mejoro
+
+
+def _resolver_reinicio(matriz, demandas, capacidad, semilla, fin, ruido):
+    """Un reinicio: construcción por ahorros (perturbada) y búsqueda local hasta no mejorar o agotar el tiempo."""
+    rng = np.random.default_rng(semilla)
+    rutas = _ahorros(matriz, demandas, capacidad, rng, ruido)
+    d = np.where(np.isfinite(matriz), matriz, 1e18).tolist() # Tramos imposibles: costo prohibitivo
+    m = len(matriz) - 1
+    k = min(VECINOS_CANDIDATOS, m - 1)
+    # Refugios x con el tramo x -> i más corto: candidatos a preceder a i en or-opt
+    cercanos = [[]] + [[int(x) for x in np.argsort(matriz[1:, i])[:k + 1] + 1 if x != i][:k] for i in range(1, m + 1)]
+
+    mejoro = True
+    while mejoro and time.time() < fin:
+        mejoro = False
+        for ruta in rutas:
+            mejoro |= _dos_opt(d, ruta)
+        mejoro |= _or_opt(d, rutas, demandas, capacidad, cercanos, fin)
+    return sum(_costo_ruta(d, r) for r in rutas), rutas
+
+
+def expandir_rutas(graph, rutas, weight='weight'):
+    """Convierte cada ruta de paradas en la secuencia de nodos de la red vial, para dibujarla."""
+    caminos = []
+    for ruta in rutas:
+        camino = [ruta[0]]
+        for a, b in zip(ruta[:-1], ruta[1:]):
+            tramo, _ = bidirectional_dijkstra(graph, a, b, weight)
+            camino.extend(tramo[1:])
+        caminos.append(camino)
+    return caminos
+
+
+def planificar_rutas_vehiculos(graph_post_sismo, supply_center_id, refugios_ids, capacidad_vehiculo,
+                               demandas=None, num_vehiculos=None, num_reinicios=4, limite_segundos=5.0,
+                               ruido=0.01, executor=None, semilla=None, weight='weight'):
+    """
+    Rutas de vehículos con capacidad (CVRP) que salen del centro de abastecimiento, visitan
+    refugios y vuelven al centro, sobre las distancias del grafo post-sismo.
+
+    Cada reinicio construye una solución con ahorros de Clarke-Wright y la mejora con 2-opt y
+    or-opt; los reinicios corren en paralelo en el 'executor' dado (ej. un ProcessPoolExecutor
+    que el llamador mantiene entre llamadas) o, sin él, uno tras otro en este proceso, y se
+    detienen al agotar 'limite_segundos'. Las demandas son {refugio: carga} (1 por refugio si se omiten).
+    Retorna un diccionario con 'rutas' (paradas, con el centro al inicio y al final), 'cargas',
+    'costos', 'costo_total' y 'sin_acceso' (refugios inalcanzables ida y vuelta o con demanda
+    mayor que la capacidad); 'caminos' se obtiene con expandir_rutas para dibujarlas.
+    """
+    inicio = time.time()
+    refugios_ids = [r for r in dict.fromkeys(refugios_ids) if r != supply_center_id]
+    nodos = [supply_center_id] + refugios_ids
+    matriz = matriz_distancias(graph_post_sismo, nodos, weight)
+    demandas = {r: 1 for r in refugios_ids} if demandas is None else demandas
+
+    atendibles, sin_acceso = [0], []
+    for i, r in enumerate(refugios_ids, start=1):
+        if matriz[0, i] == INF or matriz[i, 0] == INF:
+            sin_acceso.append(r)
+        elif demandas.get(r, 0) > capacidad_vehiculo:
+            print(f"Advertencia: La demanda del refugio {r} ({demandas[r]}) supera la capacidad del vehículo y no será atendido.")
+            sin_acceso.append(r)
+        else:
+            atendibles.append(i)
+    resultado = {'rutas': [], 'cargas': [], 'costos': [], 'costo_total': 0.0, 'sin_acceso': sin_acceso}
+    if len(atendibles) == 1:
+        return resultado
+
+    submatriz = matriz[np.ix_(atendibles, atendibles)]
+    ids = [nodos[i] for i in atendibles]
+    demandas_locales = [0] + [demandas.get(ids[i], 0) for i in range(1, len(ids))]
+    fin = inicio + limite_segundos
+    rng = random.Random(semilla)
+    semillas = [rng.getrandbits(32) for _ in range(num_reinicios)]
+    # El primer reinicio usa los ahorros sin perturbar
+    ruidos = [0.0] + [ruido] * (num_reinicios - 1)
+    trabajos = ([submatriz] * num_reinicios, [demandas_locales] * num_reinicios, [capacidad_vehiculo] * num_reinicios,
+                semillas, [fin] * num_reinicios, ruidos)
+
+    ejecutar = executor.map if executor is not None else map
+    soluciones = list(ejecutar(_resolver_reinicio, *trabajos))
+
+    _, mejores_rutas = min(soluciones, key=lambda s: s[0])
+    d = submatriz.tolist()
+    for r in mejores_rutas:
+        resultado['rutas'].append([supply_center_id] + [ids[x] for x in r] + [supply_center_id])
+        resultado['cargas'].append(sum(demandas_locales[x] for x in r))
+        resultado['costos'].append(_costo_ruta(d, r))
+    resultado['costo_total'] = sum(resultado['costos'])
+    resultado['tiempo_segundos'] = time.time() - inicio
+    if num_vehiculos is not None and len(mejores_rutas) > num_vehiculos:
+        print(f"Advertencia: Se necesitan {len(mejores_rutas)} rutas y solo hay {num_vehiculos} vehículos; algunos deberán hacer más de un viaje.")
+    return resultado
\ No newline at end of file
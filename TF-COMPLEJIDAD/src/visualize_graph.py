@@ -374,4 +374,148 @@ def plot_connectivity_analysis(graph_post_sismo, node_positions, largest_compone
 
     plt.title("Análisis de Conectividad Post-Sismo")
     plt.tight_layout(rect=[0, 0, 0.8, 1])
+    plt.show()
+
+def plot_alternative_routes(graph_post_sismo, node_positions, origin_node_id, target_node_id, rutas, title="Rutas Alternativas de Evacuación"):
+    """
+    Dibuja varias rutas alternativas (lista de (ruta, costo)) sobre el grafo post-sismo,
+    cada una con un color distinto y su costo en la leyenda.
+    """
+    plt.figure(figsize=(12, 10))
+    ax = plt.gca()
+
+    edge_colors = []
+    edge_widths = []
+    for u, v, data in graph_post_sismo.edges(data=True):
+        if data.get('blocked', False):
+            edge_colors.append('black')
+            edge_widths.append(1.5)
+        else:
+            edge_colors.append('lightgray')
+            edge_widths.append(0.3)
+    nx.draw_networkx_edges(graph_post_sismo, node_positions, edge_color=edge_colors, width=edge_widths, alpha=0.4, arrows=False, ax=ax)
+
+    from matplotlib.lines import Line2D
+    colores = plt.cm.tab10(np.linspace(0, 1, 10))
+    legend_elements = []
+    for i, (ruta, costo) in enumerate(rutas):
+        color = colores[i % len(colores)]
+        ruta_edges = list(zip(ruta[:-1], ruta[1:]))
+        # Rutas más anchas primero para que las superpuestas sigan visibles
+        nx.draw_networkx_edges(graph_post_sismo, node_positions, edgelist=ruta_edges, edge_color=[color],
+                               width=6 - 4 * i / max(len(rutas), 1), alpha=0.8, arrows=False, ax=ax)
+        legend_elements.append(Line2D([0], [0], color=color, lw=3, label=f"Ruta {i + 1}: {costo:.1f}m"))
+
+    nx.draw_networkx_nodes(graph_post_sismo, node_positions, nodelist=[origin_node_id], node_color='magenta', node_size=300, ax=ax)
+    if target_node_id:
+        nx.draw_networkx_nodes(graph_post_sismo, node_positions, nodelist=[target_node_id], node_color='lime', node_size=300, ax=ax)
+
+    legend_elements += [
+        Line2D([0], [0], marker='o', color='w', label='Origen', markerfacecolor='magenta', markersize=10),
+        Line2D([0], [0], marker='o', color='w', label='Destino', markerfacecolor='lime', markersize=10),
+        Line2D([0], [0], color='black', lw=1.5, label='Arista Bloqueada'),
+    ]
+    ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(1.05, 1))
+    ax.set_title(title)
+    ax.set_aspect('equal', adjustable='box')
+
+    plt.tight_layout()
+    plt.show()
+
+def draw_service_areas_subplot(graph, node_positions, instalaciones, propietario, ax):
+    colores = plt.cm.tab20(np.linspace(0, 1, 20))
+    color_instalacion = {f: colores[i % len(colores)] for i, f in enumerate(instalaciones)}
+
+    edge_colors = ['black' if data.get('blocked', False) else 'lightgray' for _, _, data in graph.edges(data=True)]
+    nx.draw_networkx_edges(graph, node_positions, edge_color=edge_colors, width=0.4, alpha=0.4, arrows=False, ax=ax)
+
+    cubiertos = [n for n in graph.nodes() if n in propietario and n not in color_instalacion]
+    sin_cobertura = [n for n in graph.nodes() if n not in propietario]
+    nx.draw_networkx_nodes(graph, node_positions, nodelist=cubiertos, node_color=[color_instalacion[propietario[n]] for n in cubiertos], node_size=20, ax=ax)
+    nx.draw_networkx_nodes(graph, node_positions, nodelist=sin_cobertura, node_color='white', edgecolors='gray', node_size=15, ax=ax)
+    nx.draw_networkx_nodes(graph, node_positions, nodelist=list(color_instalacion), node_color=list(color_instalacion.values()),
+                           node_shape='s', edgecolors='black', node_size=150, ax=ax)
+    ax.set_aspect('equal', adjustable='box')
+
+def plot_service_areas(original_graph, post_sismo_graph, node_positions, instalaciones,
+                       propietario_sin_sismo, propietario_con_sismo, radio_max):
+    plt.figure(figsize=(16, 8))
+
+    ax1 = plt.subplot(121)
+    ax1.set_title("Áreas de Servicio (Sin Sismo)")
+    draw_service_areas_subplot(original_graph, node_positions, instalaciones, propietario_sin_sismo, ax1)
+
+    ax2 = plt.subplot(122)
+    ax2.set_title("Áreas de Servicio (Con Sismo)")
+    draw_service_areas_subplot(post_sismo_graph, node_positions, instalaciones, propietario_con_sismo, ax2)
+
+    from matplotlib.lines import Line2D
+    legend_elements = [
+        Line2D([0], [0], marker='s', color='w', label='Instalación', markerfacecolor='gray', markeredgecolor='black', markersize=10),
+        Line2D([0], [0], marker='o', color='w', label='Nodo atendido (color de su instalación)', markerfacecolor='tab:blue', markersize=8),
+        Line2D([0], [0], marker='o', color='w', label=f'Fuera de {radio_max:.0f}m', markerfacecolor='white', markeredgecolor='gray', markersize=8),
+        Line2D([0], [0], color='black', lw=1.5, label='Arista Bloqueada'),
+    ]
+    ax2.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(1.02, 1))
+
+    plt.tight_layout()
+    plt.show()
+
+def plot_vehicle_routes(graph_post_sismo, node_positions, supply_center_id, caminos, costos, cargas,
+                        title="Rutas de Vehículos de Distribución"):
+    """
+    Dibuja las rutas de los vehículos (cada una como secuencia de nodos de la red vial) sobre
+    el grafo post-sismo, cada una con un color distinto y su costo y carga en la leyenda.
+    """
+    plt.figure(figsize=(12, 10))
+    ax = plt.gca()
+
+    edge_colors = ['black' if data.get('blocked', False) else 'lightgray' for _, _, data in graph_post_sismo.edges(data=True)]
+    nx.draw_networkx_edges(graph_post_sismo, node_positions, edge_color=edge_colors, width=0.3, alpha=0.4, arrows=False, ax=ax)
+
+    from matplotlib.lines import Line2D
+    colores = plt.cm.tab20(np.linspace(0, 1, 20))
+    legend_elements = []
+    for i, (camino, costo, carga) in enumerate(zip(caminos, costos, cargas)):
+        color = colores[i % len(colores)]
+        nx.draw_networkx_edges(graph_post_sismo, node_positions, edgelist=list(zip(camino[:-1], camino[1:])),
+                               edge_color=[color], width=2.5, alpha=0.8, arrows=False, ax=ax)
+        paradas = [n for n in camino if graph_post_sismo.nodes[n].get('type') == 'critical_infra' and n != supply_center_id]
+        nx.draw_networkx_nodes(graph_post_sismo, node_positions, nodelist=paradas, node_color=[color], node_size=60, ax=ax)
+        if i < 15: # La leyenda se limita para que no tape el mapa
+            legend_elements.append(Line2D([0], [0], color=color, lw=3, label=f"Vehículo {i + 1}: {costo:.0f}m, carga {carga}"))
+
+    nx.draw_networkx_nodes(graph_post_sismo, node_positions, nodelist=[supply_center_id], node_color='red', node_shape='s', node_size=300, ax=ax)
+    legend_elements += [
+        Line2D([0], [0], marker='s', color='w', label='Centro de Abastecimiento', markerfacecolor='red', markersize=10),
+        Line2D([0], [0], color='black', lw=1.5, label='Arista Bloqueada'),
+    ]
+    ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(1.05, 1))
+    ax.set_title(f"{title} (Total: {sum(costos):.0f}m)")
+    ax.set_aspect('equal', adjustable='box')
+
+    plt.tight_layout()
+    plt.show()
+
+def plot_conteo_operaciones(filas, cotas, title="Operaciones Medidas vs. Cota Teórica"):
+    """
+    Un panel por algoritmo con las operaciones medidas (puntos) y su cota teórica (línea)
+    según crece el grafo (V + E), en escala log-log. 'filas' es el resultado de
+    operation_counts.medir_operaciones y 'cotas', el texto de la cota de cada algoritmo.
+    """
+    algoritmos = list(dict.fromkeys(fila['algoritmo'] for fila in filas))
+    fig, axes = plt.subplots(1, len(algoritmos), figsize=(6 * len(algoritmos), 5), squeeze=False)
+    for ax, algoritmo in zip(axes[0], algoritmos):
+        propias = sorted((f for f in filas if f['algoritmo'] == algoritmo), key=lambda f: f['nodos'] + f['aristas'])
+        tamanos = [f['nodos'] + f['aristas'] for f in propias]
+        ax.plot(tamanos, [f['cota'] for f in propias], color='gray', linestyle='--', label=f"Cota: {cotas[algoritmo]}")
+        ax.plot(tamanos, [f['medido'] for f in propias], marker='o', color='tab:blue', label='Medido')
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_xlabel('Tamaño del grafo (V + E)')
+        ax.set_ylabel('Operaciones')
+        ax.set_title(algoritmo.capitalize())
+        ax.legend(loc='upper left', fontsize=8)
+    fig.suptitle(title)
+    plt.tight_layout()
     plt.show()
\ No newline at end of file
@@ -0,0 +1,92 @@
+# verificar_servicio.py
+"""
+Verificación rápida del servicio de rutas (src/route_service.py) en localhost: levanta el
+servicio en un puerto libre sobre una red simulada pequeña y comprueba que las consultas
+concurrentes se agrupan en una sola búsqueda, los códigos 404/405 y el límite de escenarios
+retenidos. Termina con código 1 si alguna comprobación falla. Uso:
+
+    python verificar_servicio.py [--concurrentes 20]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+
+from src.data_simulator import simulate_vial_network, simulate_critical_infrastructure, simulate_populated_zones, RIESGO_PONDERACION
+from src.graph_builder import build_urban_graph
+from src.route_service import ServicioRutas
+
+
+def _grafo_pequeno(semilla=1):
+    random.seed(semilla)
+    base_lat, base_lon, num_grid, spacing = -12.0463, -77.0428, 12, 0.002
+    df_red_vial_edges, gdf_vial_nodes = simulate_vial_network(base_lat, base_lon, num_grid, num_grid, spacing)
+    gdf_infra_critica = simulate_critical_infrastructure(base_lat, base_lon, num_grid / 2 * spacing, 10)
+    gdf_zonas_pobladas = simulate_populated_zones(base_lat, base_lon, num_grid / 2 * spacing, 40)
+    return build_urban_graph(df_red_vial_edges, gdf_vial_nodes, gdf_infra_critica, gdf_zonas_pobladas, RIESGO_PONDERACION)
+
+
+async def _pedir(port, metodo, objetivo, cuerpo=None):
+    # Cliente HTTP mínimo: una petición por conexión, como atiende el servicio
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    contenido = json.dumps(cuerpo).encode('utf-8') if cuerpo is not None else b''
+    writer.write(f"{metodo} {objetivo} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                 f"Content-Length: {len(contenido)}\r\n\r\n".encode('latin-1') + contenido)
+    await writer.drain()
+    respuesta = await reader.read()
+    writer.close()
+    cabecera, _, datos = respuesta.partition(b'\r\n\r\n')
+    return int(cabecera.split(b' ', 2)[1]), json.loads(datos)
+
+
+async def verificar(concurrentes):
+    graph = _grafo_pequeno()
+    zonas = [n for n, data in graph.nodes(data=True) if data.get('type') == 'populated_zone']
+    servicio = ServicioRutas(graph, max_escenarios=2)
+    server = await servicio.iniciar(port=0)
+    port = server.sockets[0].getsockname()[1]
+    resultados = []
+
+    def comprobar(descripcion, condicion):
+        resultados.append(condicion)
+        print(f"[{'OK' if condicion else 'FALLA'}] {descripcion}")
+
+    async with server:
+        respuestas = await asyncio.gather(*[_pedir(port, 'GET', f"/evacuacion?origen={zonas[i % len(zonas)]}")
+                                            for i in range(concurrentes)])
+        comprobar(f"{concurrentes} consultas de evacuación concurrentes responden 200",
+                  all(codigo == 200 for codigo, _ in respuestas))
+        comprobar(f"las consultas concurrentes se agrupan en una búsqueda (ejecutadas: {servicio.busquedas_ejecutadas})",
+                  servicio.busquedas_ejecutadas == 1)
+
+        codigo, _ = await _pedir(port, 'GET', "/no_existe")
+        comprobar("ruta inexistente -> 404", codigo == 404)
+        codigo, _ = await _pedir(port, 'GET', "/evacuacion?origen=NODO_INEXISTENTE")
+        comprobar("origen inexistente -> 404", codigo == 404)
+        codigo, _ = await _pedir(port, 'POST', f"/evacuacion?origen={zonas[0]}")
+        comprobar("POST en /evacuacion -> 405", codigo == 405)
+        codigo, _ = await _pedir(port, 'GET', "/escenario")
+        comprobar("GET en /escenario -> 405", codigo == 405)
+
+        for _ in range(3):
+            codigo, _ = await _pedir(port, 'POST', "/escenario", {'magnitud': 7.0})
+        codigo, datos = await _pedir(port, 'GET', "/escenarios")
+        comprobar(f"solo se retienen los últimos escenarios (retenidos: {datos['escenarios']})",
+                  datos['escenarios'] == [datos['actual'] - 1, datos['actual']])
+        comprobar("los resultados de escenarios descartados se liberan",
+                  all(clave[1] in servicio.escenarios for clave in servicio._resultados))
+        codigo, _ = await _pedir(port, 'GET', f"/evacuacion?origen={zonas[0]}&escenario=0")
+        comprobar("escenario descartado -> 404", codigo == 404)
+    return all(resultados)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificación del servicio de rutas en localhost.")
+    parser.add_argument('--concurrentes', type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(verificar(args.concurrentes)) else 1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file